@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from app.constants import STATS_DIRNAME
+from app.storage.project_store import ProjectStore
+from app.utils.paths import ensure_dir
+from app.utils.perf import timed
+from app.utils.text import word_count
+
+ANALYSIS_VERSION = 2
+NGRAM_N = 4
+TOP_NGRAMS = 20
+# 单章只丢掉出现一次的 n-gram（多数是噪声）；合并全书后再按次数取前 TOP_NGRAMS 个
+NGRAM_KEEP_MIN = 2
+NGRAM_REPORT_MIN = 3
+# 句长直方图桶上界（字符）；最后一桶为更长的句子
+SENTENCE_BUCKETS = (5, 10, 20, 40, 80, 160)
+
+_SENTENCE_RE = re.compile(r"[^。！？!?…\n]+[。！？!?…]*")
+_DIALOGUE_RE = re.compile(r"“[^”]*”|「[^」]*」|\"[^\"\n]*\"")
+_CJK_RUN_RE = re.compile(r"[一-鿿]{%d,}" % NGRAM_N)
+
+
+def _ngrams(run: str, n: int):
+    # zip/map 都在 C 层迭代，比逐个切片的 Python 循环快得多
+    return map("".join, zip(*(run[i:] for i in range(n))))
+
+
+def analyze_text(text: str, names: tuple[str, ...] = ()) -> dict:
+    """单章指标；结果只含基本类型，便于跨进程传递与 JSON 缓存。"""
+    text = text or ""
+    lengths = [len(s.strip()) for s in _SENTENCE_RE.findall(text) if s.strip()]
+    hist = [0] * (len(SENTENCE_BUCKETS) + 1)
+    for n in lengths:
+        hist[bisect_left(SENTENCE_BUCKETS, n)] += 1
+
+    dialogue = sum(len(m) for m in _DIALOGUE_RE.findall(text))
+    ngrams = Counter(chain.from_iterable(_ngrams(run, NGRAM_N) for run in _CJK_RUN_RE.findall(text)))
+    # 各章零散出现两三次的说法合起来可能是全书的口头禅，所以这里不截取前 N 个
+    repeated = [(g, c) for g, c in ngrams.items() if c >= NGRAM_KEEP_MIN]
+
+    return {
+        "chars": len(text),
+        "words": word_count(text),
+        "sentences": len(lengths),
+        "mean_sentence_len": round(sum(lengths) / len(lengths), 2) if lengths else 0.0,
+        "sentence_hist": hist,
+        "dialogue_chars": dialogue,
+        "dialogue_ratio": round(dialogue / len(text), 4) if text else 0.0,
+        "repeated_ngrams": repeated,
+        "names": {n: text.count(n) for n in names if n},
+    }
+
+
+def _analyze_job(args: tuple[str, str, tuple[str, ...]]) -> tuple[str, dict]:
+    cid, text, names = args
+    return cid, analyze_text(text, names)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ManuscriptAnalyzer:
+    """全书分析：按章节内容哈希缓存结果，只重算改过的章节；未命中的章节放进进程池。"""
+
+    def __init__(self, project_dir: Path, store: ProjectStore, names: list[str] | None = None, workers: int | None = None):
+        self.store = store
+        self.names = tuple(sorted(set(names or [])))
+        self.workers = workers
+        self.cache_path = ensure_dir(project_dir / STATS_DIRNAME) / "analysis_cache.json"
+        self._names_key = _digest("\n".join(self.names))
+
+    def _load_cache(self) -> dict:
+        try:
+            d = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+        if d.get("version") != ANALYSIS_VERSION or d.get("names_key") != self._names_key:
+            return {}
+        return d.get("chapters") or {}
+
+    def _save_cache(self, rows: dict) -> None:
+        d = {"version": ANALYSIS_VERSION, "names_key": self._names_key, "chapters": rows}
+        self.cache_path.write_text(json.dumps(d, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    @timed("analysis.run")
+    def analyze(self, chapter_ids: list[str], on_progress: Callable[[int, int], None] | None = None) -> dict[str, dict]:
+        cache = self._load_cache()
+        out: dict[str, dict] = {}
+        jobs: list[tuple[str, str, tuple[str, ...]]] = []
+        digests: dict[str, str] = {}
+
+        for i in range(0, len(chapter_ids), 200):
+            for cid, text in self.store.read_chapters(chapter_ids[i : i + 200]).items():
+                h = _digest(text)
+                digests[cid] = h
+                hit = cache.get(cid)
+                if hit and hit.get("hash") == h:
+                    out[cid] = hit["metrics"]
+                else:
+                    jobs.append((cid, text, self.names))
+
+        total = len(chapter_ids)
+        done = len(out)
+        if on_progress is not None:
+            on_progress(done, total)
+
+        if jobs:
+            results = self._run_jobs(jobs)
+            for cid, metrics in results:
+                out[cid] = metrics
+                done += 1
+                if on_progress is not None and done % 50 == 0:
+                    on_progress(done, total)
+
+        self._save_cache({cid: {"hash": digests[cid], "metrics": m} for cid, m in out.items()})
+        if on_progress is not None:
+            on_progress(total, total)
+        return out
+
+    def _run_jobs(self, jobs: list[tuple[str, str, tuple[str, ...]]]):
+        if self.workers == 0 or len(jobs) < 8:
+            return map(_analyze_job, jobs)
+        try:
+            pool = ProcessPoolExecutor(max_workers=self.workers)
+        except (NotImplementedError, OSError, ImportError):
+            # 安卓等不支持多进程的环境：退回当前进程
+            return map(_analyze_job, jobs)
+        with pool:
+            return list(pool.map(_analyze_job, jobs, chunksize=max(1, len(jobs) // 32)))
+
+
+def summarize(per_chapter: dict[str, dict]) -> dict:
+    """把各章指标汇总成全书指标。"""
+    hist = [0] * (len(SENTENCE_BUCKETS) + 1)
+    chars = sentences = dialogue = words = 0
+    sent_len_sum = 0.0
+    ngrams: Counter[str] = Counter()
+    names: Counter[str] = Counter()
+    for m in per_chapter.values():
+        chars += m["chars"]
+        words += m["words"]
+        sentences += m["sentences"]
+        sent_len_sum += m["mean_sentence_len"] * m["sentences"]
+        dialogue += m["dialogue_chars"]
+        for i, n in enumerate(m["sentence_hist"]):
+            hist[i] += n
+        ngrams.update(dict(m["repeated_ngrams"]))
+        names.update(m["names"])
+    return {
+        "chapters": len(per_chapter),
+        "chars": chars,
+        "words": words,
+        "sentences": sentences,
+        "mean_sentence_len": round(sent_len_sum / sentences, 2) if sentences else 0.0,
+        "sentence_hist": hist,
+        "dialogue_ratio": round(dialogue / chars, 4) if chars else 0.0,
+        "repeated_ngrams": [(g, c) for g, c in ngrams.most_common(TOP_NGRAMS) if c >= NGRAM_REPORT_MIN],
+        "names": dict(names.most_common()),
+    }
@@ -0,0 +1,289 @@
+"""命令行入口：不经过界面批量处理一本或多本书。
+
+用法（在 novel_mobile 目录下）：
+    python -m app stats                      # 书架上所有书
+    python -m app export 我的小说 --out exports/
+    python -m app --workers 4 check
+    python -m app --data ~/novel_mobile_data --json reindex 书A 书B
+    python -m app migrate --to pack 我的小说    # 章节改存单个 chapters.db
+    python -m app compact                     # 回收 chapters.db 的空闲页
+
+本模块及其依赖都不能导入 Kivy；存储类在各命令里按需导入，保证启动快。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+
+def _leaf_ids(root) -> list[str]:
+    from app.exporters.exporter import iter_chapters_dfs
+
+    return [n.id for n in iter_chapters_dfs(root) if not n.is_folder]
+
+
+def _count_words(store, ids: list[str]) -> int:
+    from app.utils.text import word_count
+
+    total = 0
+    for i in range(0, len(ids), 200):
+        total += sum(word_count(t) for t in store.read_chapters(ids[i : i + 200]).values())
+    return total
+
+
+def cmd_stats(project_dir: Path, opts: dict) -> dict:
+    from app.storage.project_store import ProjectStore
+    from app.storage.stats_store import StatsStore, today_key
+
+    store = ProjectStore(project_dir)
+    try:
+        proj = store.load()
+        ids = _leaf_ids(proj.root)
+        total = _count_words(store, ids)
+    finally:
+        store.close()
+    daily = StatsStore(project_dir).daily_progress()
+    return {
+        "title": proj.title,
+        "chapters": len(ids),
+        "total_words": total,
+        "today": daily.get(today_key(), 0),
+        "writing_days": sum(1 for v in daily.values() if v > 0),
+        "updated_at": proj.updated_at,
+    }
+
+
+def cmd_export(project_dir: Path, opts: dict) -> dict:
+    from app.exporters.exporter import ExportContext
+    from app.exporters.txt_exporter import TxtExporter
+    from app.storage.project_store import ProjectStore, now_iso
+    from app.utils.paths import ensure_dir
+
+    out_dir = ensure_dir(Path(opts["out"]) if opts.get("out") else project_dir / "exports")
+    store = ProjectStore(project_dir)
+    try:
+        proj = store.load()
+        out_path = out_dir / f"{project_dir.name}_{now_iso().replace(':', '-')}.txt"
+        TxtExporter().export(ExportContext(project=proj, store=store), out_path)
+    finally:
+        store.close()
+    return {"title": proj.title, "out": str(out_path)}
+
+
+def cmd_reindex(project_dir: Path, opts: dict) -> dict:
+    """重建派生数据：字数统计的聚合桶；书架摘要由主进程写回。"""
+    from app.storage.project_store import ProjectStore
+    from app.storage.stats_store import StatsStore
+
+    store = ProjectStore(project_dir)
+    try:
+        proj = store.load()
+        ids = _leaf_ids(proj.root)
+        total = _count_words(store, ids)
+    finally:
+        store.close()
+    st = StatsStore(project_dir)
+    # 只重算原始记录还覆盖的日子；更早的日桶是唯一留存，不能丢
+    st.rebuild_buckets()
+    days = len(st.daily_progress())
+    return {"title": proj.title, "chapters": len(ids), "total_words": total, "history_days": days, "updated_at": proj.updated_at}
+
+
+def cmd_check(project_dir: Path, opts: dict) -> dict:
+    """一致性检查：目录与正文是否对得上、正文能否解码、版本文件是否齐全。只读，不改动项目。"""
+    from app.storage.chapter_backend import open_chapter_backend
+    from app.storage.project_store import ProjectStore
+    from app.storage.version_store import VersionStore
+
+    problems: list[str] = []
+    store = ProjectStore(project_dir, backend=open_chapter_backend(project_dir, readonly=True))
+    try:
+        try:
+            proj = store.load()
+        except Exception as e:
+            return {"ok": False, "problems": [f"project.json 无法读取：{e}"]}
+        ids = _leaf_ids(proj.root)
+        stored = set(store.backend.ids())
+        missing = [cid for cid in ids if cid not in stored]
+        orphans = sorted(stored - set(ids))
+        if missing:
+            problems.append(f"{len(missing)} 个章节没有正文（如 {missing[0]}）")
+        if orphans:
+            problems.append(f"{len(orphans)} 份正文不在目录中（如 {orphans[0]}）")
+        present = [cid for cid in ids if cid in stored]
+        for i in range(0, len(present), 200):
+            batch = present[i : i + 200]
+            try:
+                store.read_chapters(batch)
+            except Exception:
+                for cid in batch:
+                    try:
+                        store.backend.read(cid)
+                    except Exception as e:
+                        problems.append(f"章节 {cid} 无法解码：{e}")
+    finally:
+        store.close()
+
+    vs = VersionStore(project_dir, readonly=True)
+    lost = [e for e in vs.all_versions() if not (vs.versions_dir / e.rel_path).exists()]
+    if lost:
+        problems.append(f"{len(lost)} 条版本记录缺少文件")
+    return {"title": proj.title, "chapters": len(ids), "ok": not problems, "problems": problems}
+
+
+def cmd_migrate(project_dir: Path, opts: dict) -> dict:
+    """在目录布局与打包文件之间迁移章节正文；项目须未在应用里打开。"""
+    from app.constants import CHAPTER_CODEC
+    from app.storage.chapter_backend import migrate_chapters, open_chapter_backend
+
+    src = open_chapter_backend(project_dir)
+    before = src.kind
+    src.close()
+    dst = migrate_chapters(project_dir, opts["to"], opts.get("codec") or CHAPTER_CODEC)
+    try:
+        chapters = len(dst.ids())
+    finally:
+        dst.close()
+    return {"from": before, "to": dst.kind, "chapters": chapters}
+
+
+def cmd_compact(project_dir: Path, opts: dict) -> dict:
+    from app.storage.chapter_backend import open_chapter_backend
+
+    backend = open_chapter_backend(project_dir)
+    try:
+        return {"kind": backend.kind, "freed_pages": backend.compact()}
+    finally:
+        backend.close()
+
+
+COMMANDS: dict[str, Callable[[Path, dict], dict]] = {
+    "stats": cmd_stats,
+    "export": cmd_export,
+    "reindex": cmd_reindex,
+    "check": cmd_check,
+    "migrate": cmd_migrate,
+    "compact": cmd_compact,
+}
+
+
+def _job(args: tuple[str, str, dict]) -> tuple[str, dict]:
+    command, project_dir, opts = args
+    from app.constants import PROJECT_META_FILENAME
+    from app.utils.perf import recorder
+
+    # 批处理不需要耗时直方图，也不要慢调用告警刷屏
+    recorder.enabled = False
+    p = Path(project_dir)
+    if not (p / PROJECT_META_FILENAME).exists():
+        return project_dir, {"error": "不是项目目录（缺少 project.json）"}
+    try:
+        return project_dir, COMMANDS[command](p, opts)
+    except Exception as e:
+        return project_dir, {"error": f"{type(e).__name__}: {e}"}
+
+
+def _run_jobs(jobs: list[tuple[str, str, dict]], workers: int | None):
+    if workers == 1 or len(jobs) < 2:
+        return map(_job, jobs)
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (NotImplementedError, OSError, ImportError):
+        return map(_job, jobs)
+    with pool:
+        return list(pool.map(_job, jobs))
+
+
+def _resolve_projects(catalog, names: list[str]) -> list[Path]:
+    """参数可以是书架里的目录名，也可以是项目目录路径；都不给时处理书架上所有书。"""
+    if not names:
+        return sorted(p for p in catalog.projects_dir.iterdir() if p.is_dir())
+    from app.constants import PROJECT_META_FILENAME
+
+    out: list[Path] = []
+    for name in names:
+        p = Path(name).expanduser()
+        out.append(p.resolve() if (p / PROJECT_META_FILENAME).exists() else catalog.project_dir(name))
+    return out
+
+
+def _format(command: str, r: dict) -> str:
+    if "error" in r:
+        return f"错误：{r['error']}"
+    if command == "stats":
+        return f"{r['title']}：{r['chapters']} 章 / {r['total_words']} 字，今日 {r['today']} 字，写作 {r['writing_days']} 天"
+    if command == "export":
+        return f"{r['title']} → {r['out']}"
+    if command == "reindex":
+        return f"{r['title']}：{r['chapters']} 章 / {r['total_words']} 字，历史 {r['history_days']} 天"
+    if command == "migrate":
+        return f"{r['from']} → {r['to']}，{r['chapters']} 章" if r["from"] != r["to"] else f"已是 {r['to']}，{r['chapters']} 章"
+    if command == "compact":
+        return f"回收 {r['freed_pages']} 页" if r["kind"] == "pack" else "目录存储，无需整理"
+    return "正常" if r["ok"] else "；".join(r["problems"])
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m app", description="小说项目批处理（不启动界面）")
+    ap.add_argument("--data", help="数据根目录，默认同应用（NOVEL_DATA_DIR 或 ./novel_mobile_data）")
+    ap.add_argument("--workers", type=int, default=None, help="并行进程数，1 表示不并行")
+    ap.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    sub = ap.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("stats", "章节数、字数与写作天数"),
+        ("export", "导出 TXT"),
+        ("reindex", "重算字数并重建统计聚合与书架摘要"),
+        ("check", "检查目录、正文与版本文件的一致性"),
+        ("migrate", "章节正文在目录（每章一个 .md）与单文件 chapters.db 之间迁移"),
+        ("compact", "回收 chapters.db 里删改留下的空闲空间"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("projects", nargs="*", help="书架目录名或项目路径；不填表示全部")
+        if name == "export":
+            p.add_argument("--out", help="输出目录，默认各项目下的 exports/")
+        if name == "migrate":
+            p.add_argument("--to", required=True, choices=("dir", "pack"), help="目标存储")
+            p.add_argument("--codec", help="打包时的正文编码，如 auto、zlib:9、lzma")
+    return ap
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from app.storage.catalog_store import CatalogStore
+    from app.utils.paths import data_root
+
+    catalog = CatalogStore(Path(args.data).expanduser().resolve() if args.data else data_root())
+    projects = _resolve_projects(catalog, args.projects)
+    if not projects:
+        print("没有找到项目", file=sys.stderr)
+        return 1
+
+    opts = {"out": getattr(args, "out", None), "to": getattr(args, "to", None), "codec": getattr(args, "codec", None)}
+    jobs = [(args.command, str(p), opts) for p in projects]
+    results = dict(_run_jobs(jobs, args.workers))
+
+    if args.command == "reindex":
+        # 书架索引只由主进程写，避免多进程同时改 catalog.json
+        for p in projects:
+            r = results[str(p)]
+            if "error" not in r and p.parent == catalog.projects_dir:
+                catalog.update(
+                    p.name,
+                    title=r["title"],
+                    chapter_count=r["chapters"],
+                    total_words=r["total_words"],
+                    updated_at=r["updated_at"],
+                )
+
+    failed = any("error" in r or r.get("ok") is False for r in results.values())
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for p in projects:
+            print(f"[{p.name}] {_format(args.command, results[str(p)])}")
+    return 1 if failed else 0
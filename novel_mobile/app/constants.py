@@ -2,11 +2,50 @@ from __future__ import annotations
 
 APP_NAME = "NovelMobile"
 DEFAULT_PROJECT_NAME = "我的小说"
+PROJECTS_DIRNAME = "projects"
+CATALOG_FILENAME = "catalog.json"
 PROJECT_META_FILENAME = "project.json"
+PROJECT_STATE_FILENAME = "state.json"
 CHAPTERS_DIRNAME = "chapters"
+CHAPTERS_PACK_FILENAME = "chapters.db"
+
 VERSIONS_DIRNAME = "versions"
 STATS_DIRNAME = "stats"
 KNOWLEDGE_FILENAME = "knowledge.json"
+BACKUP_OBJECTS_DIRNAME = "objects"
+BACKUP_POINTS_DIRNAME = "points"
 
 AUTOSAVE_INTERVAL_SECONDS = 5
+
+# 版本快照调度：按自上次快照以来的改动量（字符）、停笔时长与切章决定
 VERSION_SNAPSHOT_MIN_SECONDS = 60
+SNAPSHOT_MIN_CHANGED_CHARS = 200
+SNAPSHOT_BIG_CHANGE_CHARS = 2000
+SNAPSHOT_IDLE_SECONDS = 20
+SNAPSHOT_MAX_SECONDS = 900
+
+# 外部改动监视：轮询章节文件与 project.json 的 stat
+WATCH_INTERVAL_SECONDS = 3
+
+# 打包章节（chapters.db）与版本正文的编码："plain"、"auto"（超过阈值用 zlib）、"zlib[:级别]"、"lzma[:级别]"
+# 目录布局的 chapters/*.md 始终是明文；lzma 不可用时（如 Android）退回 zlib
+CHAPTER_CODEC = "auto"
+VERSION_CODEC = "auto"
+COMPRESS_MIN_BYTES = 8 * 1024
+
+# 打包章节的空闲页（删改留下）超过这么多页时，关闭项目顺手回收
+PACK_COMPACT_MIN_FREE_PAGES = 256
+
+# 章节正文内存缓存上限（字符数）
+CHAPTER_CACHE_MAX_CHARS = 2_000_000
+
+# 超长章节分页编辑：超过阈值时编辑器只装入当前页附近的几页
+PAGED_EDITOR_MIN_CHARS = 60_000
+PAGE_CHARS = 8_000
+PAGED_WINDOW_PAGES = 3
+
+# 性能埋点：超过一帧预算的 span 记日志；指标快照定期写入轮转文件
+FRAME_BUDGET_MS = 16
+METRICS_FLUSH_SECONDS = 60
+METRICS_FILE_MAX_BYTES = 512 * 1024
+METRICS_BACKUP_COUNT = 3
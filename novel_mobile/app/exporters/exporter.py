@@ -21,13 +21,13 @@ def iter_chapters_dfs(node: ChapterNode):
 
 
 def flatten_content(ctx: ExportContext) -> list[tuple[str, str, bool]]:
-    out: list[tuple[str, str, bool]] = []
-    for n in iter_chapters_dfs(ctx.project.root):
-        if n.is_folder:
-            out.append((n.title, "", True))
-        else:
-            out.append((n.title, ctx.store.read_chapter(n.id), False))
-    return out
+    nodes = list(iter_chapters_dfs(ctx.project.root))
+    ids = [n.id for n in nodes if not n.is_folder]
+    # 批量读正文：不回填 LRU，导出整本书不会把正在编辑的章节挤出缓存
+    texts: dict[str, str] = {}
+    for i in range(0, len(ids), 200):
+        texts.update(ctx.store.read_chapters(ids[i : i + 200]))
+    return [(n.title, "", True) if n.is_folder else (n.title, texts.get(n.id, ""), False) for n in nodes]
 
 
 class Exporter:
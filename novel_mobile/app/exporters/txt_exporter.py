@@ -3,11 +3,13 @@ from __future__ import annotations
 from pathlib import Path
 
 from app.exporters.exporter import ExportContext, Exporter, flatten_content
+from app.utils.perf import timed
 
 
 class TxtExporter(Exporter):
     format_name = "txt"
 
+    @timed("export.txt")
     def export(self, ctx: ExportContext, out_path: Path) -> None:
         parts: list[str] = []
         for title, text, is_folder in flatten_content(ctx):
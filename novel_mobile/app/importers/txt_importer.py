@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import codecs
+import re
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from app.models import ChapterNode
+from app.storage.project_store import ProjectStore
+from app.utils.perf import timed
+from app.utils.text import word_count
+
+_NUM = "0-9０-９零〇一二三四五六七八九十百千万两"
+
+# “第N章”之后必须是空白/分隔符或行尾，且不以句末标点结尾，
+# 否则“第一节课下课后，……。”“第2集团军……”这类正文会被当成标题
+_HEAD_TAIL = r"(?:[\s:：、.．·].{0,40})?(?<![。！？!?，,；;…”」])"
+
+# (正则, 是否文件夹)；标题取第一个捕获组，没有捕获组时取整行
+DEFAULT_HEADING_PATTERNS: list[tuple[str, bool]] = [
+    (rf"^\s*(第[{_NUM}]+[卷部集篇]{_HEAD_TAIL})$", True),
+    (rf"^\s*(第[{_NUM}]+[章节回]{_HEAD_TAIL})$", False),
+    (r"^#\s+(.+?)\s*$", True),
+    (r"^##\s+(.+?)\s*$", False),
+]
+
+
+@dataclass(frozen=True)
+class ImportProgress:
+    bytes_read: int
+    total_bytes: int
+    chapters: int
+
+
+@dataclass
+class ImportResult:
+    root: ChapterNode
+    word_counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def chapter_count(self) -> int:
+        return len(self.word_counts)
+
+
+def detect_encoding(path: Path, probe_bytes: int = 64 * 1024) -> str:
+    """UTF-8（含 BOM）解码失败就按 GB18030 处理（国内 TXT 最常见的两种）。"""
+    with path.open("rb") as f:
+        head = f.read(probe_bytes)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+def _count_words(texts: list[str]) -> list[int]:
+    return [word_count(t) for t in texts]
+
+
+class TxtImporter:
+    """流式导入大 TXT：按块读取、识别章节标题、批量写入并计算字数。
+
+    内存占用与单批正文大小（batch_chars）成正比，与源文件大小无关。
+    字数默认在当前进程里数：实测 20MB 的文件进程池的传输开销比计数本身还大；
+    workers>0（或 None，按 CPU 数）时才用进程池。
+    """
+
+    def __init__(
+        self,
+        patterns: list[tuple[str, bool]] | None = None,
+        encoding: str | None = None,
+        chunk_chars: int = 256 * 1024,
+        batch_chars: int = 2_000_000,
+        workers: int | None = 0,
+    ):
+        self.patterns = [(re.compile(p), is_folder) for p, is_folder in (patterns or DEFAULT_HEADING_PATTERNS)]
+        self.encoding = encoding
+        self.chunk_chars = chunk_chars
+        self.batch_chars = batch_chars
+        self.workers = workers
+
+    def match_heading(self, line: str) -> tuple[str, bool] | None:
+        s = line.strip()
+        if not s or len(s) > 60:
+            return None
+        for rx, is_folder in self.patterns:
+            m = rx.match(s)
+            if m:
+                title = (m.group(1) if m.groups() else m.group(0)).strip()
+                return title or s, is_folder
+        return None
+
+    def _make_pool(self) -> Executor | None:
+        if self.workers == 0:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        except (NotImplementedError, OSError, ImportError):
+            # 安卓等环境可能不支持多进程，退回当前进程计数
+            return None
+
+    @timed("import.txt")
+    def run(
+        self,
+        src: Path,
+        store: ProjectStore,
+        title: str | None = None,
+        on_progress: Callable[[ImportProgress], None] | None = None,
+    ) -> ImportResult:
+        """导入到一个新的文件夹节点（尚未挂到项目树上，由调用方决定放在哪里）。"""
+        encoding = self.encoding or detect_encoding(src)
+        total_bytes = src.stat().st_size
+        root = ChapterNode(id=str(uuid.uuid4()), title=title or src.stem, is_folder=True, children=[])
+        result = ImportResult(root=root)
+
+        folder = root
+        untitled: set[str] = set()
+        cur_title: str | None = None
+        cur_lines: list[str] = []
+        batch: list[tuple[str, str]] = []
+        batch_size = 0
+        pending: list[tuple[list[str], Future | list[int]]] = []
+        pool = self._make_pool()
+
+        def collect(block: bool) -> None:
+            while pending and (block or not isinstance(pending[0][1], Future) or pending[0][1].done()):
+                ids, fut = pending.pop(0)
+                counts = fut.result() if isinstance(fut, Future) else fut
+                result.word_counts.update(zip(ids, counts))
+
+        def flush_batch(bytes_read: int) -> None:
+            nonlocal batch, batch_size
+            if not batch:
+                return
+            store.write_chapters(batch)
+            ids = [cid for cid, _ in batch]
+            texts = [t for _, t in batch]
+            pending.append((ids, pool.submit(_count_words, texts) if pool is not None else _count_words(texts)))
+            batch = []
+            batch_size = 0
+            # 最多两批在计数中，避免正文在内存里堆积
+            collect(block=len(pending) > 2)
+            if on_progress is not None:
+                on_progress(ImportProgress(bytes_read=bytes_read, total_bytes=total_bytes, chapters=len(result.word_counts) + sum(len(i) for i, _ in pending)))
+
+        def end_chapter(bytes_read: int) -> None:
+            nonlocal cur_title, cur_lines, batch_size
+            text = "".join(cur_lines).strip("\n")
+            if cur_title is None and not text.strip():
+                cur_lines = []
+                return
+            cid = str(uuid.uuid4())
+            if cur_title is None:
+                untitled.add(cid)
+            folder.children.append(ChapterNode(id=cid, title=cur_title or "序章", is_folder=False, children=[]))
+            batch.append((cid, text + "\n" if text else ""))
+            batch_size += len(text)
+            cur_title = None
+            cur_lines = []
+            if batch_size >= self.batch_chars:
+                flush_batch(bytes_read)
+
+        try:
+            with src.open("r", encoding=encoding, errors="replace", newline=None) as f:
+                tail = ""
+                while True:
+                    chunk = f.read(self.chunk_chars)
+                    bytes_read = min(total_bytes, f.buffer.tell()) if hasattr(f, "buffer") else 0
+                    if not chunk:
+                        lines = [tail] if tail else []
+                    else:
+                        lines = (tail + chunk).split("\n")
+                        tail = lines.pop()
+                        lines = [ln + "\n" for ln in lines]
+                    for line in lines:
+                        h = self.match_heading(line)
+                        if h is None:
+                            cur_lines.append(line)
+                            continue
+                        end_chapter(bytes_read)
+                        h_title, is_folder = h
+                        if is_folder:
+                            folder = ChapterNode(id=str(uuid.uuid4()), title=h_title, is_folder=True, children=[])
+                            root.children.append(folder)
+                        else:
+                            cur_title = h_title
+                    if not chunk:
+                        break
+            end_chapter(total_bytes)
+            flush_batch(total_bytes)
+            collect(block=True)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        _collapse_single_leaf_folders(root, untitled)
+        return result
+
+
+def _collapse_single_leaf_folders(root: ChapterNode, untitled: set[str]) -> None:
+    """只装着一段无标题正文的文件夹换成以文件夹标题命名的章节。
+
+    每章一个“# 标题”的 Markdown 没有“##”，按规则每章都会成为一个只含“序章”的文件夹。
+    """
+    for i, node in enumerate(root.children):
+        if node.is_folder and len(node.children) == 1 and node.children[0].id in untitled:
+            leaf = node.children[0]
+            root.children[i] = ChapterNode(id=leaf.id, title=node.title, is_folder=False, children=[])
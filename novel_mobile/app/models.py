@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+# project.json 格式版本：1 为嵌套 "root"（无 format 字段），2 起目录存为扁平 "tree"
+PROJECT_FORMAT = 2
+
+
+@dataclass(slots=True)
 class ChapterNode:
     id: str
     title: str
@@ -21,6 +26,85 @@ class Project:
     updated_at: str
 
 
+class ChapterTree:
+    """紧凑章节树：按先序把节点摊平成并行数组，用于 project.json 的扁平序列化。
+
+    下标 0 为根，parent 存父节点下标（根为 -1）；先序排列保证父节点总在子节点之前、
+    兄弟按下标顺序排列。界面和业务代码仍然使用 ChapterNode（见 to_node/from_node）。
+    """
+
+    __slots__ = ("ids", "titles", "folders", "parent")
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.titles: list[str] = []
+        self.folders = bytearray()
+        self.parent = array("i")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_node(cls, root: ChapterNode) -> "ChapterTree":
+        t = cls()
+        stack: list[tuple[ChapterNode, int]] = [(root, -1)]
+        while stack:
+            n, p = stack.pop()
+            i = len(t.ids)
+            t.ids.append(n.id)
+            t.titles.append(n.title)
+            t.folders.append(1 if n.is_folder else 0)
+            t.parent.append(p)
+            for c in reversed(n.children):
+                stack.append((c, i))
+        return t
+
+    def to_node(self) -> ChapterNode:
+        nodes = [
+            ChapterNode(id=self.ids[i], title=self.titles[i], is_folder=bool(self.folders[i]), children=[])
+            for i in range(len(self.ids))
+        ]
+        parent = self.parent
+        for i in range(1, len(nodes)):
+            nodes[parent[i]].children.append(nodes[i])
+        return nodes[0]
+
+    def to_flat(self) -> dict[str, Any]:
+        return {
+            "ids": self.ids,
+            "titles": self.titles,
+            "folders": self.folders.translate(_FOLDER_ENCODE).decode("ascii"),
+            "parent": self.parent.tolist(),
+        }
+
+    @classmethod
+    def from_flat(cls, d: dict[str, Any]) -> "ChapterTree":
+        ids = [str(x) for x in (d.get("ids") or [])]
+        if not ids:
+            return cls.from_node(ChapterNode(id="root", title="目录", is_folder=True, children=[]))
+        titles = [str(x) for x in (d.get("titles") or [])]
+        folders = str(d.get("folders") or "")
+        parent = [int(x) for x in (d.get("parent") or [])]
+        n = len(ids)
+        if len(titles) != n or len(folders) != n or len(parent) != n:
+            raise ValueError("扁平章节树数组长度不一致")
+        for i in range(1, n):
+            if not (0 <= parent[i] < i):
+                raise ValueError("扁平章节树不是先序排列")
+
+        t = cls()
+        t.ids = ids
+        t.titles = titles
+        t.folders = bytearray(folders.encode("ascii").translate(_FOLDER_DECODE))
+        t.parent = array("i", parent)
+        t.parent[0] = -1
+        return t
+
+
+_FOLDER_ENCODE = bytes.maketrans(b"\x00\x01", b"01")
+_FOLDER_DECODE = bytes.maketrans(b"01", b"\x00\x01")
+
+
 def chapter_to_dict(node: ChapterNode) -> dict[str, Any]:
     return {
         "id": node.id,
@@ -41,19 +125,34 @@ def chapter_from_dict(d: dict[str, Any]) -> ChapterNode:
 
 def project_to_dict(p: Project) -> dict[str, Any]:
     return {
+        "format": PROJECT_FORMAT,
         "id": p.id,
         "title": p.title,
         "created_at": p.created_at,
         "updated_at": p.updated_at,
+        "tree": ChapterTree.from_node(p.root).to_flat(),
+        # 过渡期同时写嵌套 "root"：只认 "root" 的旧版本（如同步盘另一端的桌面版）读到的仍是完整目录，
+        # 不会当成空目录再写回、把所有章节变成孤儿。旧版本写回时会丢掉 "tree"，读取时自动退回 "root"
         "root": chapter_to_dict(p.root),
     }
 
 
 def project_from_dict(d: dict[str, Any]) -> Project:
+    fmt = int(d.get("format") or 1)
+    if fmt > PROJECT_FORMAT:
+        # 更新版本写的文件：宁可打不开，也不要按看不懂的格式读成空目录再覆盖回去
+        raise ValueError(f"project.json 格式版本 {fmt} 高于本程序支持的 {PROJECT_FORMAT}，请升级应用")
     return Project(
         id=str(d.get("id")),
         title=str(d.get("title", "我的小说")),
         created_at=str(d.get("created_at", "")),
         updated_at=str(d.get("updated_at", "")),
-        root=chapter_from_dict(d.get("root") or {"id": "root", "title": "目录", "is_folder": True, "children": []}),
+        root=_root_from_dict(d),
     )
+
+
+def _root_from_dict(d: dict[str, Any]) -> ChapterNode:
+    # 新格式为扁平 "tree"；旧版 project.json 仍是嵌套的 "root"
+    if isinstance(d.get("tree"), dict):
+        return ChapterTree.from_flat(d["tree"]).to_node()
+    return chapter_from_dict(d.get("root") or {"id": "root", "title": "目录", "is_folder": True, "children": []})
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Collection, Iterator, Protocol
+
+from app.exporters.exporter import iter_chapters_dfs
+from app.models import ChapterNode
+from app.storage.project_store import ProjectStore
+from app.storage.version_store import VersionStore
+from app.utils.perf import timed
+from app.utils.text import word_count
+
+READ_BATCH = 200
+CONTEXT_CHARS = 20
+BATCHES_FILENAME = "replace_batches.json"
+MAX_BATCHES = 50
+
+
+def now_iso() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class SearchIndex(Protocol):
+    """可选的全文索引：返回可能包含 literal 的章节 id；None 表示索引无法判断。"""
+
+    def candidates(self, literal: str) -> Collection[str] | None: ...
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    text: str
+    regex: bool = False
+    ignore_case: bool = False
+
+    def compile(self) -> re.Pattern[str]:
+        """正则写错时抛 ValueError。"""
+        if not self.text:
+            raise ValueError("查找内容为空")
+        flags = re.IGNORECASE if self.ignore_case else 0
+        try:
+            return re.compile(self.text if self.regex else re.escape(self.text), flags)
+        except re.error as e:
+            raise ValueError(f"正则表达式有误：{e}") from e
+
+    @property
+    def literal(self) -> str | None:
+        # 只有区分大小写的字面查找才能交给索引过滤
+        return None if self.regex or self.ignore_case else self.text
+
+
+@dataclass(frozen=True)
+class FindMatch:
+    chapter_id: str
+    chapter_title: str
+    start: int
+    end: int
+    text: str
+    before: str
+    after: str
+    replacement: str | None = None
+
+    def preview(self) -> str:
+        mid = f"[{self.text}]" if self.replacement is None else f"[{self.text}→{self.replacement}]"
+        return f"{self.before}{mid}{self.after}".replace("\n", " ")
+
+
+@dataclass
+class ReplaceBatch:
+    id: str
+    created_at: str
+    query: str
+    replacement: str
+    regex: bool
+    # 每项：chapter_id, version_id（替换前的快照）, count, words（替换后的字数）
+    chapters: list[dict] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return sum(int(c.get("count", 0)) for c in self.chapters)
+
+
+class FindReplace:
+    """全书查找/替换：按目录顺序逐章流式产出匹配；替换前给每个受影响章节留快照，可整批撤销。"""
+
+    def __init__(self, store: ProjectStore, root: ChapterNode, versions: VersionStore, index: SearchIndex | None = None):
+        self.store = store
+        self.root = root
+        self.versions = versions
+        self.index = index
+        self.batches_path = versions.versions_dir / BATCHES_FILENAME
+
+    def _chapters(self, query: SearchQuery) -> list[tuple[str, str]]:
+        leaves = [(n.id, n.title) for n in iter_chapters_dfs(self.root) if not n.is_folder]
+        literal = query.literal
+        if self.index is not None and literal:
+            allowed = self.index.candidates(literal)
+            if allowed is not None:
+                allowed = set(allowed)
+                leaves = [(cid, t) for cid, t in leaves if cid in allowed]
+        return leaves
+
+    def _iter_texts(self, query: SearchQuery) -> Iterator[tuple[str, str, str]]:
+        leaves = self._chapters(query)
+        for i in range(0, len(leaves), READ_BATCH):
+            batch = leaves[i : i + READ_BATCH]
+            texts = self.store.read_chapters([cid for cid, _ in batch])
+            for cid, title in batch:
+                yield cid, title, texts.get(cid, "")
+
+    def iter_matches(self, query: SearchQuery, replacement: str | None = None, context: int = CONTEXT_CHARS) -> Iterator[FindMatch]:
+        """边读边产出匹配；给出 replacement 时附带替换后的预览。"""
+        pattern = query.compile()
+        for cid, title, text in self._iter_texts(query):
+            if query.literal is not None and query.literal not in text:
+                continue
+            for m in pattern.finditer(text):
+                if m.start() == m.end():
+                    continue
+                repl = None
+                if replacement is not None:
+                    repl = m.expand(replacement) if query.regex else replacement
+                yield FindMatch(
+                    chapter_id=cid,
+                    chapter_title=title,
+                    start=m.start(),
+                    end=m.end(),
+                    text=m.group(0),
+                    before=text[max(0, m.start() - context) : m.start()],
+                    after=text[m.end() : m.end() + context],
+                    replacement=repl,
+                )
+
+    @timed("search.replace_all")
+    def replace_all(
+        self,
+        query: SearchQuery,
+        replacement: str,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> ReplaceBatch:
+        """逐批替换并写回；每批先写替换前快照再写正文，最后记录整批以便撤销。"""
+        pattern = query.compile()
+        replaced = 0
+
+        def repl(m: re.Match[str]) -> str:
+            # 与 iter_matches 一致：空匹配（如 "x*"、"^"）原样保留，不计数
+            nonlocal replaced
+            if m.start() == m.end():
+                return ""
+            replaced += 1
+            return m.expand(replacement) if query.regex else replacement
+
+        batch = ReplaceBatch(
+            id=str(uuid.uuid4()),
+            created_at=now_iso(),
+            query=query.text,
+            replacement=replacement,
+            regex=query.regex,
+        )
+        total = len(self._chapters(query))
+        done = 0
+        pending: list[tuple[str, str, str, int]] = []
+
+        def flush() -> None:
+            entries = self.versions.snapshot_many((cid, old, word_count(old)) for cid, old, _new, _n in pending)
+            self.store.write_chapters((cid, new) for cid, _old, new, _n in pending)
+            for (cid, _old, new, n), e in zip(pending, entries):
+                batch.chapters.append({"chapter_id": cid, "version_id": e.id, "count": n, "words": word_count(new)})
+            pending.clear()
+
+        for cid, _title, text in self._iter_texts(query):
+            done += 1
+            if query.literal is None or query.literal in text:
+                replaced = 0
+                new = pattern.sub(repl, text)
+                n = replaced
+                if n and new != text:
+                    pending.append((cid, text, new, n))
+                    if len(pending) >= READ_BATCH:
+                        flush()
+            if on_progress is not None and done % 50 == 0:
+                on_progress(done, total)
+        if pending:
+            flush()
+
+        if batch.chapters:
+            self._record(batch)
+        if on_progress is not None:
+            on_progress(total, total)
+        return batch
+
+    def _load_batches(self) -> list[dict]:
+        try:
+            return json.loads(self.batches_path.read_text(encoding="utf-8") or "[]")
+        except Exception:
+            return []
+
+    def _save_batches(self, rows: list[dict]) -> None:
+        self.batches_path.write_text(json.dumps(rows[-MAX_BATCHES:], ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    def _record(self, batch: ReplaceBatch) -> None:
+        rows = self._load_batches()
+        rows.append(batch.__dict__)
+        self._save_batches(rows)
+
+    def list_batches(self) -> list[ReplaceBatch]:
+        """最近的替换批次，新的在前。"""
+        return [ReplaceBatch(**r) for r in reversed(self._load_batches())]
+
+    @timed("search.undo_batch")
+    def undo_batch(self, batch_id: str) -> dict[str, int]:
+        """把整批涉及的章节恢复到替换前；恢复前先给当前内容留快照。返回 {chapter_id: 字数}。"""
+        rows = self._load_batches()
+        row = next((r for r in rows if r.get("id") == batch_id), None)
+        if row is None:
+            raise KeyError(batch_id)
+        batch = ReplaceBatch(**row)
+
+        entries = self.versions.get_many(c["version_id"] for c in batch.chapters)
+        restore: list[tuple[str, str]] = []
+        for c in batch.chapters:
+            e = entries.get(c["version_id"])
+            if e is not None:
+                restore.append((c["chapter_id"], self.versions.read_version(e)))
+
+        current = self.store.read_chapters(cid for cid, _ in restore)
+        self.versions.snapshot_many((cid, current.get(cid, ""), word_count(current.get(cid, ""))) for cid, _ in restore)
+        self.store.write_chapters(restore)
+
+        self._save_batches([r for r in rows if r.get("id") != batch_id])
+        return {cid: word_count(text) for cid, text in restore}
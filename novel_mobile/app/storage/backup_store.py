@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from app.constants import (
+    BACKUP_OBJECTS_DIRNAME,
+    BACKUP_POINTS_DIRNAME,
+    CHAPTERS_DIRNAME,
+    CHAPTERS_PACK_FILENAME,
+    PROJECT_META_FILENAME,
+    STATS_DIRNAME,
+    VERSIONS_DIRNAME,
+)
+from app.utils.paths import ensure_dir
+from app.utils.perf import timed
+
+# 参与备份的项目内容（相对项目目录）
+BACKUP_ITEMS = (PROJECT_META_FILENAME, CHAPTERS_PACK_FILENAME, CHAPTERS_DIRNAME, VERSIONS_DIRNAME, STATS_DIRNAME, "knowledge")
+
+
+@dataclass(frozen=True)
+class BackupPoint:
+    id: str
+    created_at: str
+    files: int
+    new_objects: int
+    new_bytes: int
+
+
+def _hash_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _obj_name(digest: str) -> str:
+    return f"{BACKUP_OBJECTS_DIRNAME}/{digest[:2]}/{digest}"
+
+
+class BackupStore:
+    """增量备份：内容寻址的对象库 + 每个备份点一份清单（相对路径 -> 哈希）。
+
+    - target 为目录（本地或 SD 卡）或 .zip 文件；zip 只追加新对象。
+    - 文件大小与修改时间都没变时直接沿用上一份清单里的哈希，不重新读文件。
+    - 备份点之间共享对象，所以每次只复制新增或改动过的内容。
+    """
+
+    def __init__(self, target: Path):
+        self.target = target
+        self.is_zip = target.suffix.lower() == ".zip"
+        if not self.is_zip:
+            ensure_dir(target / BACKUP_OBJECTS_DIRNAME)
+            ensure_dir(target / BACKUP_POINTS_DIRNAME)
+
+    # ---- 目标存储的读写（目录 / zip 两种） ----
+
+    def _names(self) -> set[str]:
+        if self.is_zip:
+            if not self.target.exists():
+                return set()
+            with zipfile.ZipFile(self.target) as z:
+                return set(z.namelist())
+        root = self.target
+        return {p.relative_to(root).as_posix() for d in (BACKUP_OBJECTS_DIRNAME, BACKUP_POINTS_DIRNAME) for p in (root / d).rglob("*") if p.is_file()}
+
+    def _read(self, name: str) -> bytes:
+        if self.is_zip:
+            with zipfile.ZipFile(self.target) as z:
+                return z.read(name)
+        return (self.target / name).read_bytes()
+
+    def list_points(self) -> list[BackupPoint]:
+        out: list[BackupPoint] = []
+        for name in sorted(self._names()):
+            if name.startswith(BACKUP_POINTS_DIRNAME + "/") and name.endswith(".json"):
+                d = json.loads(self._read(name).decode("utf-8"))
+                out.append(BackupPoint(**d["point"]))
+        out.sort(key=lambda p: p.created_at)
+        return out
+
+    def load_manifest(self, point_id: str) -> dict[str, dict]:
+        d = json.loads(self._read(f"{BACKUP_POINTS_DIRNAME}/{point_id}.json").decode("utf-8"))
+        return d["files"]
+
+    # ---- 备份 ----
+
+    @timed("backup.run")
+    def backup(self, project_dir: Path, on_progress: Callable[[int, int], None] | None = None) -> BackupPoint:
+        """on_progress(已复制, 待复制) 在复制新对象时回调；可在后台线程调用。"""
+        points = self.list_points()
+        prev = self.load_manifest(points[-1].id) if points else {}
+        existing = self._names()
+
+        files: dict[str, dict] = {}
+        to_copy: dict[str, Path] = {}
+        for item in BACKUP_ITEMS:
+            p = project_dir / item
+            if p.is_file():
+                candidates = [p]
+            elif p.is_dir():
+                candidates = sorted(x for x in p.rglob("*") if x.is_file())
+            else:
+                continue
+            for f in candidates:
+                rel = f.relative_to(project_dir).as_posix()
+                st = f.stat()
+                old = prev.get(rel)
+                if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                    digest = old["sha256"]
+                else:
+                    digest = _hash_file(f)
+                files[rel] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                obj = _obj_name(digest)
+                if obj not in existing and obj not in to_copy:
+                    to_copy[obj] = f
+
+        now = datetime.now()
+        point = BackupPoint(
+            id=now.strftime("%Y%m%dT%H%M%S%f"),
+            created_at=now.isoformat(timespec="seconds"),
+            files=len(files),
+            new_objects=len(to_copy),
+            new_bytes=sum(p.stat().st_size for p in to_copy.values()),
+        )
+        manifest = json.dumps({"point": point.__dict__, "files": files}, ensure_ascii=False).encode("utf-8")
+        manifest_name = f"{BACKUP_POINTS_DIRNAME}/{point.id}.json"
+
+        total = len(to_copy)
+        if self.is_zip:
+            ensure_dir(self.target.parent)
+            with zipfile.ZipFile(self.target, "a", compression=zipfile.ZIP_DEFLATED) as z:
+                for i, (obj, src) in enumerate(to_copy.items(), 1):
+                    z.write(src, obj)
+                    if on_progress is not None and i % 20 == 0:
+                        on_progress(i, total)
+                # 清单最后写：中途失败时不会出现引用缺失对象的备份点
+                z.writestr(manifest_name, manifest)
+        else:
+            for i, (obj, src) in enumerate(to_copy.items(), 1):
+                dst = self.target / obj
+                ensure_dir(dst.parent)
+                tmp = dst.with_suffix(".tmp")
+                shutil.copyfile(src, tmp)
+                tmp.replace(dst)
+                if on_progress is not None and i % 20 == 0:
+                    on_progress(i, total)
+            (self.target / manifest_name).write_bytes(manifest)
+        if on_progress is not None:
+            on_progress(total, total)
+        return point
+
+    # ---- 恢复 ----
+
+    @timed("backup.restore")
+    def restore(self, point_id: str, project_dir: Path, on_progress: Callable[[int, int], None] | None = None) -> int:
+        """把项目目录恢复到某个备份点；备份点之后新增的文件会被删除。返回写入的文件数。
+
+        on_progress(已检查, 文件总数) 可在后台线程回调。
+        """
+        files = self.load_manifest(point_id)
+        ensure_dir(project_dir)
+
+        # 先删掉备份点里没有的文件（只限备份范围内）
+        for item in BACKUP_ITEMS:
+            p = project_dir / item
+            existing = [p] if p.is_file() else (list(p.rglob("*")) if p.is_dir() else [])
+            for f in existing:
+                if f.is_file() and f.relative_to(project_dir).as_posix() not in files:
+                    f.unlink()
+
+        written = 0
+        total = len(files)
+        zf = zipfile.ZipFile(self.target) if self.is_zip else None
+        try:
+            for i, (rel, meta) in enumerate(files.items(), 1):
+                if on_progress is not None and i % 20 == 0:
+                    on_progress(i, total)
+                dst = project_dir / rel
+                if dst.is_file() and dst.stat().st_size == meta["size"] and _hash_file(dst) == meta["sha256"]:
+                    continue
+                obj = _obj_name(meta["sha256"])
+                ensure_dir(dst.parent)
+                tmp = dst.with_name(dst.name + ".restore-tmp")
+                if zf is not None:
+                    tmp.write_bytes(zf.read(obj))
+                else:
+                    shutil.copyfile(self.target / obj, tmp)
+                tmp.replace(dst)
+                written += 1
+        finally:
+            if zf is not None:
+                zf.close()
+        if on_progress is not None:
+            on_progress(total, total)
+        return written
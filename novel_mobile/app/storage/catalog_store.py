@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+from app.constants import CATALOG_FILENAME, PROJECT_META_FILENAME, PROJECTS_DIRNAME
+from app.storage.chapter_backend import open_chapter_backend
+from app.storage.project_store import ProjectStore
+from app.utils.paths import ensure_dir
+from app.utils.perf import timed
+from app.utils.text import word_count
+
+
+@dataclass(frozen=True)
+class ProjectSummary:
+    name: str
+    title: str
+    chapter_count: int
+    total_words: int
+    updated_at: str
+
+
+_BAD_NAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def safe_project_name(title: str) -> str:
+    """书名转目录名：去掉文件系统不允许的字符。"""
+    name = _BAD_NAME_RE.sub("_", (title or "").strip()).strip(". ")
+    return name or "未命名"
+
+
+class CatalogStore:
+    """data_root()/catalog.json：缓存每本书的标题、章节数、总字数和修改时间。
+
+    书架列表只读这个文件；只有缓存里没有的项目目录才会打开 project.json 扫描一次。
+    """
+
+    def __init__(self, root: Path):
+        self.projects_dir = ensure_dir(root / PROJECTS_DIRNAME)
+        self.path = root / CATALOG_FILENAME
+        self._data: dict | None = None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            try:
+                d = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                d = {}
+            self._data = {"last_project": d.get("last_project"), "projects": dict(d.get("projects") or {})}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.write_text(json.dumps(self._load(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def project_dir(self, name: str) -> Path:
+        return self.projects_dir / name
+
+    @property
+    def last_project(self) -> str | None:
+        name = self._load().get("last_project")
+        return str(name) if name else None
+
+    def set_last_project(self, name: str) -> None:
+        d = self._load()
+        if d.get("last_project") != name:
+            d["last_project"] = name
+            self._save()
+
+    @timed("catalog.list")
+    def list_projects(self) -> list[ProjectSummary]:
+        d = self._load()
+        rows = d["projects"]
+        on_disk = {p.name for p in self.projects_dir.iterdir() if p.is_dir()}
+        changed = False
+        for name in list(rows):
+            if name not in on_disk:
+                del rows[name]
+                changed = True
+        for name in sorted(on_disk - set(rows)):
+            rows[name] = asdict(self._scan(name))
+            changed = True
+        if changed:
+            self._save()
+        out = [ProjectSummary(**r) for r in rows.values()]
+        out.sort(key=lambda s: s.updated_at, reverse=True)
+        return out
+
+    def update(self, name: str, **fields) -> None:
+        """增量更新一本书的摘要；除 updated_at 外没有变化时不写盘。"""
+        rows = self._load()["projects"]
+        old = rows.get(name)
+        cur = ProjectSummary(**old) if old else ProjectSummary(name=name, title=name, chapter_count=0, total_words=0, updated_at="")
+        new = replace(cur, **fields)
+        if old and replace(new, updated_at=cur.updated_at) == cur:
+            return
+        rows[name] = asdict(new)
+        self._save()
+
+    def remove(self, name: str) -> None:
+        rows = self._load()["projects"]
+        if rows.pop(name, None) is not None:
+            self._save()
+
+    @timed("catalog.scan")
+    def _scan(self, name: str) -> ProjectSummary:
+        """慢路径：打开项目统计章节与字数。仅用于缓存中缺失的项目；只读，不在项目目录里建任何东西。"""
+        d = self.project_dir(name)
+        if not (d / PROJECT_META_FILENAME).exists():
+            return ProjectSummary(name=name, title=name, chapter_count=0, total_words=0, updated_at="")
+        store = ProjectStore(d, backend=open_chapter_backend(d, readonly=True))
+        try:
+            proj = store.load()
+            ids: list[str] = []
+            stack = [proj.root]
+            while stack:
+                n = stack.pop()
+                if not n.is_folder:
+                    ids.append(n.id)
+                stack.extend(n.children)
+            total = 0
+            for i in range(0, len(ids), 200):
+                total += sum(word_count(t) for t in store.read_chapters(ids[i : i + 200]).values())
+            return ProjectSummary(name=name, title=proj.title, chapter_count=len(ids), total_words=total, updated_at=proj.updated_at)
+        finally:
+            store.close()
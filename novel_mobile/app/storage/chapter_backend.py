@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable
+
+from app.constants import CHAPTER_CODEC, CHAPTERS_DIRNAME, CHAPTERS_PACK_FILENAME
+from app.storage.codec import decode_bytes, encode_text
+from app.utils.paths import ensure_dir
+
+
+class ChapterBackend:
+    """章节正文的存储后端：目录（每章一个 .md）或单文件打包。"""
+
+    kind: str = ""
+
+    def read(self, chapter_id: str) -> str:
+        raise NotImplementedError
+
+    def write(self, chapter_id: str, text: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, chapter_id: str) -> None:
+        raise NotImplementedError
+
+    def ids(self) -> list[str]:
+        raise NotImplementedError
+
+    def read_many(self, chapter_ids: Iterable[str]) -> dict[str, str]:
+        return {cid: self.read(cid) for cid in chapter_ids}
+
+    def write_many(self, items: Iterable[tuple[str, str]]) -> None:
+        for cid, text in items:
+            self.write(cid, text)
+
+    def flush(self) -> None:
+        """确保已写入的内容都落到主存储文件（备份前调用）。"""
+
+    def compact(self, min_free_pages: int = 0) -> int:
+        """回收存储里的空闲空间，返回回收的页数；没有可回收的返回 0。"""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class DirChapterBackend(ChapterBackend):
+    """每章一个明文 .md，外部编辑器和同步盘可以直接看、直接改。
+
+    不压缩；早先版本压缩写入的文件仍能读出，下次保存时写回明文。
+    """
+
+    kind = "dir"
+
+    def __init__(self, project_dir: Path, readonly: bool = False):
+        # 只读打开（书架扫描）时不建 chapters/ 目录
+        self.dir = project_dir / CHAPTERS_DIRNAME if readonly else ensure_dir(project_dir / CHAPTERS_DIRNAME)
+
+    def path(self, chapter_id: str) -> Path:
+        return self.dir / f"{chapter_id}.md"
+
+    def read(self, chapter_id: str) -> str:
+        p = self.path(chapter_id)
+        if not p.exists():
+            return ""
+        return decode_bytes(p.read_bytes())
+
+    def write(self, chapter_id: str, text: str) -> None:
+        self.path(chapter_id).write_bytes(encode_text(text, "plain"))
+
+    def delete(self, chapter_id: str) -> None:
+        p = self.path(chapter_id)
+        if p.exists():
+            p.unlink()
+
+    def ids(self) -> list[str]:
+        return sorted(p.stem for p in self.dir.glob("*.md"))
+
+
+class PackChapterBackend(ChapterBackend):
+    """所有章节存进一个 SQLite 文件，避免几千个小文件的打开开销。"""
+
+    kind = "pack"
+
+    def __init__(self, project_dir: Path, codec: str = CHAPTER_CODEC, readonly: bool = False):
+        self.path = project_dir / CHAPTERS_PACK_FILENAME
+        self.codec = codec
+        self._lock = threading.Lock()
+        if readonly:
+            # WAL 库只读打开也会建 -shm/-wal；没有未合并的 WAL 时按不可变文件打开，什么也不留下
+            wal = self.path.with_name(self.path.name + "-wal").exists()
+            uri = f"{self.path.as_uri()}?mode=ro" + ("" if wal else "&immutable=1")
+            self._db = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+            return
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS chapters (id TEXT PRIMARY KEY, body BLOB NOT NULL)")
+
+    def read(self, chapter_id: str) -> str:
+        with self._lock:
+            row = self._db.execute("SELECT body FROM chapters WHERE id=?", (chapter_id,)).fetchone()
+        if row is None:
+            return ""
+        return decode_bytes(bytes(row[0]))
+
+    def read_many(self, chapter_ids: Iterable[str]) -> dict[str, str]:
+        ids = list(chapter_ids)
+        out = {cid: "" for cid in ids}
+        # SQLite 默认最多 999 个参数，分批查询
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                batch = ids[i : i + 500]
+                marks = ",".join("?" * len(batch))
+                for cid, body in self._db.execute(f"SELECT id, body FROM chapters WHERE id IN ({marks})", batch):
+                    out[cid] = decode_bytes(bytes(body))
+        return out
+
+    def write(self, chapter_id: str, text: str) -> None:
+        self.write_many([(chapter_id, text)])
+
+    def write_many(self, items: Iterable[tuple[str, str]]) -> None:
+        rows = [(cid, encode_text(text, self.codec)) for cid, text in items]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO chapters (id, body) VALUES (?, ?)", rows)
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def delete(self, chapter_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM chapters WHERE id=?", (chapter_id,))
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT id FROM chapters ORDER BY id")]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def compact(self, min_free_pages: int = 0) -> int:
+        """回收删除/覆盖留下的空闲页，并把 WAL 合并回主文件；空闲页不到 min_free_pages 时什么也不做。"""
+        with self._lock:
+            free = self._db.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free or free < min_free_pages:
+                return 0
+            # execute() 只单步执行一次，每步只回收一页；executescript 会跑完整条语句
+            self._db.executescript("PRAGMA incremental_vacuum;")
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return free
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_chapter_backend(project_dir: Path, codec: str = CHAPTER_CODEC, readonly: bool = False) -> ChapterBackend:
+    """已有打包文件就用打包后端，否则用目录布局。readonly=True 时不创建任何文件或目录。"""
+    if (project_dir / CHAPTERS_PACK_FILENAME).exists():
+        return PackChapterBackend(project_dir, codec, readonly=readonly)
+    return DirChapterBackend(project_dir, readonly=readonly)
+
+
+def migrate_chapters(project_dir: Path, to: str, codec: str = CHAPTER_CODEC) -> ChapterBackend:
+    """在目录布局与打包文件之间迁移章节正文，返回迁移后的后端。
+
+    先完整写入目标，再删除源数据；中途失败时源数据保持不变。
+    """
+    if to not in ("dir", "pack"):
+        raise ValueError(f"未知的章节存储：{to}")
+    src = open_chapter_backend(project_dir, codec)
+    if src.kind == to:
+        return src
+
+    dst: ChapterBackend = PackChapterBackend(project_dir, codec) if to == "pack" else DirChapterBackend(project_dir)
+
+    ids = src.ids()
+    try:
+        for i in range(0, len(ids), 200):
+            dst.write_many(src.read_many(ids[i : i + 200]).items())
+    except Exception:
+        dst.close()
+        if to == "pack":
+            _remove_pack(project_dir)
+        raise
+
+    src.close()
+    if isinstance(src, DirChapterBackend):
+        for cid in ids:
+            src.delete(cid)
+    else:
+        _remove_pack(project_dir)
+    return dst
+
+
+def _remove_pack(project_dir: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        p = project_dir / (CHAPTERS_PACK_FILENAME + suffix)
+        if p.exists():
+            p.unlink()
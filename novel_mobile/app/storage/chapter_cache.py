@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+
+class ChapterCache:
+    """章节正文 LRU 缓存，按总字符数而不是条目数限额。
+
+    每个章节有一个写入代号：写入/删除时递增。后台预取先记下代号再读盘，
+    放回缓存时代号已变就丢弃，避免旧内容覆盖刚写入的新内容。
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max(0, int(max_chars))
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._chars = 0
+        self._gen: dict[str, int] = {}
+
+    def __contains__(self, chapter_id: str) -> bool:
+        with self._lock:
+            return chapter_id in self._items
+
+    @property
+    def chars(self) -> int:
+        return self._chars
+
+    def get(self, chapter_id: str) -> str | None:
+        with self._lock:
+            text = self._items.get(chapter_id)
+            if text is not None:
+                self._items.move_to_end(chapter_id)
+            return text
+
+    def generation(self, chapter_id: str) -> int:
+        with self._lock:
+            return self._gen.get(chapter_id, 0)
+
+    def put(self, chapter_id: str, text: str) -> None:
+        with self._lock:
+            self._gen[chapter_id] = self._gen.get(chapter_id, 0) + 1
+            self._store(chapter_id, text)
+
+    def put_if_current(self, chapter_id: str, text: str, generation: int) -> bool:
+        with self._lock:
+            if self._gen.get(chapter_id, 0) != generation:
+                return False
+            self._store(chapter_id, text)
+            return True
+
+    def invalidate(self, chapter_id: str) -> None:
+        with self._lock:
+            self._gen[chapter_id] = self._gen.get(chapter_id, 0) + 1
+            old = self._items.pop(chapter_id, None)
+            if old is not None:
+                self._chars -= len(old)
+
+    def clear(self) -> None:
+        with self._lock:
+            for cid in self._items:
+                self._gen[cid] = self._gen.get(cid, 0) + 1
+            self._items.clear()
+            self._chars = 0
+
+    def _store(self, chapter_id: str, text: str) -> None:
+        old = self._items.pop(chapter_id, None)
+        if old is not None:
+            self._chars -= len(old)
+        if len(text) > self.max_chars:
+            return
+        self._items[chapter_id] = text
+        self._chars += len(text)
+        while self._chars > self.max_chars and self._items:
+            _, evicted = self._items.popitem(last=False)
+            self._chars -= len(evicted)
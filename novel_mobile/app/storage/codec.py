@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import zlib
+
+from app.constants import COMPRESS_MIN_BYTES
+
+# 压缩文件头：NUL 开头，正常的 UTF-8 正文不会以它开始，旧的纯文本文件因此可直接识别
+MAGIC = b"\x00NVC"
+_ZLIB = b"z"
+_LZMA = b"x"
+
+CODECS = ("plain", "auto", "zlib", "lzma")
+
+
+def _lzma():
+    """按需导入：Android 打包默认不带 liblzma，模块级导入会让应用直接起不来。"""
+    try:
+        import lzma
+    except ImportError:
+        return None
+    return lzma
+
+
+def parse_codec(spec: str) -> tuple[str, int | None]:
+    """"zlib:9" -> ("zlib", 9)；不带级别时使用各算法默认值。"""
+    name, _, level = (spec or "plain").partition(":")
+    name = name.strip().lower()
+    if name not in CODECS:
+        raise ValueError(f"未知的编码：{spec}")
+    return name, (int(level) if level else None)
+
+
+def encode_text(text: str, codec: str = "auto") -> bytes:
+    raw = (text or "").encode("utf-8")
+    name, level = parse_codec(codec)
+    if name == "plain":
+        return raw
+    if name == "auto":
+        if len(raw) < COMPRESS_MIN_BYTES:
+            return raw
+        name = "zlib"
+
+    lzma = _lzma() if name == "lzma" else None
+    if lzma is not None:
+        packed = MAGIC + _LZMA + lzma.compress(raw, preset=6 if level is None else level)
+    else:
+        # 没有 lzma 时退回 zlib；zlib 的级别上限也是 9，lzma 的级别可以照用
+        packed = MAGIC + _ZLIB + zlib.compress(raw, 6 if level is None else level)
+    # 压不动的内容（很短或已是乱码）保持明文
+    return packed if len(packed) < len(raw) else raw
+
+
+def decode_bytes(data: bytes) -> str:
+    if not data.startswith(MAGIC):
+        return data.decode("utf-8")
+    kind = data[len(MAGIC) : len(MAGIC) + 1]
+    body = data[len(MAGIC) + 1 :]
+    if kind == _ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    if kind == _LZMA:
+        lzma = _lzma()
+        if lzma is None:
+            raise ValueError("此内容用 lzma 压缩，但当前环境缺少 lzma 模块")
+        return lzma.decompress(body).decode("utf-8")
+    raise ValueError(f"未知的压缩格式：{kind!r}")
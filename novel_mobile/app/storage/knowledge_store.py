@@ -5,6 +5,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from app.utils.paths import ensure_dir
+from app.utils.perf import timed
 
 
 @dataclass(frozen=True)
@@ -30,6 +31,7 @@ class KnowledgeStore:
                 encoding="utf-8",
             )
 
+    @timed("knowledge.load")
     def load(self) -> KnowledgeBase:
         try:
             d = json.loads(self.path.read_text(encoding="utf-8"))
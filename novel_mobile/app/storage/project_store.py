@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import json
+import threading
 import uuid
 from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterable
 
-from app.constants import CHAPTERS_DIRNAME, PROJECT_META_FILENAME
+from app.constants import CHAPTER_CACHE_MAX_CHARS, CHAPTER_CODEC, PROJECT_META_FILENAME, PROJECT_STATE_FILENAME
 from app.models import ChapterNode, Project, project_from_dict, project_to_dict
-from app.utils.paths import ensure_dir
+from app.storage.chapter_backend import ChapterBackend, DirChapterBackend, open_chapter_backend
+from app.storage.chapter_cache import ChapterCache
+from app.utils.perf import timed
 
 
 def now_iso() -> str:
@@ -16,10 +20,22 @@ def now_iso() -> str:
 
 
 class ProjectStore:
-    def __init__(self, project_dir: Path):
+    def __init__(self, project_dir: Path, backend: ChapterBackend | None = None, codec: str = CHAPTER_CODEC):
         self.project_dir = project_dir
         self.meta_path = project_dir / PROJECT_META_FILENAME
-        self.chapters_dir = ensure_dir(project_dir / CHAPTERS_DIRNAME)
+        self.state_path = project_dir / PROJECT_STATE_FILENAME
+        self._state: dict | None = None
+        self.backend = backend or open_chapter_backend(project_dir, codec)
+        self.cache = ChapterCache(CHAPTER_CACHE_MAX_CHARS)
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_queue: list[str] = []
+        self._prefetch_thread: threading.Thread | None = None
+        # 写盘后回调 (章节 id 列表, 是否写了 project.json)；外部变更监视靠它认出自己的写入
+        self.on_write: Callable[[list[str], bool], None] | None = None
+
+    def _notify(self, chapter_ids: list[str], meta: bool = False) -> None:
+        if self.on_write is not None:
+            self.on_write(chapter_ids, meta)
 
     def exists(self) -> bool:
         return self.meta_path.exists()
@@ -31,24 +47,120 @@ class ProjectStore:
         self.save(p)
         return p
 
+    @timed("project.load")
     def load(self) -> Project:
         with self.meta_path.open("r", encoding="utf-8") as f:
             d = json.load(f)
         return project_from_dict(d)
 
+    @timed("project.save")
     def save(self, p: Project) -> None:
         p2 = replace(p, updated_at=now_iso())
         with self.meta_path.open("w", encoding="utf-8") as f:
-            json.dump(project_to_dict(p2), f, ensure_ascii=False, indent=2)
+            json.dump(project_to_dict(p2), f, ensure_ascii=False, separators=(",", ":"))
+        self._notify([], meta=True)
+
+    def load_state(self) -> dict:
+        """界面状态（如上次打开的章节），与 project.json 分开存放。"""
+        if self._state is None:
+            try:
+                self._state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            except Exception:
+                self._state = {}
+        return dict(self._state)
+
+    def save_state(self, updates: dict) -> None:
+        state = self.load_state()
+        if all(state.get(k) == v for k, v in updates.items()):
+            return
+        state.update(updates)
+        self._state = state
+        self.state_path.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
 
-    def chapter_path(self, chapter_id: str) -> Path:
-        return self.chapters_dir / f"{chapter_id}.md"
+    def chapter_path(self, chapter_id: str) -> Path | None:
+        """目录布局下的章节文件路径；打包存储时返回 None。"""
+        if isinstance(self.backend, DirChapterBackend):
+            return self.backend.path(chapter_id)
+        return None
 
+    @timed("project.read_chapter")
     def read_chapter(self, chapter_id: str) -> str:
-        path = self.chapter_path(chapter_id)
-        if not path.exists():
-            return ""
-        return path.read_text(encoding="utf-8")
+        text = self.cache.get(chapter_id)
+        if text is not None:
+            return text
+        gen = self.cache.generation(chapter_id)
+        text = self.backend.read(chapter_id)
+        self.cache.put_if_current(chapter_id, text, gen)
+        return text
 
+    @timed("project.read_chapters")
+    def read_chapters(self, chapter_ids: Iterable[str]) -> dict[str, str]:
+        # 批量读取（导出、统计）不回填缓存，避免把正在编辑的章节挤出去
+        out: dict[str, str] = {}
+        missing: list[str] = []
+        for cid in chapter_ids:
+            text = self.cache.get(cid)
+            if text is None:
+                missing.append(cid)
+            else:
+                out[cid] = text
+        if missing:
+            out.update(self.backend.read_many(missing))
+        return out
+
+    @timed("project.write_chapter")
     def write_chapter(self, chapter_id: str, text: str) -> None:
-        self.chapter_path(chapter_id).write_text(text or "", encoding="utf-8")
+        self.cache.invalidate(chapter_id)
+        self.backend.write(chapter_id, text or "")
+        self.cache.put(chapter_id, text or "")
+        self._notify([chapter_id])
+
+    @timed("project.write_chapters")
+    def write_chapters(self, items: Iterable[tuple[str, str]]) -> None:
+        rows = list(items)
+        for cid, _ in rows:
+            self.cache.invalidate(cid)
+        self.backend.write_many(rows)
+        self._notify([cid for cid, _ in rows])
+
+    @timed("project.delete_chapter")
+    def delete_chapter(self, chapter_id: str) -> None:
+        self.cache.invalidate(chapter_id)
+        self.backend.delete(chapter_id)
+        self._notify([chapter_id])
+
+    def prefetch(self, chapter_ids: Iterable[str]) -> None:
+        """在后台线程把章节读进缓存；新的请求会替换尚未处理的旧请求。"""
+        with self._prefetch_lock:
+            self._prefetch_queue = [cid for cid in chapter_ids if cid not in self.cache]
+            if not self._prefetch_queue:
+                return
+            if self._prefetch_thread is None or not self._prefetch_thread.is_alive():
+                self._prefetch_thread = threading.Thread(target=self._prefetch_worker, name="chapter-prefetch", daemon=True)
+                self._prefetch_thread.start()
+
+    def _prefetch_worker(self) -> None:
+        while True:
+            with self._prefetch_lock:
+                if not self._prefetch_queue:
+                    self._prefetch_thread = None
+                    return
+                cid = self._prefetch_queue.pop(0)
+            if cid in self.cache:
+                continue
+            gen = self.cache.generation(cid)
+            try:
+                text = self.backend.read(cid)
+            except Exception:
+                continue
+            self.cache.put_if_current(cid, text, gen)
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def compact(self, min_free_pages: int = 0) -> int:
+        return self.backend.compact(min_free_pages)
+
+    def close(self) -> None:
+        self.cache.clear()
+        self.backend.close()
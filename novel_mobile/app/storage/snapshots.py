@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+from app.constants import (
+    SNAPSHOT_BIG_CHANGE_CHARS,
+    SNAPSHOT_IDLE_SECONDS,
+    SNAPSHOT_MAX_SECONDS,
+    SNAPSHOT_MIN_CHANGED_CHARS,
+    VERSION_SNAPSHOT_MIN_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from app.storage.version_store import VersionStore
+
+log = logging.getLogger("novel.snapshots")
+
+
+class SnapshotScheduler:
+    """决定当前章节什么时候值得留一个版本。
+
+    changed 是编辑器累计的改动字符数（PieceTable.changed_chars，分页模式含已换出的页），
+    与上次快照时的值之差就是这段时间的改动量：
+    - 一次改动超过 big_chars（大段粘贴/删除）：立即快照；
+    - 停笔超过 idle_seconds，且改动超过 min_chars、距上次快照超过 min_seconds：快照；
+    - 有改动但一直没到阈值：停笔时最多每 max_seconds 补一个；
+    - 切章/关闭时：改动超过 min_chars 或距上次快照超过 max_seconds 就补一个。
+    """
+
+    def __init__(
+        self,
+        min_chars: int = SNAPSHOT_MIN_CHANGED_CHARS,
+        big_chars: int = SNAPSHOT_BIG_CHANGE_CHARS,
+        idle_seconds: float = SNAPSHOT_IDLE_SECONDS,
+        min_seconds: float = VERSION_SNAPSHOT_MIN_SECONDS,
+        max_seconds: float = SNAPSHOT_MAX_SECONDS,
+    ):
+        self.min_chars = min_chars
+        self.big_chars = big_chars
+        self.idle_seconds = idle_seconds
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.last_snapshot: dict[str, float] = {}
+        self.chapter_id: str | None = None
+        self.mark = 0
+        self._seen = 0
+        self._last_edit = 0.0
+
+    def begin(self, chapter_id: str | None, now: float) -> None:
+        """打开（或重新载入）一章：编辑器的改动计数从 0 开始。
+
+        本次会话还没给这章留过版本时，max_seconds 从打开时算起，
+        免得改一个字也因为“距上次快照很久”而立即快照。
+        """
+        self.chapter_id = chapter_id
+        if chapter_id is not None:
+            self.last_snapshot.setdefault(chapter_id, now)
+        self.mark = 0
+        self._seen = 0
+        self._last_edit = now
+
+    def observe(self, changed: int, now: float) -> None:
+        # 两次观察之间计数变了就算有输入；精度就是自动保存的间隔
+        if changed != self._seen:
+            self._seen = changed
+            self._last_edit = now
+
+    def due(self, changed: int, now: float, leaving: bool = False) -> bool:
+        if self.chapter_id is None:
+            return False
+        self.observe(changed, now)
+        delta = changed - self.mark
+        if delta <= 0:
+            return False
+        if delta >= self.big_chars:
+            return True
+        since = now - self.last_snapshot.get(self.chapter_id, 0.0)
+        if leaving:
+            return delta >= self.min_chars or since >= self.max_seconds
+        if now - self._last_edit < self.idle_seconds:
+            return False
+        return (delta >= self.min_chars and since >= self.min_seconds) or since >= self.max_seconds
+
+    def taken(self, changed: int, now: float) -> None:
+        self.mark = changed
+        if self.chapter_id is not None:
+            self.last_snapshot[self.chapter_id] = now
+
+    def clear(self) -> None:
+        self.last_snapshot.clear()
+        self.begin(None, 0.0)
+
+
+class SnapshotWriter:
+    """后台线程按顺序写快照；界面线程只负责把正文字符串交过来。"""
+
+    def __init__(self, versions: VersionStore):
+        self.versions = versions
+        self._queue: queue.Queue[tuple[str, str, int]] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, chapter_id: str, content: str, word_count: int) -> None:
+        with self._lock:
+            self._queue.put((chapter_id, content, word_count))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            try:
+                cid, content, wc = self._queue.get(timeout=5.0)
+            except queue.Empty:
+                # 空闲一段时间后线程退出；与 submit 在同一把锁下判断，不会漏掉刚入队的任务
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            try:
+                self.versions.snapshot(cid, content, wc)
+            except Exception:
+                log.exception("snapshot failed for %s", cid)
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """等排队的快照都写完（切项目、退出前调用）。"""
+        self._queue.join()
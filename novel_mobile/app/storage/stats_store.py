@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 from app.constants import STATS_DIRNAME
 from app.utils.paths import ensure_dir
+from app.utils.perf import timed
+
+
+BUCKETS_VERSION = 1
+# 各视图覆盖的天数；"all" 按月聚合
+VIEW_DAYS = {"week": 7, "month": 30, "year": 365}
 
 
 def today_key() -> str:
@@ -16,9 +22,12 @@ class StatsStore:
     def __init__(self, project_dir: Path):
         self.stats_dir = ensure_dir(project_dir / STATS_DIRNAME)
         self.path = self.stats_dir / "word_history.json"
+        self.buckets_path = self.stats_dir / "progress_buckets.json"
         if not self.path.exists():
             self.path.write_text("[]", encoding="utf-8")
+        self._buckets: dict | None = None
 
+    @timed("stats.append_total")
     def append_total(self, total_words: int, ts: str) -> None:
         rows = self.load_history_raw()
         rows.append({"ts": ts, "total_words": int(total_words)})
@@ -26,25 +35,112 @@ class StatsStore:
             rows = rows[-20000:]
         self.path.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
 
+        # 原始记录会被截断，按天/按月的聚合桶则一直保留
+        b = self._load_buckets()
+        if self._add_to_buckets(b, ts, int(total_words)):
+            self._save_buckets(b)
+
+    @staticmethod
+    def _add_to_buckets(b: dict, ts: str, total: int) -> bool:
+        day = ts[:10] if len(ts) >= 10 else ""
+        if not day:
+            return False
+        lo_hi = b["days"].get(day)
+        if lo_hi is None:
+            lo_hi = b["days"][day] = [total, total]
+        old = lo_hi[1] - lo_hi[0]
+        lo_hi[0] = min(lo_hi[0], total)
+        lo_hi[1] = max(lo_hi[1], total)
+        month = day[:7]
+        b["months"][month] = b["months"].get(month, 0) + (lo_hi[1] - lo_hi[0]) - old
+        return True
+
+    def _load_buckets(self) -> dict:
+        if self._buckets is not None:
+            return self._buckets
+        b = None
+        try:
+            d = json.loads(self.buckets_path.read_text(encoding="utf-8"))
+            if d.get("version") == BUCKETS_VERSION:
+                b = d
+        except Exception:
+            pass
+        if b is None:
+            # 首次使用（或格式升级）：从原始记录重建一次
+            b = {"version": BUCKETS_VERSION, "days": {}, "months": {}}
+            for r in self.load_history_raw():
+                self._add_to_buckets(b, str(r.get("ts", "")), int(r.get("total_words", 0)))
+            self._save_buckets(b)
+        self._buckets = b
+        return b
+
+    def _save_buckets(self, b: dict) -> None:
+        self.buckets_path.write_text(json.dumps(b, separators=(",", ":")), encoding="utf-8")
+
+    @timed("stats.rebuild_buckets")
+    def rebuild_buckets(self) -> int:
+        """按原始记录重算它仍覆盖的那几天，更早的日桶原样保留；返回重算的天数。
+
+        原始记录有条数上限，最早那一天可能只剩一部分，所以那天与旧桶取并集。
+        """
+        old = self._load_buckets()["days"]
+        fresh: dict = {"version": BUCKETS_VERSION, "days": {}, "months": {}}
+        for r in self.load_history_raw():
+            self._add_to_buckets(fresh, str(r.get("ts", "")), int(r.get("total_words", 0)))
+        if not fresh["days"]:
+            return 0
+
+        first = min(fresh["days"])
+        days = {d: v for d, v in old.items() if d < first}
+        days.update(fresh["days"])
+        if first in old:
+            lo, hi = old[first]
+            days[first] = [min(lo, days[first][0]), max(hi, days[first][1])]
+
+        months: dict[str, int] = {}
+        for d, (lo, hi) in days.items():
+            months[d[:7]] = months.get(d[:7], 0) + hi - lo
+        b = {"version": BUCKETS_VERSION, "days": days, "months": months}
+        self._save_buckets(b)
+        self._buckets = b
+        return len(fresh["days"])
+
+    @timed("stats.load_history_raw")
     def load_history_raw(self) -> list[dict]:
         try:
             return json.loads(self.path.read_text(encoding="utf-8") or "[]")
         except Exception:
             return []
 
+    @timed("stats.daily_progress")
     def daily_progress(self) -> dict[str, int]:
-        rows = self.load_history_raw()
-        by_day: dict[str, list[int]] = {}
-        for r in rows:
-            ts = str(r.get("ts", ""))
-            day = ts[:10] if len(ts) >= 10 else ""
-            if not day:
-                continue
-            by_day.setdefault(day, []).append(int(r.get("total_words", 0)))
-
-        out: dict[str, int] = {}
-        for day, vals in by_day.items():
-            if not vals:
-                continue
-            out[day] = max(vals) - min(vals)
-        return out
+        return {day: hi - lo for day, (lo, hi) in self._load_buckets()["days"].items()}
+
+    @timed("stats.progress_series")
+    def progress_series(self, view: str, today: date | None = None) -> tuple[list[str], list[int]]:
+        """某个视图的 (标签, 进度) 序列，缺失的日/月补 0。
+
+        week/month/year 按天，截止到今天；all 按月，从第一条记录开始。
+        """
+        b = self._load_buckets()
+        today = today or date.today()
+        if view == "all":
+            months = b["months"]
+            if not months:
+                return [], []
+            y, m = map(int, min(months).split("-"))
+            end = (today.year, today.month)
+            labels: list[str] = []
+            while (y, m) <= end:
+                labels.append(f"{y:04d}-{m:02d}")
+                y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+            return labels, [int(months.get(k, 0)) for k in labels]
+
+        n = VIEW_DAYS[view]
+        days = b["days"]
+        labels = [(today - timedelta(days=i)).isoformat() for i in range(n - 1, -1, -1)]
+        vals = []
+        for k in labels:
+            lo_hi = days.get(k)
+            vals.append(lo_hi[1] - lo_hi[0] if lo_hi else 0)
+        return labels, vals
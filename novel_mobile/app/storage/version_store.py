@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable
 
-from app.constants import VERSIONS_DIRNAME
+from app.constants import VERSION_CODEC, VERSIONS_DIRNAME
+from app.storage.codec import decode_bytes, encode_text
 from app.utils.paths import ensure_dir
+from app.utils.perf import timed
 
 
 def now_iso() -> str:
@@ -24,11 +29,15 @@ class VersionEntry:
 
 
 class VersionStore:
-    def __init__(self, project_dir: Path):
+    def __init__(self, project_dir: Path, codec: str = VERSION_CODEC, readonly: bool = False):
         self.project_dir = project_dir
-        self.versions_dir = ensure_dir(project_dir / VERSIONS_DIRNAME)
+        self.codec = codec
+        # 只读打开（一致性检查）时不建 versions/ 和空索引
+        self.versions_dir = project_dir / VERSIONS_DIRNAME if readonly else ensure_dir(project_dir / VERSIONS_DIRNAME)
         self.index_path = self.versions_dir / "versions.json"
-        if not self.index_path.exists():
+        # 快照可能在后台线程写入：索引的读-改-写都要在锁内
+        self._lock = threading.RLock()
+        if not readonly and not self.index_path.exists():
             self.index_path.write_text("[]", encoding="utf-8")
 
     def _load_index(self) -> list[dict]:
@@ -38,29 +47,62 @@ class VersionStore:
             return []
 
     def _save_index(self, rows: list[dict]) -> None:
-        self.index_path.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        # 先写临时文件再替换，别的线程/进程不会读到写了一半的索引
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.index_path)
 
+    def all_versions(self) -> list[VersionEntry]:
+        """索引里的全部版本记录（不分章节，按写入顺序）。"""
+        with self._lock:
+            rows = self._load_index()
+        return [VersionEntry(**r) for r in rows]
+
+    @timed("versions.list_versions")
     def list_versions(self, chapter_id: str) -> list[VersionEntry]:
-        rows = [r for r in self._load_index() if r.get("chapter_id") == chapter_id]
+        with self._lock:
+            rows = [r for r in self._load_index() if r.get("chapter_id") == chapter_id]
         rows.sort(key=lambda r: r.get("created_at", ""), reverse=True)
         return [VersionEntry(**r) for r in rows]
 
-    def snapshot(self, chapter_id: str, content: str, word_count: int) -> VersionEntry:
+    def _write_version(self, chapter_id: str, content: str, word_count: int) -> VersionEntry:
         vid = str(uuid.uuid4())
         created_at = now_iso()
         ensure_dir(self.versions_dir / chapter_id)
         rel_path = str(Path(chapter_id) / f"{created_at.replace(':', '-')}_{vid}.md")
         abs_path = self.versions_dir / rel_path
-        abs_path.write_text(content or "", encoding="utf-8")
+        abs_path.write_bytes(encode_text(content, self.codec))
+        return VersionEntry(id=vid, chapter_id=chapter_id, created_at=created_at, rel_path=rel_path, word_count=int(word_count))
 
-        entry = VersionEntry(id=vid, chapter_id=chapter_id, created_at=created_at, rel_path=rel_path, word_count=int(word_count))
-        rows = self._load_index()
-        rows.append(entry.__dict__)
-        self._save_index(rows)
+    @timed("versions.snapshot")
+    def snapshot(self, chapter_id: str, content: str, word_count: int) -> VersionEntry:
+        entry = self._write_version(chapter_id, content, word_count)
+        with self._lock:
+            rows = self._load_index()
+            rows.append(entry.__dict__)
+            self._save_index(rows)
         return entry
 
+    @timed("versions.snapshot_many")
+    def snapshot_many(self, items: Iterable[tuple[str, str, int]]) -> list[VersionEntry]:
+        """批量快照 (chapter_id, content, word_count)；索引只读写一次。"""
+        entries = [self._write_version(cid, content, wc) for cid, content, wc in items]
+        if entries:
+            with self._lock:
+                rows = self._load_index()
+                rows.extend(e.__dict__ for e in entries)
+                self._save_index(rows)
+        return entries
+
+    def get_many(self, version_ids: Iterable[str]) -> dict[str, VersionEntry]:
+        wanted = set(version_ids)
+        with self._lock:
+            rows = self._load_index()
+        return {r["id"]: VersionEntry(**r) for r in rows if r.get("id") in wanted}
+
+    @timed("versions.read_version")
     def read_version(self, entry: VersionEntry) -> str:
         p = self.versions_dir / entry.rel_path
         if not p.exists():
             return ""
-        return p.read_text(encoding="utf-8")
+        return decode_bytes(p.read_bytes())
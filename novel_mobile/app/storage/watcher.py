@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.constants import CHAPTERS_DIRNAME, PROJECT_META_FILENAME
+from app.utils.perf import timed
+
+# (mtime_ns, size)；文件不存在时为 None
+Stat = tuple[int, int] | None
+
+
+@dataclass
+class ChangeSet:
+    meta_changed: bool = False
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.meta_changed or bool(self.changed) or bool(self.removed)
+
+
+def _stat(path: Path) -> Stat:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ProjectWatcher:
+    """轮询项目目录，发现应用之外的改动（同步盘、其他编辑器）。
+
+    只比较 stat 的 (mtime_ns, size)，不读内容。应用自己写过的文件通过 absorb() 记入基线，
+    下一次轮询就不会当成外部改动。打包存储（chapters.db）时只看 project.json。
+    """
+
+    def __init__(self, project_dir: Path, watch_chapters: bool = True):
+        self.meta_path = project_dir / PROJECT_META_FILENAME
+        self.chapters_dir = project_dir / CHAPTERS_DIRNAME if watch_chapters else None
+        self._lock = threading.Lock()
+        self._meta: Stat = _stat(self.meta_path)
+        self._chapters: dict[str, tuple[int, int]] = self._scan_chapters()
+        # 应用自己最后一次写入后的 stat：扫描与写入交错时，靠它把自己的写入滤掉
+        self._own: dict[str, Stat] = {}
+        self._own_meta: Stat = self._meta
+
+    def _scan_chapters(self) -> dict[str, tuple[int, int]]:
+        out: dict[str, tuple[int, int]] = {}
+        if self.chapters_dir is None:
+            return out
+        try:
+            entries = os.scandir(self.chapters_dir)
+        except OSError:
+            return out
+        with entries:
+            for e in entries:
+                if not e.name.endswith(".md"):
+                    continue
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                out[e.name[:-3]] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def absorb(self, chapter_ids: list[str], meta: bool = False) -> None:
+        """应用自己刚写完这些文件：把当前 stat 记为基线。可在任意线程调用。"""
+        with self._lock:
+            if meta:
+                self._meta = self._own_meta = _stat(self.meta_path)
+            if self.chapters_dir is None:
+                return
+            for cid in chapter_ids:
+                st = _stat(self.chapters_dir / f"{cid}.md")
+                self._own[cid] = st
+                if st is None:
+                    self._chapters.pop(cid, None)
+                else:
+                    self._chapters[cid] = st
+
+    def is_stale(self, chapter_id: str) -> bool:
+        """章节文件的当前 stat 与基线不同：上次轮询/自己写入之后被外部改过（或删掉）。"""
+        if self.chapters_dir is None:
+            return False
+        st = _stat(self.chapters_dir / f"{chapter_id}.md")
+        with self._lock:
+            return st != self._chapters.get(chapter_id) and st != self._own.get(chapter_id, False)
+
+    def retry(self, chapter_ids: list[str], meta: bool = False) -> None:
+        """这次没能读进来（例如同步盘还没写完）：忘掉基线，下次轮询再报一次。"""
+        with self._lock:
+            if meta:
+                self._meta = self._own_meta = None
+            for cid in chapter_ids:
+                self._chapters.pop(cid, None)
+                self._own.pop(cid, None)
+
+    @timed("watcher.poll")
+    def poll(self) -> ChangeSet:
+        # 扫描不持锁，避免保存时主线程要等一整轮 stat
+        meta = _stat(self.meta_path)
+        current = self._scan_chapters()
+        cs = ChangeSet()
+        with self._lock:
+            own = self._own
+            if meta != self._meta:
+                cs.meta_changed = meta != self._own_meta
+                self._meta = meta
+            if self.chapters_dir is not None:
+                old = self._chapters
+                cs.changed = [cid for cid, st in current.items() if old.get(cid) != st and own.get(cid, False) != st]
+                cs.removed = [cid for cid in old if cid not in current and own.get(cid, False) is not None]
+                self._chapters = current
+        return cs
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import Mapping
+
+from app.models import ChapterNode
+
+
+class FolderTotals:
+    """每个文件夹（含根）的子树字数。
+
+    章节字数仍由调用方保存；这里只维护父链和文件夹合计，
+    单章变化沿父链上传，O(深度)。
+    """
+
+    def __init__(self, root: ChapterNode, counts: Mapping[str, int]):
+        self.root_id = root.id
+        self.parent: dict[str, str | None] = {root.id: None}
+        self.totals: dict[str, int] = {}
+        self._fill(root, counts)
+
+    def _fill(self, node: ChapterNode, counts: Mapping[str, int]) -> int:
+        if not node.is_folder and node.id != self.root_id:
+            return int(counts.get(node.id, 0))
+        total = 0
+        for c in node.children:
+            self.parent[c.id] = node.id
+            total += self._fill(c, counts)
+        self.totals[node.id] = total
+        return total
+
+    def total(self, folder_id: str) -> int:
+        return self.totals.get(folder_id, 0)
+
+    def add(self, node_id: str, delta: int) -> list[str]:
+        """某节点字数变化 delta：给所有祖先文件夹加上，返回被改动的文件夹 id。"""
+        changed: list[str] = []
+        if not delta:
+            return changed
+        p = self.parent.get(node_id)
+        while p is not None:
+            self.totals[p] += delta
+            changed.append(p)
+            p = self.parent.get(p)
+        return changed
+
+    def attach(self, node: ChapterNode, parent_id: str, counts: Mapping[str, int]) -> list[str]:
+        """挂上一个新节点（可带子树）。"""
+        self.parent[node.id] = parent_id
+        return self.add(node.id, self._fill(node, counts))
+
+    def detach(self, node: ChapterNode, counts: Mapping[str, int]) -> list[str]:
+        """摘掉一个节点及其子树；只减去它自己的合计，不重算。"""
+        sub = self.totals.get(node.id, 0) if node.is_folder else int(counts.get(node.id, 0))
+        changed = self.add(node.id, -sub)
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            self.parent.pop(n.id, None)
+            self.totals.pop(n.id, None)
+            stack.extend(n.children)
+        return changed
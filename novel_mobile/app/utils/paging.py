@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from app.utils.text import word_count
+
+
+def split_pages(text: str, page_chars: int) -> list[str]:
+    """按段落边界把正文切成大约 page_chars 字符的页；各页直接拼接即还原原文。"""
+    if not text:
+        return [""]
+    pages: list[str] = []
+    n = len(text)
+    i = 0
+    while i < n:
+        end = i + page_chars
+        if end >= n:
+            pages.append(text[i:])
+            break
+        cut = text.find("\n", end)
+        if cut == -1 or cut - end > page_chars:
+            # 超长段落：实在找不到换行就硬切
+            cut = text.rfind("\n", i, end)
+            if cut == -1:
+                cut = end - 1
+        pages.append(text[i : cut + 1])
+        i = cut + 1
+    return pages
+
+
+class PagedDocument:
+    """超长章节的分页模型：编辑器只装入 [start, start+count) 这几页。
+
+    窗口内的改动通过 commit_window 写回；窗口外的页保持不动，
+    因此 text() 总是完整正文，保存时不会丢失任何一页的修改。
+    """
+
+    def __init__(self, text: str, page_chars: int, window_pages: int = 3):
+        self.page_chars = page_chars
+        self.window_pages = max(1, window_pages)
+        self.pages = split_pages(text or "", page_chars)
+        self.page_words = [word_count(p) for p in self.pages]
+        self.start = 0
+        self.count = min(self.window_pages, len(self.pages))
+        self.dirty = False
+        # 已移出编辑器的窗口累计的改动字符数（快照判断用）
+        self.changed_chars = 0
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def at_top(self) -> bool:
+        return self.start == 0
+
+    @property
+    def at_bottom(self) -> bool:
+        return self.start + self.count >= len(self.pages)
+
+    def window_text(self) -> str:
+        return "".join(self.pages[self.start : self.start + self.count])
+
+    def words_outside_window(self) -> int:
+        return sum(self.page_words[: self.start]) + sum(self.page_words[self.start + self.count :])
+
+    def commit_window(self, text: str) -> None:
+        """用编辑器里的窗口文本替换窗口内的页，并重新切页。"""
+        new_pages = split_pages(text or "", self.page_chars)
+        self.pages[self.start : self.start + self.count] = new_pages
+        self.page_words[self.start : self.start + self.count] = [word_count(p) for p in new_pages]
+        self.count = len(new_pages)
+        self.dirty = True
+
+    def move_window(self, delta: int) -> int:
+        """窗口整体移动 delta 页并恢复默认页数；返回实际移动的页数。"""
+        old = self.start
+        self.count = min(self.window_pages, len(self.pages))
+        self.start = max(0, min(self.start + delta, len(self.pages) - self.count))
+        return self.start - old
+
+    def page_offset_in_window(self, page: int) -> int:
+        """第 page 页在当前窗口文本中的字符偏移。"""
+        return sum(len(p) for p in self.pages[self.start : page])
+
+    def text(self) -> str:
+        return "".join(self.pages)
+
+    def words(self) -> int:
+        return sum(self.page_words)
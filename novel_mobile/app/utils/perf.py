@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from app.constants import FRAME_BUDGET_MS, METRICS_BACKUP_COUNT, METRICS_FILE_MAX_BYTES
+
+log = logging.getLogger("novel.perf")
+
+# 直方图桶上界（毫秒），按 2 倍递增；最后一个桶收容所有更慢的记录
+BUCKETS_MS = tuple(0.25 * (2**i) for i in range(15))
+
+F = TypeVar("F", bound=Callable)
+
+
+class Histogram:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        i = 0
+        for bound in BUCKETS_MS:
+            if ms <= bound:
+                break
+            i += 1
+        self.buckets[i] += 1
+
+    def percentile(self, q: float) -> float:
+        """按桶估算分位数（返回所在桶的上界）。"""
+        if not self.count:
+            return 0.0
+        need = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= need:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Recorder:
+    """进程内的耗时统计：每个 span 名一个直方图，超过帧预算的记一条日志。"""
+
+    def __init__(self, budget_ms: float = FRAME_BUDGET_MS):
+        self.enabled = True
+        self.budget_ms = budget_ms
+        self._lock = threading.Lock()
+        self._hists: dict[str, Histogram] = {}
+        self._marks: dict[str, float] = {}
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            h = self._hists.get(name)
+            if h is None:
+                h = self._hists[name] = Histogram()
+            h.add(ms)
+        # 帧预算只对主线程有意义；后台线程（预取、导入等）慢一点不会卡界面
+        if ms > self.budget_ms and threading.current_thread() is threading.main_thread():
+            log.warning("slow span %s: %.1f ms (budget %.0f ms)", name, ms, self.budget_ms)
+
+    def mark(self, name: str, ms: float) -> None:
+        """记录一次性的数值（如启动各阶段耗时），不进直方图。"""
+        with self._lock:
+            self._marks[name] = round(ms, 3)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "spans": {k: h.summary() for k, h in sorted(self._hists.items())},
+                "marks": dict(self._marks),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+
+recorder = Recorder()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if not recorder.enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record(name, (time.perf_counter() - t0) * 1000)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """装饰器版的 span。"""
+
+    def deco(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                recorder.record(name, (time.perf_counter() - t0) * 1000)
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+class MetricsFile:
+    """把统计快照按行追加到 JSONL 文件，按大小轮转，方便从设备上拉取。"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._log = logging.getLogger(f"novel.metrics.{path}")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        if not self._log.handlers:
+            h = RotatingFileHandler(path, maxBytes=METRICS_FILE_MAX_BYTES, backupCount=METRICS_BACKUP_COUNT, encoding="utf-8")
+            h.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(h)
+
+    def write(self, ts: str) -> None:
+        row = {"ts": ts, **recorder.snapshot()}
+        self._log.info(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from app.utils.text import word_count
+
+
+@dataclass
+class _Edit:
+    pos: int
+    removed: str
+    inserted: str
+
+
+class PieceTable:
+    """编辑器背后的片段表：原文不动，新增文本追加成片段，编辑只改片段列表。
+
+    - words：按段落增量维护的字数（每次编辑只重算受影响的段落）。
+    - changed_chars：累计改动字符数（单调递增），各调用方自行记下上次的值做差。
+    - dirty_ranges()：自上次 mark_clean() 以来被改动过的区间（当前坐标）。
+    - undo/redo：编辑历史按字符总量限额，超出时丢弃最旧的记录。
+    """
+
+    def __init__(self, text: str = "", history_max_chars: int = 200_000):
+        self.history_max_chars = history_max_chars
+        self.reset(text)
+
+    def reset(self, text: str) -> None:
+        text = text or ""
+        self._bufs: list[str] = [text]
+        # 片段：(缓冲区下标, 起点, 长度)
+        self._pieces: list[tuple[int, int, int]] = [(0, 0, len(text))] if text else []
+        self._len = len(text)
+        self._cache: str | None = text
+        self.words = word_count(text)
+        self.changed_chars = 0
+        self.revision = 0
+        self._dirty: list[list[int]] = []
+        self._undo: list[_Edit] = []
+        self._redo: list[_Edit] = []
+        self._history_chars = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    # ---- 读取 ----
+
+    def text(self) -> str:
+        if self._cache is None:
+            self._cache = "".join(self._bufs[b][s : s + n] for b, s, n in self._pieces)
+            # 顺便压实：拼出来的整串作为新的原文
+            self._bufs = [self._cache]
+            self._pieces = [(0, 0, self._len)] if self._len else []
+        return self._cache
+
+    def slice(self, start: int, end: int) -> str:
+        start = max(0, start)
+        end = min(self._len, end)
+        if start >= end:
+            return ""
+        if self._cache is not None:
+            return self._cache[start:end]
+        out: list[str] = []
+        off = 0
+        for b, s, n in self._pieces:
+            if off + n <= start:
+                off += n
+                continue
+            if off >= end:
+                break
+            lo = max(start, off) - off
+            hi = min(end, off + n) - off
+            out.append(self._bufs[b][s + lo : s + hi])
+            off += n
+        return "".join(out)
+
+    def _line_start(self, pos: int) -> int:
+        off = self._len
+        for b, s, n in reversed(self._pieces):
+            off -= n
+            if off >= pos:
+                continue
+            hi = min(pos - off, n)
+            i = self._bufs[b].rfind("\n", s, s + hi)
+            if i != -1:
+                return off + (i - s) + 1
+        return 0
+
+    def _line_end(self, pos: int) -> int:
+        off = 0
+        for b, s, n in self._pieces:
+            if off + n <= pos:
+                off += n
+                continue
+            lo = max(pos - off, 0)
+            i = self._bufs[b].find("\n", s + lo, s + n)
+            if i != -1:
+                return off + (i - s)
+            off += n
+        return self._len
+
+    # ---- 编辑 ----
+
+    def insert(self, pos: int, text: str) -> None:
+        self.replace(pos, pos, text)
+
+    def delete(self, pos: int, length: int) -> None:
+        self.replace(pos, pos + length, "")
+
+    def replace(self, start: int, end: int, text: str, _record: bool = True) -> None:
+        start = max(0, min(start, self._len))
+        end = max(start, min(end, self._len))
+        text = text or ""
+        if start == end and not text:
+            return
+
+        ls = self._line_start(start)
+        le = self._line_end(end)
+        removed = self.slice(start, end)
+        old_words = word_count(self.slice(ls, le))
+
+        self._splice(start, end, text)
+
+        new_le = le - (end - start) + len(text)
+        self.words += word_count(self.slice(ls, new_le)) - old_words
+        self.changed_chars += max(len(removed), len(text))
+        self.revision += 1
+        self._mark_dirty(start, end, len(text))
+
+        if _record:
+            self._record(_Edit(start, removed, text))
+
+    def _splice(self, start: int, end: int, text: str) -> None:
+        new: list[tuple[int, int, int]] = []
+        off = 0
+        inserted = False
+        for b, s, n in self._pieces:
+            p_end = off + n
+            if p_end <= start or off >= end:
+                if off >= end and not inserted:
+                    self._append_piece(new, text)
+                    inserted = True
+                new.append((b, s, n))
+            else:
+                if off < start:
+                    new.append((b, s, start - off))
+                if not inserted:
+                    self._append_piece(new, text)
+                    inserted = True
+                if p_end > end:
+                    new.append((b, s + (end - off), p_end - end))
+            off = p_end
+        if not inserted:
+            self._append_piece(new, text)
+        self._pieces = new
+        self._len += len(text) - (end - start)
+        self._cache = None
+
+    def _append_piece(self, pieces: list[tuple[int, int, int]], text: str) -> None:
+        if not text:
+            return
+        self._bufs.append(text)
+        pieces.append((len(self._bufs) - 1, 0, len(text)))
+
+    def _mark_dirty(self, start: int, end: int, inserted: int) -> None:
+        delta = inserted - (end - start)
+        out: list[list[int]] = []
+        new = [start, start + inserted]
+        for a, b in self._dirty:
+            if b < start:
+                out.append([a, b])
+            elif a > end:
+                out.append([a + delta, b + delta])
+            else:
+                new[0] = min(new[0], a)
+                new[1] = max(new[1], b + delta if b > end else new[1])
+        out.append(new)
+        out.sort()
+        self._dirty = out
+
+    # ---- 脏区间 ----
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def dirty_ranges(self) -> list[tuple[int, int]]:
+        return [(a, b) for a, b in self._dirty]
+
+    def mark_clean(self) -> None:
+        self._dirty = []
+
+    # ---- 撤销/重做 ----
+
+    def _record(self, e: _Edit) -> None:
+        self._redo.clear()
+        last = self._undo[-1] if self._undo else None
+        # 连续输入合并为一步
+        if (
+            last is not None
+            and not last.removed
+            and not e.removed
+            and e.pos == last.pos + len(last.inserted)
+            and "\n" not in e.inserted
+        ):
+            last.inserted += e.inserted
+        else:
+            self._undo.append(e)
+        self._history_chars += len(e.removed) + len(e.inserted)
+        while self._history_chars > self.history_max_chars and len(self._undo) > 1:
+            old = self._undo.pop(0)
+            self._history_chars -= len(old.removed) + len(old.inserted)
+
+    def undo(self) -> tuple[int, int, str] | None:
+        """撤销一步，返回 (位置, 被替换长度, 新文本)，供界面同步。"""
+        if not self._undo:
+            return None
+        e = self._undo.pop()
+        self.replace(e.pos, e.pos + len(e.inserted), e.removed, _record=False)
+        # 只有撤销栈计入历史上限；重做栈在下一次编辑时整体清空
+        self._history_chars -= len(e.removed) + len(e.inserted)
+        self._redo.append(e)
+        return e.pos, len(e.inserted), e.removed
+
+    def redo(self) -> tuple[int, int, str] | None:
+        if not self._redo:
+            return None
+        e = self._redo.pop()
+        self.replace(e.pos, e.pos + len(e.removed), e.inserted, _record=False)
+        self._undo.append(e)
+        self._history_chars += len(e.removed) + len(e.inserted)
+        return e.pos, len(e.removed), e.inserted
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+
+def downsample_sum(values: list[int], labels: list[str], buckets: int) -> tuple[list[int], list[str]]:
+    """把序列按相邻分组求和压到至多 buckets 个点；标签取每组第一个。"""
+    n = len(values)
+    if buckets <= 0 or n <= buckets:
+        return list(values), list(labels)
+    out_v: list[int] = []
+    out_l: list[str] = []
+    for i in range(buckets):
+        a = i * n // buckets
+        b = (i + 1) * n // buckets
+        out_v.append(sum(values[a:b]))
+        out_l.append(labels[a] if a < len(labels) else "")
+    return out_v, out_l
@@ -0,0 +1,79 @@
+"""章节/版本正文编码基准：各编码的落盘字节数与读写耗时。
+
+用法（在 novel_mobile 目录下）：
+    python bench/bench_codec.py --chars 20000 --files 50 --json out.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.storage.codec import decode_bytes, encode_text  # noqa: E402
+from bench.synth import sample_text  # noqa: E402
+
+DEFAULT_CODECS = ["plain", "auto", "zlib:1", "zlib:6", "zlib:9", "lzma:0", "lzma:6"]
+
+
+def bench_codec(codec: str, texts: list[str], work_dir: Path) -> dict:
+    d = work_dir / codec.replace(":", "_")
+    d.mkdir(parents=True, exist_ok=True)
+    paths = [d / f"{i}.md" for i in range(len(texts))]
+
+    t0 = time.perf_counter()
+    for p, t in zip(paths, texts):
+        p.write_bytes(encode_text(t, codec))
+    write_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for p, t in zip(paths, texts):
+        if decode_bytes(p.read_bytes()) != t:
+            raise AssertionError(f"{codec} 往返不一致：{p}")
+    read_s = time.perf_counter() - t0
+
+    raw = sum(len(t.encode("utf-8")) for t in texts)
+    disk = sum(p.stat().st_size for p in paths)
+    return {
+        "codec": codec,
+        "files": len(texts),
+        "raw_bytes": raw,
+        "disk_bytes": disk,
+        "ratio": round(disk / raw, 4) if raw else 1.0,
+        "write_ms_per_file": round(write_s * 1000 / len(texts), 3),
+        "read_ms_per_file": round(read_s * 1000 / len(texts), 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--chars", type=int, default=20000, help="每个文件的字符数")
+    ap.add_argument("--files", type=int, default=50)
+    ap.add_argument("--latin", type=float, default=0.1, help="拉丁文本占比 0~1")
+    ap.add_argument("--codec", action="append", help="可重复；默认测一组常用编码")
+    ap.add_argument("--json", type=Path, help="把结果写成 JSON")
+    args = ap.parse_args(argv)
+
+    texts = [sample_text(args.chars, args.latin, seed=i) for i in range(args.files)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in args.codec or DEFAULT_CODECS:
+            results.append(bench_codec(codec, texts, Path(tmp)))
+
+    print(f"{'codec':<8} {'ratio':>7} {'disk KB':>9} {'write ms':>9} {'read ms':>9}")
+    for r in results:
+        print(
+            f"{r['codec']:<8} {r['ratio']:>7.3f} {r['disk_bytes'] / 1024:>9.1f} "
+            f"{r['write_ms_per_file']:>9.3f} {r['read_ms_per_file']:>9.3f}"
+        )
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
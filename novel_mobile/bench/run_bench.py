@@ -0,0 +1,180 @@
+"""端到端基准：合成项目上测冷启动、字数缓存、快照、版本列表、每日进度与导出。
+
+用法（在 novel_mobile 目录下）：
+    python bench/run_bench.py --chapters 3000 --chapter-chars 4000 --json results.json
+    python bench/run_bench.py --chapters 3000 --compare results.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.exporters.exporter import ExportContext, iter_chapters_dfs  # noqa: E402
+from app.exporters.txt_exporter import TxtExporter  # noqa: E402
+from app.storage.project_store import ProjectStore  # noqa: E402
+from app.storage.stats_store import StatsStore  # noqa: E402
+from app.storage.version_store import VersionStore  # noqa: E402
+from app.utils.perf import recorder  # noqa: E402
+from app.utils.text import word_count  # noqa: E402
+from bench.synth import generate_project, sample_text  # noqa: E402
+
+
+def timed(fn: Callable[[], object], repeat: int) -> dict:
+    runs: list[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {
+        "median_ms": round(statistics.median(runs), 3),
+        "min_ms": round(min(runs), 3),
+        "max_ms": round(max(runs), 3),
+        "runs": len(runs),
+    }
+
+
+def run(project_dir: Path, ids: list[str], repeat: int, seed: int) -> dict[str, dict]:
+    rnd = random.Random(seed)
+    sample_ids = rnd.sample(ids, min(20, len(ids)))
+    out: dict[str, dict] = {}
+
+    def cold_load():
+        ProjectStore(project_dir).load()
+
+    def rebuild_word_cache():
+        # 与 NovelMobileApp._rebuild_word_cache 相同：每批 200 章 read_chapters 后计数（新建 store，避免命中缓存）
+        store = ProjectStore(project_dir)
+        chapter_ids = [n.id for n in iter_chapters_dfs(store.load().root) if not n.is_folder]
+        cache: dict[str, int] = {}
+        for i in range(0, len(chapter_ids), 200):
+            for cid, text in store.read_chapters(chapter_ids[i : i + 200]).items():
+                cache[cid] = word_count(text)
+        sum(cache.values())
+
+    vs = VersionStore(project_dir)
+    snap_text = sample_text(4000, 0.05, seed)
+
+    def snapshot():
+        vs.snapshot(rnd.choice(ids), snap_text, word_count(snap_text))
+
+    def list_versions():
+        for cid in sample_ids:
+            vs.list_versions(cid)
+
+    st = StatsStore(project_dir)
+
+    def daily_progress():
+        st.daily_progress()
+
+    def progress_series():
+        StatsStore(project_dir).progress_series("all")
+
+    def export_txt():
+        store = ProjectStore(project_dir)
+        ctx = ExportContext(project=store.load(), store=store)
+        with tempfile.TemporaryDirectory() as tmp:
+            TxtExporter().export(ctx, Path(tmp) / "out.txt")
+
+    out["cold_load"] = timed(cold_load, repeat)
+    out["word_cache_rebuild"] = timed(rebuild_word_cache, repeat)
+    out["snapshot"] = timed(snapshot, repeat)
+    # 键名固定，--compare 才能和不同规模的结果对上；抽样章数另记
+    out["list_versions"] = dict(timed(list_versions, repeat), chapters=len(sample_ids))
+    out["daily_progress"] = timed(daily_progress, repeat)
+    out["progress_series_cold"] = timed(progress_series, repeat)
+    out["export_txt"] = timed(export_txt, repeat)
+    return out
+
+
+def compare(results: dict[str, dict], baseline_path: Path) -> None:
+    base = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+    print(f"\n对比 {baseline_path}：")
+    print(f"{'phase':<22} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for name, r in results.items():
+        b = base.get(name)
+        if not b:
+            print(f"{name:<22} {'-':>10} {r['median_ms']:>10.2f} {'-':>7}")
+            continue
+        ratio = r["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+        print(f"{name:<22} {b['median_ms']:>10.2f} {r['median_ms']:>10.2f} {ratio:>7.2f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--chapters", type=int, default=500)
+    ap.add_argument("--depth", type=int, default=1, help="文件夹嵌套层数")
+    ap.add_argument("--fanout", type=int, default=5, help="每层文件夹个数")
+    ap.add_argument("--chapter-chars", type=int, default=3000)
+    ap.add_argument("--latin", type=float, default=0.05, help="拉丁文本占比 0~1")
+    ap.add_argument("--versions", type=int, default=3, help="每章历史版本数")
+    ap.add_argument("--history-days", type=int, default=365)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--keep", type=Path, help="把合成项目保留到此目录（默认用临时目录）")
+    ap.add_argument("--json", type=Path, help="把结果写成 JSON")
+    ap.add_argument("--compare", type=Path, help="与之前的 JSON 结果对比")
+    args = ap.parse_args(argv)
+
+    # 基准本身就在测耗时：关掉埋点，免得每个慢调用都打一条告警，也不把埋点开销算进去
+    recorder.enabled = False
+
+    params = {
+        "chapters": args.chapters,
+        "depth": args.depth,
+        "fanout": args.fanout,
+        "chapter_chars": args.chapter_chars,
+        "latin": args.latin,
+        "versions": args.versions,
+        "history_days": args.history_days,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project_dir = args.keep or Path(tmp) / "project"
+        project_dir.mkdir(parents=True, exist_ok=True)
+        t0 = time.perf_counter()
+        ids = generate_project(
+            project_dir,
+            chapters=args.chapters,
+            depth=args.depth,
+            fanout=args.fanout,
+            chapter_chars=args.chapter_chars,
+            latin_ratio=args.latin,
+            versions=args.versions,
+            history_days=args.history_days,
+            seed=args.seed,
+        )
+        gen_s = time.perf_counter() - t0
+        results = run(project_dir, ids, args.repeat, args.seed)
+
+    print(f"合成项目：{args.chapters} 章，用时 {gen_s:.1f}s")
+    print(f"{'phase':<22} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['median_ms']:>10.2f} {r['min_ms']:>10.2f} {r['max_ms']:>10.2f}")
+
+    report = {
+        "params": params,
+        "env": {"python": platform.python_version(), "platform": platform.platform()},
+        "generate_s": round(gen_s, 3),
+        "results": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""合成大型项目：可配置章节数、目录深度、每章字数、中英比例与版本/统计历史深度。"""
+from __future__ import annotations
+
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models import ChapterNode  # noqa: E402
+from app.storage.project_store import ProjectStore  # noqa: E402
+from app.storage.stats_store import StatsStore  # noqa: E402
+from app.storage.version_store import VersionEntry, VersionStore  # noqa: E402
+from app.utils.text import word_count  # noqa: E402
+
+_CJK = "的一是了我不人在他有这个上们来到时大地为子中你说生国年着就那和要她出也得里后自以会家可下而过天去能对小多然于心学么之都好看起发当没成只如事把还用第样道想作种开美总从无情己面最女但现前些所同日手又行意动方期它头经长儿回位分爱老因很给名法间斯知世什两次使身者被高已亲其进此话常与活正感"
+_LATIN = ["the", "sword", "night", "river", "said", "Lin", "Mei", "and", "of", "light", "gate", "old"]
+
+
+def sample_text(n_chars: int, latin_ratio: float, seed: int) -> str:
+    rnd = random.Random(seed)
+    out: list[str] = []
+    size = 0
+    while size < n_chars:
+        if rnd.random() < latin_ratio:
+            s = " ".join(rnd.choice(_LATIN) for _ in range(rnd.randint(3, 12))) + ". "
+        elif rnd.random() < 0.25:
+            s = "“" + "".join(rnd.choice(_CJK) for _ in range(rnd.randint(4, 20))) + "”"
+        else:
+            s = "".join(rnd.choice(_CJK) for _ in range(rnd.randint(8, 40))) + rnd.choice("，。！？")
+        if rnd.random() < 0.08:
+            s += "\n\n"
+        out.append(s)
+        size += len(s)
+    return "".join(out)[:n_chars]
+
+
+def _build_tree(chapters: int, depth: int, fanout: int) -> tuple[ChapterNode, list[str]]:
+    """depth 层文件夹（每层 fanout 个），章节平均分到最底层文件夹。"""
+    root = ChapterNode(id="root", title="目录", is_folder=True, children=[])
+    leaves_parents = [root]
+    for level in range(depth):
+        nxt: list[ChapterNode] = []
+        for p in leaves_parents:
+            for k in range(fanout):
+                f = ChapterNode(id=str(uuid.uuid4()), title=f"第{level + 1}层-{k + 1}", is_folder=True, children=[])
+                p.children.append(f)
+                nxt.append(f)
+        leaves_parents = nxt
+
+    ids: list[str] = []
+    for i in range(chapters):
+        parent = leaves_parents[i * len(leaves_parents) // max(1, chapters)]
+        cid = str(uuid.uuid4())
+        parent.children.append(ChapterNode(id=cid, title=f"第{i + 1}章", is_folder=False, children=[]))
+        ids.append(cid)
+    return root, ids
+
+
+def generate_project(
+    project_dir: Path,
+    chapters: int = 500,
+    depth: int = 1,
+    fanout: int = 5,
+    chapter_chars: int = 3000,
+    latin_ratio: float = 0.05,
+    versions: int = 3,
+    history_days: int = 365,
+    seed: int = 0,
+) -> list[str]:
+    """在 project_dir 生成项目，返回章节 id（目录顺序）。"""
+    rnd = random.Random(seed)
+    store = ProjectStore(project_dir)
+    proj = store.create_default("合成项目")
+    root, ids = _build_tree(chapters, depth, fanout)
+    proj.root = root
+    store.save(proj)
+
+    texts: dict[str, str] = {}
+    batch: list[tuple[str, str]] = []
+    for i, cid in enumerate(ids):
+        n = max(1, int(chapter_chars * rnd.uniform(0.6, 1.4)))
+        texts[cid] = sample_text(n, latin_ratio, seed * 1_000_003 + i)
+        batch.append((cid, texts[cid]))
+        if len(batch) >= 200:
+            store.write_chapters(batch)
+            batch = []
+    if batch:
+        store.write_chapters(batch)
+
+    # 版本历史：逐个 snapshot() 会反复重写索引，这里直接写文件再一次性写索引
+    vs = VersionStore(project_dir)
+    rows: list[dict] = []
+    base = datetime.now() - timedelta(days=history_days)
+    for cid in ids:
+        text = texts[cid]
+        (vs.versions_dir / cid).mkdir(parents=True, exist_ok=True)
+        for k in range(versions):
+            cut = text[: max(1, len(text) * (k + 1) // versions)]
+            created = (base + timedelta(minutes=rnd.randint(0, history_days * 1440))).isoformat(timespec="seconds")
+            vid = str(uuid.uuid4())
+            rel = str(Path(cid) / f"{created.replace(':', '-')}_{vid}.md")
+            (vs.versions_dir / rel).write_text(cut, encoding="utf-8")
+            rows.append(VersionEntry(id=vid, chapter_id=cid, created_at=created, rel_path=rel, word_count=word_count(cut)).__dict__)
+    vs._save_index(rows)
+
+    # 字数历史：每天若干条总字数记录，单调增长
+    st = StatsStore(project_dir)
+    hist: list[dict] = []
+    total = 0
+    for d in range(history_days):
+        day = base + timedelta(days=d)
+        for h in sorted(rnd.sample(range(8, 24), 4)):
+            total += rnd.randint(0, 800)
+            hist.append({"ts": day.replace(hour=h, minute=0, second=0).isoformat(timespec="seconds"), "total_words": total})
+    st.path.write_text(json.dumps(hist, ensure_ascii=False), encoding="utf-8")
+    return ids
@@ -8,11 +8,11 @@ package.domain = org.example
 # 源码目录（buildozer 默认把 main.py 所在目录作为入口）
 source.dir = .
 source.include_exts = py,png,jpg,jpeg,kv,json,txt,md
-source.exclude_dirs = __pycache__,.git,.idea,build,dist
+source.exclude_dirs = __pycache__,.git,.idea,build,dist,bench,tests
 
 # 依赖（按你给的文章思路）：python3 + kivy
 # 说明：后续如果要把 DOCX/PDF/EPUB 也带上，再逐个把库加入 requirements。
-requirements = python3,kivy
+requirements = python3,kivy,sqlite3
 
 # 运行入口
 entrypoint = main.py
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from kivy.clock import Clock
+from kivy.graphics import Color, InstructionGroup, Rectangle
+from kivy.metrics import dp
+from kivy.properties import ObjectProperty
+from kivy.uix.widget import Widget
+
+from app.utils.series import downsample_sum
+
+
+class BarChart(Widget):
+    """轻量柱状图：数据多于像素时按宽度降采样；柱子的 Rectangle 复用，只改位置和尺寸。"""
+
+    values = ObjectProperty([])
+    labels = ObjectProperty([])
+    min_bar_px = 2
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._bars = InstructionGroup()
+        self._rects: list[Rectangle] = []
+        self._shown_labels: list[str] = []
+        with self.canvas:
+            Color(0.22, 0.55, 0.85, 0.9)
+        self.canvas.add(self._bars)
+        # 尺寸/数据连续变化时合并成一帧一次重绘
+        self._trigger = Clock.create_trigger(lambda *_: self.redraw(), 0)
+        self.bind(size=self._trigger, pos=self._trigger, values=self._trigger)
+
+    @property
+    def shown_labels(self) -> list[str]:
+        """降采样后每根柱子对应的标签（每组第一个）。"""
+        return self._shown_labels
+
+    def redraw(self) -> None:
+        vals = list(self.values or [])
+        w = self.width
+        h = self.height
+        gap = dp(4) if len(vals) <= 60 else 0
+        max_bars = max(1, int(w // (self.min_bar_px + gap)))
+        vals, self._shown_labels = downsample_sum(vals, list(self.labels or []), max_bars)
+
+        n = len(vals)
+        while len(self._rects) < n:
+            r = Rectangle(pos=(0, 0), size=(0, 0))
+            self._rects.append(r)
+            self._bars.add(r)
+        if not n:
+            for r in self._rects:
+                r.size = (0, 0)
+            return
+
+        max_v = max(vals) or 1
+        bar_w = max(float(self.min_bar_px), (w - gap * (n + 1)) / n)
+        y = self.y + dp(4)
+        for i, r in enumerate(self._rects):
+            if i < n:
+                r.pos = (self.x + gap + i * (bar_w + gap), y)
+                r.size = (bar_w, (vals[i] / max_v) * (h - dp(8)))
+            else:
+                r.size = (0, 0)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import time
+
+_T0 = time.perf_counter()
+
 import os
+import threading
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+# 启动路径只导入首帧需要的控件；弹窗、图表、导出器和非必需的 store 在首次使用时再导入
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.core.window import Window
@@ -13,27 +20,47 @@ from kivy.metrics import dp
 from kivy.properties import BooleanProperty, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
-from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.slider import Slider
 from kivy.uix.spinner import Spinner
 from kivy.uix.textinput import TextInput
 from kivy.uix.treeview import TreeView, TreeViewLabel
-from kivy.uix.widget import Widget
 
-from app.constants import AUTOSAVE_INTERVAL_SECONDS, DEFAULT_PROJECT_NAME, VERSION_SNAPSHOT_MIN_SECONDS
-from app.exporters.exporter import ExportContext
-from app.exporters.txt_exporter import TxtExporter
+from app.constants import (
+    AUTOSAVE_INTERVAL_SECONDS,
+    DEFAULT_PROJECT_NAME,
+    FRAME_BUDGET_MS,
+    METRICS_FLUSH_SECONDS,
+    PACK_COMPACT_MIN_FREE_PAGES,
+    PAGE_CHARS,
+    PAGED_EDITOR_MIN_CHARS,
+    PAGED_WINDOW_PAGES,
+    WATCH_INTERVAL_SECONDS,
+)
 from app.models import ChapterNode
-from app.storage.knowledge_store import KnowledgeStore
+from app.storage.catalog_store import CatalogStore, safe_project_name
 from app.storage.project_store import ProjectStore
-from app.storage.stats_store import StatsStore
-from app.storage.version_store import VersionEntry, VersionStore
+from app.storage.snapshots import SnapshotScheduler
+from app.utils.folder_totals import FolderTotals
 from app.utils.paths import data_root, ensure_dir
+from app.utils.paging import PagedDocument
+from app.utils.perf import MetricsFile, recorder, span, timed
+from app.utils.piece_table import PieceTable
 from app.utils.text import hex_to_rgba, temperature_to_colors, word_count
 
+if TYPE_CHECKING:
+    from app.storage.knowledge_store import KnowledgeStore
+    from app.storage.snapshots import SnapshotWriter
+    from app.storage.stats_store import StatsStore
+    from app.storage.version_store import VersionEntry, VersionStore
+    from app.storage.watcher import ChangeSet, ProjectWatcher
+
+
+def mark_startup(phase: str) -> None:
+    """记录从进程启动到当前的耗时（毫秒），见性能弹窗里的 startup.*。"""
+    recorder.mark(f"startup.{phase}", (time.perf_counter() - _T0) * 1000)
+
 
 def now_iso() -> str:
     return datetime.now().isoformat(timespec="seconds")
@@ -45,39 +72,6 @@ class ThemeState:
     temperature: int = 4500
 
 
-class BarChart(Widget):
-    """非常轻量的柱状图：用于每日进度。"""
-
-    values = ObjectProperty([])
-    labels = ObjectProperty([])
-
-    def redraw(self) -> None:
-        self.canvas.clear()
-        vals = list(self.values or [])
-        if not vals:
-            return
-        max_v = max(vals) or 1
-
-        from kivy.graphics import Color, Rectangle
-
-        w = self.width
-        h = self.height
-        n = len(vals)
-        gap = dp(4)
-        bar_w = max(dp(6), (w - gap * (n + 1)) / n)
-
-        with self.canvas:
-            Color(0.22, 0.55, 0.85, 0.9)
-            for i, v in enumerate(vals):
-                bh = (v / max_v) * (h - dp(8))
-                x = gap + i * (bar_w + gap)
-                y = dp(4)
-                Rectangle(pos=(x, y), size=(bar_w, bh))
-
-    def on_size(self, *_):
-        self.redraw()
-
-
 class ChapterTreeView(TreeView):
     """TreeView 节点上挂 meta：node_id/is_folder"""
 
@@ -91,6 +85,123 @@ class ChapterTreeView(TreeView):
                 pass
 
 
+class BufferedTextInput(TextInput):
+    """把每次编辑同步到片段表 buffer。
+
+    保存、字数、快照都从 buffer 取数据，不再读 TextInput.text（每次读取都要拼接全部行）。
+    撤销/重做改用 buffer 的限额历史，Kivy 自带的撤销栈随手清空。
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.buffer = PieceTable()
+        self._mirror_depth = 0
+        self.first_input_callback = None
+
+    def load_text(self, text: str) -> None:
+        self._mirror_depth += 1
+        try:
+            self.text = text or ""
+        finally:
+            self._mirror_depth -= 1
+        self.buffer.reset(text or "")
+        self._drop_kivy_history()
+
+    def replace_all(self, text: str) -> None:
+        """整体替换正文，但作为一次可撤销、需保存的编辑。"""
+        self.buffer.replace(0, len(self.buffer), text or "")
+        self._mirror_depth += 1
+        try:
+            self.text = text or ""
+        finally:
+            self._mirror_depth -= 1
+        self._drop_kivy_history()
+
+    def _drop_kivy_history(self) -> None:
+        for name in ("_undo", "_redo"):
+            stack = getattr(self, name, None)
+            if isinstance(stack, list):
+                del stack[:]
+
+    def _resync(self) -> None:
+        # 兜底：无法确定改动范围时整体重建（代价等同于旧实现的一次保存）
+        self.buffer.replace(0, len(self.buffer), self.text or "")
+
+    def insert_text(self, substring, from_undo=False):
+        if self._mirror_depth:
+            return super().insert_text(substring, from_undo=from_undo)
+        start = self.cursor_index()
+        self._mirror_depth += 1
+        try:
+            ret = super().insert_text(substring, from_undo=from_undo)
+        finally:
+            self._mirror_depth -= 1
+        end = self.cursor_index()
+        if end - start == len(substring):
+            self.buffer.insert(start, substring)
+        elif end != start:
+            self._resync()
+        self._drop_kivy_history()
+        if self.first_input_callback is not None:
+            cb, self.first_input_callback = self.first_input_callback, None
+            cb()
+        return ret
+
+    def delete_selection(self, from_undo=False):
+        if self._mirror_depth or not self._selection:
+            return super().delete_selection(from_undo=from_undo)
+        a, b = sorted((self.selection_from, self.selection_to))
+        self._mirror_depth += 1
+        try:
+            ret = super().delete_selection(from_undo=from_undo)
+        finally:
+            self._mirror_depth -= 1
+        self.buffer.delete(a, b - a)
+        self._drop_kivy_history()
+        return ret
+
+    def do_backspace(self, from_undo=False, mode="bkspc"):
+        if self._mirror_depth:
+            return super().do_backspace(from_undo=from_undo, mode=mode)
+        if self._selection:
+            return self.delete_selection(from_undo=from_undo)
+        start = self.cursor_index()
+        self._mirror_depth += 1
+        try:
+            ret = super().do_backspace(from_undo=from_undo, mode=mode)
+        finally:
+            self._mirror_depth -= 1
+        end = self.cursor_index()
+        # Delete 键在 Kivy 里是先右移光标再按退格删除，两种模式都删掉 [end, start)
+        if end < start:
+            self.buffer.delete(end, start - end)
+        self._drop_kivy_history()
+        return ret
+
+    def do_undo(self):
+        self._apply(self.buffer.undo())
+
+    def do_redo(self):
+        self._apply(self.buffer.redo())
+
+    def _apply(self, op: tuple[int, int, str] | None) -> None:
+        if op is None:
+            return
+        pos, old_len, new_text = op
+        self._mirror_depth += 1
+        try:
+            if old_len:
+                self.select_text(pos, pos + old_len)
+                super().delete_selection()
+            self.cancel_selection()
+            self.cursor = self.get_cursor_from_index(pos)
+            if new_text:
+                super().insert_text(new_text)
+        finally:
+            self._mirror_depth -= 1
+        self._drop_kivy_history()
+
+
 class RootLayout(BoxLayout):
     focus_mode = BooleanProperty(False)
     status_text = StringProperty("就绪")
@@ -101,29 +212,84 @@ class NovelMobileApp(App):
         super().__init__(**kwargs)
         self.theme = ThemeState()
 
+        self.catalog: CatalogStore | None = None
+        self.project_name: str = DEFAULT_PROJECT_NAME
+        # 书名（project.json 里的 title）；目录名是它去掉非法字符后的结果
+        self.project_title: str = DEFAULT_PROJECT_NAME
         self.project_dir: Path | None = None
         self.store: ProjectStore | None = None
-        self.version_store: VersionStore | None = None
-        self.stats_store: StatsStore | None = None
-        self.knowledge_store: KnowledgeStore | None = None
+        self._version_store: VersionStore | None = None
+        self._stats_store: StatsStore | None = None
+        self._knowledge_store: KnowledgeStore | None = None
 
         self.project_root: ChapterNode | None = None
         self._current_chapter_id: str | None = None
-        self._last_version_ts: dict[str, float] = {}
+        self._snapshots = SnapshotScheduler()
+        self._snapshot_writer: SnapshotWriter | None = None
+        self._watcher: ProjectWatcher | None = None
+        self._watch_busy = False
+        self._conflict: dict | None = None
         self._last_stats_ts: float = 0.0
         self._chapter_word_cache: dict[str, int] = {}
         self._total_words_cache: int = 0
+        self._word_cache_ready = False
+        self._words_touched: set[str] | None = None
+        self._leaf_order: list[str] | None = None
+        self._folder_totals: FolderTotals | None = None
+        self._tree_labels: dict[str, TreeViewLabel] = {}
+        self._paged: PagedDocument | None = None
+        self._page_shift_pending = False
 
         self.root_layout: RootLayout | None = None
         self.tree: ChapterTreeView | None = None
-        self.editor: TextInput | None = None
+        self.editor: BufferedTextInput | None = None
         self.left_panel: BoxLayout | None = None
+        self.status_label: Label | None = None
+        self.metrics_file: MetricsFile | None = None
+
+    @property
+    def version_store(self) -> VersionStore:
+        if self._version_store is None:
+            from app.storage.version_store import VersionStore
+
+            assert self.project_dir is not None
+            self._version_store = VersionStore(self.project_dir)
+        return self._version_store
+
+    @property
+    def snapshot_writer(self) -> SnapshotWriter:
+        if self._snapshot_writer is None:
+            from app.storage.snapshots import SnapshotWriter
+
+            self._snapshot_writer = SnapshotWriter(self.version_store)
+        return self._snapshot_writer
+
+    @property
+    def stats_store(self) -> StatsStore:
+        if self._stats_store is None:
+            from app.storage.stats_store import StatsStore
+
+            assert self.project_dir is not None
+            self._stats_store = StatsStore(self.project_dir)
+        return self._stats_store
+
+    @property
+    def knowledge_store(self) -> KnowledgeStore:
+        if self._knowledge_store is None:
+            from app.storage.knowledge_store import KnowledgeStore
+
+            assert self.project_dir is not None
+            self._knowledge_store = KnowledgeStore(self.project_dir)
+        return self._knowledge_store
 
     def build(self):
         # Android/桌面统一：把数据目录指向 user_data_dir
         os.environ.setdefault("NOVEL_DATA_DIR", self.user_data_dir)
+        mark_startup("imports")
 
-        self._init_project()
+        self.catalog = CatalogStore(data_root())
+        self._init_project(self.catalog.last_project or DEFAULT_PROJECT_NAME)
+        mark_startup("project_loaded")
 
         root = RootLayout(orientation="vertical")
         self.root_layout = root
@@ -138,10 +304,13 @@ class NovelMobileApp(App):
         btn_up = Button(text="上移")
         btn_down = Button(text="下移")
 
+        btn_books = Button(text="书架")
         btn_timeline = Button(text="时间轴")
+        btn_find = Button(text="查找")
         btn_dash = Button(text="仪表盘")
         btn_export = Button(text="导出TXT")
         btn_focus = Button(text="专注")
+        btn_perf = Button(text="性能")
 
         toolbar.add_widget(btn_new_ch)
         toolbar.add_widget(btn_new_dir)
@@ -149,10 +318,13 @@ class NovelMobileApp(App):
         toolbar.add_widget(btn_delete)
         toolbar.add_widget(btn_up)
         toolbar.add_widget(btn_down)
+        toolbar.add_widget(btn_books)
         toolbar.add_widget(btn_timeline)
+        toolbar.add_widget(btn_find)
         toolbar.add_widget(btn_dash)
         toolbar.add_widget(btn_export)
         toolbar.add_widget(btn_focus)
+        toolbar.add_widget(btn_perf)
 
         # 主题控件
         theme_spinner = Spinner(text="明亮", values=["明亮", "夜间", "护眼"], size_hint_x=None, width=dp(90))
@@ -177,13 +349,14 @@ class NovelMobileApp(App):
         scroll.add_widget(self.tree)
         self.left_panel.add_widget(scroll)
 
-        self.editor = TextInput(multiline=True, font_size=dp(16), padding=[dp(10), dp(10), dp(10), dp(10)])
-        self.editor.bind(text=self._on_editor_text)
+        self.editor = BufferedTextInput(multiline=True, font_size=dp(16), padding=[dp(10), dp(10), dp(10), dp(10)])
+        self.editor.bind(scroll_y=self._on_editor_scroll)
 
         body.add_widget(self.left_panel)
         body.add_widget(self.editor)
 
         status = Label(text="就绪", size_hint_y=None, height=dp(28))
+        self.status_label = status
         root.add_widget(toolbar)
         root.add_widget(body)
         root.add_widget(status)
@@ -195,51 +368,275 @@ class NovelMobileApp(App):
         btn_delete.bind(on_release=lambda *_: self._delete_node())
         btn_up.bind(on_release=lambda *_: self._move_node(-1))
         btn_down.bind(on_release=lambda *_: self._move_node(1))
+        btn_books.bind(on_release=lambda *_: self._show_projects())
         btn_timeline.bind(on_release=lambda *_: self._show_timeline())
+        btn_find.bind(on_release=lambda *_: self._show_find_replace())
         btn_dash.bind(on_release=lambda *_: self._show_dashboard())
         btn_export.bind(on_release=lambda *_: self._export_txt())
         btn_focus.bind(on_release=lambda *_: self._toggle_focus())
+        btn_perf.bind(on_release=lambda *_: self._show_perf())
 
         theme_spinner.bind(text=lambda *_: self._on_theme_mode(theme_spinner.text))
         temp_slider.bind(value=lambda *_: self._on_temp(int(temp_slider.value)))
 
         # 初始树
         self._rebuild_tree()
-        self._open_first_chapter()
+        self._open_last_chapter()
         self._apply_theme()
+        self.editor.first_input_callback = lambda: mark_startup("first_keystroke")
+        mark_startup("ui_built")
+        Clock.schedule_once(lambda *_: self._after_first_frame(), 0)
 
         # 定时自动保存
         Clock.schedule_interval(lambda *_: self._autosave_tick(status), AUTOSAVE_INTERVAL_SECONDS)
 
+        # 性能指标定期落盘（data/metrics/metrics.jsonl，按大小轮转）
+        Clock.schedule_interval(lambda *_: self._flush_metrics(), METRICS_FLUSH_SECONDS)
+
+        # 外部改动（同步盘、其他编辑器）：轮询 stat，扫描在后台线程
+        Clock.schedule_interval(lambda *_: self._poll_external(), WATCH_INTERVAL_SECONDS)
+
         return root
 
-    def _init_project(self) -> None:
-        base = ensure_dir(data_root() / "projects" / DEFAULT_PROJECT_NAME)
+    def _after_first_frame(self) -> None:
+        mark_startup("first_frame")
+        # 首帧之后再做的事：字数缓存（后台线程）、指标文件、外部改动监视
+        self._rebuild_word_cache()
+        self.metrics_file = MetricsFile(data_root() / "metrics" / "metrics.jsonl")
+        self._start_watcher()
+
+    def _init_project(self, name: str, title: str | None = None) -> None:
+        # 只建 ProjectStore；版本/统计/资料库在首次访问对应属性时才创建
+        assert self.catalog is not None
+        base = ensure_dir(self.catalog.project_dir(name))
+        self.project_name = name
         self.project_dir = base
         self.store = ProjectStore(base)
-        self.version_store = VersionStore(base)
-        self.stats_store = StatsStore(base)
-        self.knowledge_store = KnowledgeStore(base)
 
         if self.store.exists():
             proj = self.store.load()
         else:
-            proj = self.store.create_default(DEFAULT_PROJECT_NAME)
+            proj = self.store.create_default(title or name)
 
+        self.project_title = proj.title
         self.project_root = proj.root
+        self.catalog.set_last_project(name)
+
+    def _switch_project(self, name: str, title: str | None = None) -> None:
+        """切换到另一本书：只拆掉与项目相关的状态，界面控件原样复用。title 仅在新建时使用。"""
+        if name == self.project_name:
+            return
+        self._close_project()
+        self._open_project(name, title)
+
+    def _close_project(self) -> None:
+        self._save_current_if_any()
+        self._maybe_snapshot(leaving=True)
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.flush()
+            self._snapshot_writer = None
+        self._update_catalog()
+        if self.store is not None:
+            self.store.on_write = None
+            try:
+                # 打包存储删改多了会留下大量空闲页，关项目时顺手回收
+                self.store.compact(PACK_COMPACT_MIN_FREE_PAGES)
+            except Exception:
+                pass
+            self.store.close()
+            self.store = None
+        self._watcher = None
+        self._conflict = None
+
+        self._version_store = None
+        self._stats_store = None
+        self._knowledge_store = None
+        self._current_chapter_id = None
+        self._paged = None
+        self._snapshots.clear()
+        self._chapter_word_cache.clear()
+        self._total_words_cache = 0
+        self._word_cache_ready = False
+        self._words_touched = None
+        self._folder_totals = None
+
+    def _open_project(self, name: str, title: str | None = None) -> None:
+        self._init_project(name, title)
+        self._rebuild_tree()
+        self._open_last_chapter()
         self._rebuild_word_cache()
+        self._start_watcher()
+
+    def _start_watcher(self) -> None:
+        from app.storage.watcher import ProjectWatcher
+
+        assert self.store is not None
+        assert self.project_dir is not None
+        self._watcher = ProjectWatcher(self.project_dir, watch_chapters=self.store.backend.kind == "dir")
+        self.store.on_write = self._watcher.absorb
+
+    def _poll_external(self) -> None:
+        watcher, store = self._watcher, self.store
+        if watcher is None or store is None or self._watch_busy:
+            return
+        self._watch_busy = True
 
+        def work() -> None:
+            try:
+                cs = watcher.poll()
+            except Exception:
+                cs = None
+            Clock.schedule_once(lambda *_: self._apply_external_changes(store, watcher, cs), 0)
+
+        threading.Thread(target=work, name="project-watcher", daemon=True).start()
+
+    def _apply_external_changes(self, store: ProjectStore, watcher: ProjectWatcher, cs: ChangeSet | None) -> None:
+        """只重读变了的章节；目录变了才重建树。当前章有未保存的修改时弹出冲突提示。"""
+        self._watch_busy = False
+        if store is not self.store or watcher is not self._watcher or not cs:
+            return
+        notes: list[str] = []
+        if cs.meta_changed:
+            if self._reload_tree_from_disk():
+                notes.append("目录")
+            else:
+                watcher.retry([], meta=True)
+
+        ids = sorted(set(cs.changed + cs.removed) & set(self._leaf_ids()))
+        texts: dict[str, str] = {}
+        for cid in ids:
+            store.cache.invalidate(cid)
+            try:
+                texts[cid] = store.read_chapter(cid)
+            except Exception:
+                # 多半是同步盘还没写完，下一轮再读
+                watcher.retry([cid])
+        cur = self._current_chapter_id
+        for cid, text in texts.items():
+            if cid == cur:
+                self._external_change_current(cid, text)
+            else:
+                self._set_chapter_words(cid, word_count(text))
+        if texts:
+            notes.append(f"{len(texts)} 章")
+        if notes and self.status_label is not None:
+            self.status_label.text = "已载入外部修改：" + "、".join(notes)
+
+    def _reload_tree_from_disk(self) -> bool:
+        assert self.store is not None
+        try:
+            proj = self.store.load()
+        except Exception:
+            return False
+        old = set(self._leaf_ids())
+        self.project_root = proj.root
+        self._leaf_order = None
+        new = set(self._leaf_ids())
+
+        # 字数缓存只增删有变化的章节
+        for cid in old - new:
+            self._total_words_cache -= self._chapter_word_cache.pop(cid, 0)
+        added = sorted(new - old)
+        for i in range(0, len(added), 200):
+            for cid, text in self.store.read_chapters(added[i : i + 200]).items():
+                wc = word_count(text)
+                self._chapter_word_cache[cid] = wc
+                self._total_words_cache += wc
+                if self._words_touched is not None:
+                    self._words_touched.add(cid)
+        if self._folder_totals is not None:
+            self._folder_totals = FolderTotals(proj.root, self._chapter_word_cache)
+        self._rebuild_tree()
+
+        if self._current_chapter_id is not None and self._current_chapter_id not in new:
+            # 当前章被外部移出目录：先把手上的内容存下来，再换到第一章
+            self._save_current_if_any()
+            self._current_chapter_id = None
+            self._load_editor("")
+            self._open_first_chapter()
+        return True
+
+    def _editor_dirty(self) -> bool:
+        assert self.editor is not None
+        if self._paged is not None:
+            return self._paged.dirty or self.editor.buffer.is_dirty
+        return self.editor.buffer.is_dirty
+
+    def _external_change_current(self, cid: str, text: str) -> None:
+        """当前章在外部被改了：没有未保存修改就直接载入，否则让用户选，两边都留版本。"""
+        if text == self._editor_full_text():
+            return
+        if not self._editor_dirty() and self._conflict is None:
+            self._load_editor(text)
+            self._snapshots.begin(cid, datetime.now().timestamp())
+            self._set_chapter_words(cid, word_count(text))
+            return
+        if self._conflict is not None:
+            # 提示还开着，外部又改了一次：以最新的为准
+            self._conflict["text"] = text
+            return
+
+        from kivy.uix.popup import Popup
+
+        self._conflict = {"cid": cid, "text": text}
+        box = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(10))
+        msg = Label(text="本章在应用之外被修改了，而这里还有未保存的内容。\n选择要保留的一边，另一边会存进时间轴。")
+        box.add_widget(msg)
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_mine = Button(text="保留我的版本")
+        b_theirs = Button(text="载入外部版本")
+        btns.add_widget(b_mine)
+        btns.add_widget(b_theirs)
+        box.add_widget(btns)
+        popup = Popup(title="外部修改冲突", content=box, size_hint=(0.9, None), height=dp(260), auto_dismiss=False)
+
+        def _resolve(keep_mine: bool) -> None:
+            popup.dismiss()
+            conflict, self._conflict = self._conflict, None
+            if conflict is None or conflict["cid"] != self._current_chapter_id:
+                return
+            theirs = conflict["text"]
+            if keep_mine:
+                self.snapshot_writer.submit(cid, theirs, word_count(theirs))
+                self._save_current_if_any(force=True)
+                return
+            self.snapshot_writer.submit(cid, self._editor_full_text(), self._editor_words())
+            self._load_editor(theirs)
+            self._snapshots.begin(cid, datetime.now().timestamp())
+            self._set_chapter_words(cid, word_count(theirs))
+
+        b_mine.bind(on_release=lambda *_: _resolve(True))
+        b_theirs.bind(on_release=lambda *_: _resolve(False))
+        popup.open()
+
+    def _update_catalog(self) -> None:
+        """把当前书的摘要写回书架索引（字数缓存完整后才写总字数）。"""
+        if self.catalog is None or self.store is None:
+            return
+        fields = {"title": self.project_title, "chapter_count": len(self._leaf_ids()), "updated_at": now_iso()}
+        if self._word_cache_ready:
+            fields["total_words"] = self._total_words_cache
+        try:
+            self.catalog.update(self.project_name, **fields)
+        except Exception:
+            pass
+
+    @timed("app.rebuild_tree")
     def _rebuild_tree(self) -> None:
         assert self.tree is not None
         assert self.project_root is not None
 
         self.tree.clear_tree()
+        self._leaf_order = None
+        self._tree_labels.clear()
 
         def add(parent_node, n: ChapterNode):
-            tv = TreeViewLabel(text=n.title)
+            tv = TreeViewLabel(text=self._tree_label_text(n.id, n.title, bool(n.is_folder)))
             tv.node_id = n.id  # type: ignore[attr-defined]
             tv.is_folder = bool(n.is_folder)  # type: ignore[attr-defined]
+            tv.title = n.title  # type: ignore[attr-defined]
             tv.color = (1, 1, 1, 1)
+            self._tree_labels[n.id] = tv
             new_parent = self.tree.add_node(tv, parent_node)
             for c in n.children:
                 add(new_parent, c)
@@ -247,6 +644,16 @@ class NovelMobileApp(App):
         for c in self.project_root.children:
             add(None, c)
 
+    def _tree_label_text(self, node_id: str, title: str, is_folder: bool) -> str:
+        if is_folder and self._folder_totals is not None:
+            return f"{title}  · {self._folder_totals.total(node_id)}字"
+        return title
+
+    def _refresh_tree_labels(self, node_ids) -> None:
+        for nid in node_ids:
+            tv = self._tree_labels.get(nid)
+            if tv is not None:
+                tv.text = self._tree_label_text(nid, tv.title, tv.is_folder)
 
     def _on_tree_touch(self, _tree, touch):
         # 只处理点到节点文本的情况
@@ -276,7 +683,6 @@ class NovelMobileApp(App):
         except Exception:
             pass
 
-
     def _find_node_by_id(self, node_id: str) -> ChapterNode | None:
         assert self.project_root is not None
 
@@ -291,6 +697,15 @@ class NovelMobileApp(App):
 
         return walk(self.project_root)
 
+    def _open_last_chapter(self) -> None:
+        assert self.store is not None
+        cid = self.store.load_state().get("last_chapter_id")
+        node = self._find_node_by_id(str(cid)) if cid else None
+        if node is not None and not node.is_folder:
+            self._open_chapter(node.id)
+        else:
+            self._open_first_chapter()
+
     def _open_first_chapter(self) -> None:
         assert self.project_root is not None
 
@@ -314,31 +729,173 @@ class NovelMobileApp(App):
         self._open_chapter(ch.id)
 
     def _open_chapter(self, chapter_id: str) -> None:
-        if self._current_chapter_id == chapter_id:
+        if self._current_chapter_id == chapter_id or self.store is None:
             return
         self._save_current_if_any()
+        self._maybe_snapshot(leaving=True)
 
         assert self.store is not None
         assert self.editor is not None
 
         self._current_chapter_id = chapter_id
         txt = self.store.read_chapter(chapter_id)
-        self.editor.text = txt
+        self._load_editor(txt)
+        self._snapshots.begin(chapter_id, datetime.now().timestamp())
+        self._prefetch_neighbors(chapter_id)
+        self.store.save_state({"last_chapter_id": chapter_id})
+
+    def _load_editor(self, txt: str) -> None:
+        """超长章节进入分页模式：编辑器只装入当前窗口的几页。"""
+        assert self.editor is not None
+        if len(txt) >= PAGED_EDITOR_MIN_CHARS:
+            self._paged = PagedDocument(txt, PAGE_CHARS, PAGED_WINDOW_PAGES)
+            self.editor.load_text(self._paged.window_text())
+        else:
+            self._paged = None
+            self.editor.load_text(txt)
+
+    def _replace_editor_text(self, txt: str) -> None:
+        """整体替换当前章正文，并标记为待保存。"""
+        assert self.editor is not None
+        if self._paged is None and len(txt) < PAGED_EDITOR_MIN_CHARS:
+            self.editor.replace_all(txt)
+            return
+        self._load_editor(txt)
+        if self._paged is not None:
+            self._paged.dirty = True
+            self._paged.changed_chars += len(txt)
+        else:
+            self.editor.replace_all(txt)
 
-    def _save_current_if_any(self) -> None:
+    def _commit_page_window(self) -> None:
+        assert self.editor is not None
+        buf = self.editor.buffer
+        if self._paged is not None and buf.is_dirty:
+            self._paged.commit_window(buf.text())
+            buf.mark_clean()
+
+    def _editor_full_text(self) -> str:
+        assert self.editor is not None
+        if self._paged is not None:
+            self._commit_page_window()
+            return self._paged.text()
+        return self.editor.buffer.text()
+
+    def _editor_words(self) -> int:
+        assert self.editor is not None
+        if self._paged is not None:
+            return self._paged.words_outside_window() + self.editor.buffer.words
+        return self.editor.buffer.words
+
+    def _editor_changed_chars(self) -> int:
+        assert self.editor is not None
+        base = self._paged.changed_chars if self._paged is not None else 0
+        return base + self.editor.buffer.changed_chars
+
+    def _on_editor_scroll(self, editor, scroll_y) -> None:
+        # 滚到窗口顶部/底部时换页；放到下一帧做，避免在属性回调里改文本
+        if self._paged is None or self._page_shift_pending:
+            return
+        max_scroll = max(0, editor.minimum_height - editor.height)
+        if scroll_y <= 0 and not self._paged.at_top:
+            delta = -1
+        elif max_scroll and scroll_y >= max_scroll - dp(4) and not self._paged.at_bottom:
+            delta = 1
+        else:
+            return
+        self._page_shift_pending = True
+        Clock.schedule_once(lambda *_: self._shift_page(delta), 0)
+
+    def _shift_page(self, delta: int) -> None:
+        self._page_shift_pending = False
+        doc = self._paged
+        if doc is None or self.editor is None:
+            return
+        self._commit_page_window()
+        old_start, old_count = doc.start, doc.count
+        if not doc.move_window(delta):
+            return
+        doc.changed_chars += self.editor.buffer.changed_chars
+        self.editor.load_text(doc.window_text())
+
+        # 光标放到新旧窗口交界的那一页开头，视口停在原来阅读的位置附近
+        boundary = old_start + old_count if delta > 0 else old_start
+        boundary = max(doc.start, min(boundary, doc.start + doc.count - 1))
+        self.editor.cursor = self.editor.get_cursor_from_index(doc.page_offset_in_window(boundary))
+
+    def _leaf_ids(self) -> list[str]:
+        """按目录顺序的章节 id；树结构变化时在 _rebuild_tree 里失效。"""
+        if self._leaf_order is None:
+            assert self.project_root is not None
+            self._leaf_order = self._collect_leaf_ids(self.project_root)
+        return self._leaf_order
+
+    def _prefetch_neighbors(self, chapter_id: str) -> None:
+        assert self.store is not None
+        order = self._leaf_ids()
+        try:
+            i = order.index(chapter_id)
+        except ValueError:
+            return
+        self.store.prefetch([order[j] for j in (i - 1, i + 1) if 0 <= j < len(order)])
+
+    def _save_current_if_any(self, force: bool = False) -> None:
+        """保存当前章；force=True 表示用户已确认覆盖外部版本，跳过磁盘改动检查。"""
         if not self._current_chapter_id:
             return
         assert self.store is not None
         assert self.editor is not None
 
         cid = self._current_chapter_id
-        txt = self.editor.text or ""
-        self.store.write_chapter(cid, txt)
+        if self._conflict is not None and self._conflict["cid"] == cid:
+            # 外部修改冲突未决：先不写盘，免得覆盖外部版本
+            return
+        buf = self.editor.buffer
+        if self._paged is not None:
+            self._commit_page_window()
+            if not self._paged.dirty:
+                return
+            text = self._paged.text()
+            if not force and self._changed_on_disk(cid, text):
+                return
+            self.store.write_chapter(cid, text)
+            self._paged.dirty = False
+        else:
+            if not buf.is_dirty:
+                return
+            text = buf.text()
+            if not force and self._changed_on_disk(cid, text):
+                return
+            self.store.write_chapter(cid, text)
+            buf.mark_clean()
+
+        self._set_chapter_words(cid, self._editor_words())
 
-        wc = word_count(txt)
-        old = self._chapter_word_cache.get(cid, 0)
+    def _changed_on_disk(self, cid: str, mine: str) -> bool:
+        """写盘前核对：文件在上次轮询/写入之后被外部改过，就转入冲突流程而不是覆盖。"""
+        if self._watcher is None or not self._watcher.is_stale(cid):
+            return False
+        assert self.store is not None
+        self.store.cache.invalidate(cid)
+        try:
+            theirs = self.store.read_chapter(cid)
+        except Exception:
+            # 外部还没写完，这一轮先不保存
+            return True
+        if theirs == mine:
+            return False
+        self._external_change_current(cid, theirs)
+        return True
+
+    def _set_chapter_words(self, cid: str, wc: int) -> None:
+        """更新单章字数：全书合计直接加差值，文件夹合计沿父链上传。"""
+        delta = wc - self._chapter_word_cache.get(cid, 0)
         self._chapter_word_cache[cid] = wc
-        self._total_words_cache += (wc - old)
+        self._total_words_cache += delta
+        if self._words_touched is not None:
+            self._words_touched.add(cid)
+        if self._folder_totals is not None and delta:
+            self._refresh_tree_labels(self._folder_totals.add(cid, delta))
 
     def _persist_tree(self) -> None:
         assert self.store is not None
@@ -346,56 +903,87 @@ class NovelMobileApp(App):
         assert self.project_root is not None
 
         # 只保存 root 到 project.json
-        proj = self.store.load() if self.store.exists() else self.store.create_default(DEFAULT_PROJECT_NAME)
+        proj = self.store.load() if self.store.exists() else self.store.create_default(self.project_name)
         proj.root = self.project_root
         self.store.save(proj)
+        self._update_catalog()
 
     def _rebuild_word_cache(self) -> None:
+        """在后台线程批量读取并计数，完成后回到主线程合并。
+
+        计数期间保存过的章节以内存里的新值为准（见 _words_touched）。
+        """
         assert self.project_root is not None
         assert self.store is not None
+        store = self.store
+        ids = self._collect_leaf_ids(self.project_root)
+        self._words_touched = set()
+
+        def work() -> None:
+            counts: dict[str, int] = {}
+            with span("app.rebuild_word_cache"):
+                for i in range(0, len(ids), 200):
+                    for cid, text in store.read_chapters(ids[i : i + 200]).items():
+                        counts[cid] = word_count(text)
+            Clock.schedule_once(lambda *_: self._apply_word_cache(store, counts), 0)
+
+        threading.Thread(target=work, name="word-cache", daemon=True).start()
+
+    def _apply_word_cache(self, store: ProjectStore, counts: dict[str, int]) -> None:
+        if store is not self.store:
+            return
+        live = set(self._leaf_ids())
+        for cid in self._words_touched or ():
+            if cid in self._chapter_word_cache:
+                counts[cid] = self._chapter_word_cache[cid]
         self._chapter_word_cache.clear()
-
-        def walk(n: ChapterNode):
-            for c in n.children:
-                if c.is_folder:
-                    walk(c)
-                else:
-                    self._chapter_word_cache[c.id] = word_count(self.store.read_chapter(c.id))
-
-        walk(self.project_root)
+        self._chapter_word_cache.update({cid: wc for cid, wc in counts.items() if cid in live})
         self._total_words_cache = sum(self._chapter_word_cache.values())
+        self._words_touched = None
+        self._word_cache_ready = True
+        assert self.project_root is not None
+        self._folder_totals = FolderTotals(self.project_root, self._chapter_word_cache)
+        self._refresh_tree_labels(self._folder_totals.totals)
+        mark_startup("word_cache_ready")
+        self._update_catalog()
 
-    def _on_editor_text(self, *_):
-        # 即时更新状态栏文本在 autosave_tick 里
-        pass
-
+    @timed("app.autosave_tick")
     def _autosave_tick(self, status_label: Label) -> None:
         if not self._current_chapter_id:
             return
-        assert self.version_store is not None
-        assert self.stats_store is not None
         assert self.editor is not None
 
         self._save_current_if_any()
 
-        cid = self._current_chapter_id
-        txt = self.editor.text or ""
-        wc = word_count(txt)
-
+        wc = self._editor_words()
         now = datetime.now().timestamp()
-        last_v = self._last_version_ts.get(cid, 0.0)
-        if now - last_v >= VERSION_SNAPSHOT_MIN_SECONDS and wc > 0:
-            self.version_store.snapshot(cid, txt, wc)
-            self._last_version_ts[cid] = now
+        self._maybe_snapshot(now=now)
 
-        if now - self._last_stats_ts >= 60:
+        # 字数缓存建好之前的总数不完整，不能写进历史
+        if self._word_cache_ready and now - self._last_stats_ts >= 60:
             self.stats_store.append_total(total_words=self._total_words_cache, ts=now_iso())
             self._last_stats_ts = now
+            self._update_catalog()
 
         status_label.text = f"总字数：{self._total_words_cache}    当前章：{wc}"
 
+    def _maybe_snapshot(self, leaving: bool = False, now: float | None = None) -> None:
+        """按改动量/停笔/切章决定是否留版本；正文在这里取出，写盘交给后台线程。"""
+        if not self._current_chapter_id or self.editor is None:
+            return
+        now = datetime.now().timestamp() if now is None else now
+        changed = self._editor_changed_chars()
+        if not self._snapshots.due(changed, now, leaving=leaving):
+            return
+        wc = self._editor_words()
+        if wc > 0:
+            self.snapshot_writer.submit(self._current_chapter_id, self._editor_full_text(), wc)
+        self._snapshots.taken(changed, now)
+
     def _open_prompt(self, title: str, hint: str, default: str, on_ok) -> None:
         """异步弹窗：避免阻塞 UI（安卓上更稳）。"""
+        from kivy.uix.popup import Popup
+
         box = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(10))
         ti = TextInput(text=default, multiline=False, size_hint_y=None, height=dp(38))
         box.add_widget(Label(text=hint, size_hint_y=None, height=dp(24)))
@@ -420,13 +1008,13 @@ class NovelMobileApp(App):
         cancel_btn.bind(on_release=_cancel)
         popup.open()
 
-
     def _add_node(self, is_folder: bool) -> None:
-        assert self.project_root is not None
-        if self.tree is None:
+        if self.tree is None or self.store is None:
             return
 
         def _create(title: str) -> None:
+            if self.store is None or self.project_root is None:
+                return
             title2 = title or ("新文件夹" if is_folder else "新章节")
             new_node = ChapterNode(id=str(uuid.uuid4()), title=title2, is_folder=is_folder, children=[])
 
@@ -435,23 +1023,20 @@ class NovelMobileApp(App):
             if self.tree and self.tree.selected_node is not None and getattr(self.tree.selected_node, "is_folder", False):
                 parent_id = getattr(self.tree.selected_node, "node_id")
 
-            if parent_id:
-                parent_model = self._find_node_by_id(parent_id)
-                if parent_model is not None:
-                    parent_model.children.append(new_node)
-                else:
-                    self.project_root.children.append(new_node)
-            else:
-                self.project_root.children.append(new_node)
+            parent_model = self._find_node_by_id(parent_id) if parent_id else None
+            if parent_model is None:
+                parent_model = self.project_root
+            parent_model.children.append(new_node)
+            if self._folder_totals is not None:
+                self._folder_totals.attach(new_node, parent_model.id, self._chapter_word_cache)
 
             self._persist_tree()
             self._rebuild_tree()
 
         self._open_prompt("新建", "标题：", "新文件夹" if is_folder else "新章节", _create)
 
-
     def _rename_node(self) -> None:
-        if self.tree is None or self.tree.selected_node is None:
+        if self.tree is None or self.tree.selected_node is None or self.store is None:
             return
         node_id = getattr(self.tree.selected_node, "node_id", None)
         if not node_id:
@@ -461,15 +1046,16 @@ class NovelMobileApp(App):
             return
 
         def _apply(title: str) -> None:
+            if self.store is None:
+                return
             m.title = title or m.title
             self._persist_tree()
             self._rebuild_tree()
 
         self._open_prompt("重命名", "标题：", m.title, _apply)
 
-
     def _delete_node(self) -> None:
-        if self.tree is None or self.tree.selected_node is None:
+        if self.tree is None or self.tree.selected_node is None or self.store is None:
             return
         node_id = getattr(self.tree.selected_node, "node_id", None)
         if not node_id:
@@ -484,6 +1070,8 @@ class NovelMobileApp(App):
             for i, c in enumerate(list(parent.children)):
                 if c.id == node_id:
                     removed_ids.extend(self._collect_leaf_ids(c))
+                    if self._folder_totals is not None:
+                        self._folder_totals.detach(c, self._chapter_word_cache)
                     parent.children.pop(i)
                     return True
                 if remove_from(c):
@@ -491,22 +1079,23 @@ class NovelMobileApp(App):
             return False
 
         remove_from(self.project_root)
+        # 字数缓存只减去被删章节，不重算
+        for cid in removed_ids:
+            self._total_words_cache -= self._chapter_word_cache.pop(cid, 0)
         self._persist_tree()
         self._rebuild_tree()
 
-        # 删除章节文件
+        # 删除章节正文
         for cid in removed_ids:
             try:
-                p = self.store.chapter_path(cid)
-                if p.exists():
-                    p.unlink()
+                self.store.delete_chapter(cid)
             except Exception:
                 pass
 
         if self._current_chapter_id in removed_ids:
             self._current_chapter_id = None
             if self.editor:
-                self.editor.text = ""
+                self._load_editor("")
             self._open_first_chapter()
 
     def _collect_leaf_ids(self, n: ChapterNode) -> list[str]:
@@ -519,7 +1108,7 @@ class NovelMobileApp(App):
 
     def _move_node(self, delta: int) -> None:
         # 仅支持同一父级内上移/下移
-        if self.tree is None or self.tree.selected_node is None:
+        if self.tree is None or self.tree.selected_node is None or self.store is None:
             return
         node_id = getattr(self.tree.selected_node, "node_id", None)
         if not node_id:
@@ -539,6 +1128,7 @@ class NovelMobileApp(App):
                     return True
             return False
 
+        # 同级换位不改变任何文件夹合计，重建树时直接读已维护的值
         if move_in(self.project_root):
             self._persist_tree()
             self._rebuild_tree()
@@ -575,11 +1165,279 @@ class NovelMobileApp(App):
             self.editor.foreground_color = hex_to_rgba(colors.fg, 1.0)
             self.editor.cursor_color = hex_to_rgba(colors.fg, 1.0)
 
+    def _show_projects(self) -> None:
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.popup import Popup
+
+        assert self.catalog is not None
+        self._update_catalog()
+        summaries = self.catalog.list_projects()
+
+        box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
+        list_box = GridLayout(cols=1, size_hint_y=None, spacing=dp(4))
+        list_box.bind(minimum_height=list_box.setter("height"))
+
+        popup = Popup(title="书架", content=box, size_hint=(0.92, 0.92))
+
+        def _open(name: str, title: str | None = None) -> None:
+            popup.dismiss()
+            self._switch_project(name, title)
+
+        for s in summaries:
+            mark = "✓ " if s.name == self.project_name else ""
+            b = Button(text=f"{mark}{s.title} · {s.chapter_count}章 · {s.total_words}字", size_hint_y=None, height=dp(46))
+            b.bind(on_release=lambda _btn, n=s.name: _open(n))
+            list_box.add_widget(b)
+
+        sv = ScrollView()
+        sv.add_widget(list_box)
+        box.add_widget(sv)
+
+        def _create(title: str) -> None:
+            if not title:
+                return
+            assert self.catalog is not None
+            name = base = safe_project_name(title)
+            k = 2
+            while self.catalog.project_dir(name).exists():
+                name = f"{base}_{k}"
+                k += 1
+            # 目录名去掉了非法字符，书名按用户输入的原样存进 project.json
+            _open(name, title.strip())
+
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_new = Button(text="新建书")
+        b_import = Button(text="导入TXT到本书")
+        btns.add_widget(b_new)
+        btns.add_widget(b_import)
+        box.add_widget(btns)
+
+        def _import(*_):
+            popup.dismiss()
+            self._show_import()
+
+        b_new.bind(on_release=lambda *_: self._open_prompt("新建书", "书名：", "新书", _create))
+        b_import.bind(on_release=_import)
+
+        def _backup(*_):
+            popup.dismiss()
+            self._show_backup()
+
+        b_backup = Button(text="备份/恢复", size_hint_y=None, height=dp(46))
+        b_backup.bind(on_release=_backup)
+        box.add_widget(b_backup)
+
+        popup.open()
+
+    def _show_backup(self) -> None:
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.popup import Popup
+
+        from app.storage.backup_store import BackupStore
+
+        box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
+        box.add_widget(Label(text="备份位置（文件夹或 .zip，可填 SD 卡路径）：", size_hint_y=None, height=dp(24)))
+        default_target = data_root() / "backups" / self.project_name
+        ti = TextInput(text=str(default_target), multiline=False, size_hint_y=None, height=dp(38))
+        box.add_widget(ti)
+
+        info = Label(text="", size_hint_y=None, height=dp(24))
+        box.add_widget(info)
+
+        list_box = GridLayout(cols=1, size_hint_y=None, spacing=dp(4))
+        list_box.bind(minimum_height=list_box.setter("height"))
+        sv = ScrollView()
+        sv.add_widget(list_box)
+        box.add_widget(sv)
+
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_list = Button(text="查看备份点")
+        b_run = Button(text="立即备份")
+        btns.add_widget(b_list)
+        btns.add_widget(b_run)
+        box.add_widget(btns)
+
+        popup = Popup(title="备份/恢复", content=box, size_hint=(0.95, 0.92))
+
+        def target() -> BackupStore:
+            return BackupStore(Path((ti.text or "").strip() or str(default_target)).expanduser())
+
+        state = {"busy": False}
+
+        def progress(label: str):
+            def cb(done: int, total: int) -> None:
+                text = f"{label}：{done}/{total} 个文件"
+                Clock.schedule_once(lambda *_: setattr(info, "text", text), 0)
+
+            return cb
+
+        def run_bg(label: str, job, done) -> None:
+            """备份/恢复都可能要复制几百 MB，放到后台线程；done(结果, 错误) 回到界面线程。"""
+            state["busy"] = True
+            # 进行中不许点外面关掉弹窗：恢复期间项目是关着的，工具栏的操作都无处落脚
+            popup.auto_dismiss = False
+            info.text = label
+
+            def work() -> None:
+                try:
+                    result = job()
+                except Exception as e:
+                    err = str(e)
+                    Clock.schedule_once(lambda *_: finish(None, err), 0)
+                    return
+                Clock.schedule_once(lambda *_: finish(result, ""), 0)
+
+            def finish(result, err: str) -> None:
+                state["busy"] = False
+                popup.auto_dismiss = True
+                done(result, err)
+
+            threading.Thread(target=work, name="backup", daemon=True).start()
+
+        def _restore(bs: BackupStore, point_id: str) -> None:
+            if state["busy"]:
+                return
+            name = self.project_name
+            assert self.project_dir is not None
+            project_dir = self.project_dir
+            # 先在界面线程保存并关闭项目，恢复期间没有任何写盘
+            self._close_project()
+            list_box.clear_widgets()
+
+            def done(n, err: str) -> None:
+                info.text = f"恢复失败：{err}" if err else f"已恢复到 {point_id}（写入 {n} 个文件）"
+                # 恢复期间用户若已打开别的项目，就不再切回来
+                if self.store is None:
+                    self._open_project(name)
+
+            run_bg("恢复中…", lambda: bs.restore(point_id, project_dir, on_progress=progress("恢复中")), done)
+
+        def _list(*_):
+            if state["busy"]:
+                return
+            list_box.clear_widgets()
+            try:
+                bs = target()
+                points = bs.list_points()
+            except Exception as e:
+                list_box.add_widget(Label(text=str(e), size_hint_y=None, height=dp(40)))
+                return
+            for p in reversed(points):
+                b = Button(text=f"恢复到 {p.created_at} · {p.files}个文件 · 新增{p.new_bytes // 1024}KB", size_hint_y=None, height=dp(42))
+                b.bind(on_release=lambda _btn, pid=p.id, s=bs: _restore(s, pid))
+                list_box.add_widget(b)
+
+        def _run(*_):
+            if state["busy"] or self.store is None:
+                return
+            assert self.project_dir is not None
+            self._save_current_if_any()
+            self.store.flush()
+            if self._snapshot_writer is not None:
+                self._snapshot_writer.flush()
+            project_dir = self.project_dir
+            try:
+                bs = target()
+            except Exception as e:
+                info.text = f"备份失败：{e}"
+                return
+            list_box.clear_widgets()
+
+            def done(p, err: str) -> None:
+                if err:
+                    info.text = f"备份失败：{err}"
+                else:
+                    info.text = f"备份完成：{p.files} 个文件，新增 {p.new_objects} 个对象（{p.new_bytes // 1024}KB）"
+
+            run_bg("备份中…", lambda: bs.backup(project_dir, on_progress=progress("备份中")), done)
+
+        b_list.bind(on_release=_list)
+        b_run.bind(on_release=_run)
+        popup.open()
+
+    def _show_import(self) -> None:
+        from kivy.uix.filechooser import FileChooserListView
+        from kivy.uix.popup import Popup
+
+        box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
+        chooser = FileChooserListView(path=str(Path.home()), filters=["*.txt", "*.TXT"])
+        box.add_widget(chooser)
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_ok = Button(text="导入")
+        b_cancel = Button(text="取消")
+        btns.add_widget(b_ok)
+        btns.add_widget(b_cancel)
+        box.add_widget(btns)
+
+        popup = Popup(title="导入TXT（按“第N章”/“#”标题拆分）", content=box, size_hint=(0.95, 0.95))
+
+        def _ok(*_):
+            if not chooser.selection:
+                return
+            popup.dismiss()
+            self._run_import(Path(chooser.selection[0]))
+
+        b_ok.bind(on_release=_ok)
+        b_cancel.bind(on_release=lambda *_: popup.dismiss())
+        popup.open()
+
+    def _run_import(self, src: Path) -> None:
+        """后台线程导入；完成后把新文件夹挂到目录末尾并合并字数。"""
+        from app.importers.txt_importer import ImportProgress, TxtImporter
+
+        assert self.store is not None
+        store = self.store
+        status = self.status_label
+
+        def progress(p: ImportProgress) -> None:
+            pct = int(p.bytes_read * 100 / p.total_bytes) if p.total_bytes else 100
+            text = f"导入中：{pct}%  已拆分 {p.chapters} 章"
+            if status is not None:
+                Clock.schedule_once(lambda *_: setattr(status, "text", text), 0)
+
+        def work() -> None:
+            try:
+                result = TxtImporter().run(src, store, on_progress=progress)
+            except Exception as e:
+                err = str(e)
+                Clock.schedule_once(lambda *_: self._import_failed(err), 0)
+                return
+            Clock.schedule_once(lambda *_: self._import_done(store, result), 0)
+
+        threading.Thread(target=work, name="txt-import", daemon=True).start()
+
+    def _import_done(self, store: ProjectStore, result) -> None:
+        from kivy.uix.popup import Popup
+
+        if store is not self.store or self.project_root is None:
+            return
+        self.project_root.children.append(result.root)
+        self._chapter_word_cache.update(result.word_counts)
+        self._total_words_cache += sum(result.word_counts.values())
+        if self._words_touched is not None:
+            self._words_touched.update(result.word_counts)
+        if self._folder_totals is not None:
+            self._folder_totals.attach(result.root, self.project_root.id, result.word_counts)
+        self._persist_tree()
+        self._rebuild_tree()
+        msg = f"已导入 {result.chapter_count} 章到“{result.root.title}”"
+        if self.status_label is not None:
+            self.status_label.text = msg
+        Popup(title="导入完成", content=Label(text=msg), size_hint=(0.9, None), height=dp(200)).open()
+
+    def _import_failed(self, err: str) -> None:
+        from kivy.uix.popup import Popup
+
+        Popup(title="导入失败", content=Label(text=err), size_hint=(0.9, None), height=dp(220)).open()
+
     def _show_timeline(self) -> None:
         if not self._current_chapter_id:
             return
-        assert self.version_store is not None
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.popup import Popup
 
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.flush()
         entries = self.version_store.list_versions(self._current_chapter_id)
 
         box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
@@ -621,14 +1479,18 @@ class NovelMobileApp(App):
 
         def _restore(*_):
             e = selected["v"]
-            if not e:
+            cid = self._current_chapter_id
+            if not e or not cid:
                 return
             txt = self.version_store.read_version(e)  # type: ignore[union-attr]
             if self.editor is not None:
-                self.editor.text = txt
+                # 回溯前当前内容若有未留版本的改动，先按切章补一个，回溯本身也就可以撤回
+                self._maybe_snapshot(leaving=True)
+                self._replace_editor_text(txt)
             self._save_current_if_any()
-            wc = word_count(txt)
-            self.version_store.snapshot(self._current_chapter_id, txt, wc)  # type: ignore[arg-type]
+            # 与自动快照同走后台写入，界面线程不碰版本文件
+            self.snapshot_writer.submit(cid, txt, word_count(txt))
+            self._snapshots.taken(self._editor_changed_chars(), datetime.now().timestamp())
             popup.dismiss()
 
         b_prev.bind(on_release=_preview)
@@ -636,39 +1498,311 @@ class NovelMobileApp(App):
 
         popup.open()
 
+    def _show_find_replace(self) -> None:
+        """全书查找/替换：结果按帧分批流式显示；替换在后台线程进行，可整批撤销。"""
+        from kivy.uix.checkbox import CheckBox
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.popup import Popup
+
+        from app.search.find_replace import FindReplace, SearchQuery
+
+        # 项目未打开（如正在从备份恢复）时没有可查找的内容
+        if self.store is None:
+            return
+        assert self.project_root is not None
+        self._save_current_if_any()
+        if self.editor is not None:
+            self.editor.focus = False
+        engine = FindReplace(self.store, self.project_root, self.version_store)
+
+        box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
+        ti_find = TextInput(hint_text="查找", multiline=False, size_hint_y=None, height=dp(38))
+        ti_repl = TextInput(hint_text="替换为（正则模式可用 \\1 引用分组）", multiline=False, size_hint_y=None, height=dp(38))
+        box.add_widget(ti_find)
+        box.add_widget(ti_repl)
+
+        opts = BoxLayout(size_hint_y=None, height=dp(34), spacing=dp(6))
+        cb_regex = CheckBox(size_hint_x=None, width=dp(34))
+        cb_case = CheckBox(size_hint_x=None, width=dp(34))
+        opts.add_widget(cb_regex)
+        opts.add_widget(Label(text="正则"))
+        opts.add_widget(cb_case)
+        opts.add_widget(Label(text="忽略大小写"))
+        box.add_widget(opts)
+
+        info = Label(text="", size_hint_y=None, height=dp(26))
+        box.add_widget(info)
+
+        list_box = GridLayout(cols=1, size_hint_y=None, spacing=dp(4))
+        list_box.bind(minimum_height=list_box.setter("height"))
+        sv = ScrollView()
+        sv.add_widget(list_box)
+        box.add_widget(sv)
+
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_find = Button(text="查找/预览")
+        b_replace = Button(text="全部替换")
+        b_undo = Button(text="撤销上次替换")
+        btns.add_widget(b_find)
+        btns.add_widget(b_replace)
+        btns.add_widget(b_undo)
+        box.add_widget(btns)
+
+        popup = Popup(title="全书查找替换", content=box, size_hint=(0.95, 0.95))
+        state: dict = {"ev": None, "busy": False}
+        max_rows = 300
+
+        def query() -> SearchQuery:
+            return SearchQuery(ti_find.text, regex=cb_regex.active, ignore_case=cb_case.active)
+
+        def stop_stream() -> None:
+            if state["ev"] is not None:
+                state["ev"].cancel()
+                state["ev"] = None
+
+        def jump(cid: str) -> None:
+            if state["busy"]:
+                return
+            popup.dismiss()
+            self._open_chapter(cid)
+
+        def _find(*_):
+            stop_stream()
+            list_box.clear_widgets()
+            try:
+                it = engine.iter_matches(query(), ti_repl.text if ti_repl.text else None)
+            except ValueError as e:
+                info.text = str(e)
+                return
+            found = {"n": 0, "chapters": set()}
+
+            def pump(*_):
+                # 每帧只消费一个帧预算的匹配，长书也不会卡住界面
+                deadline = time.perf_counter() + FRAME_BUDGET_MS / 1000.0
+                for m in it:
+                    found["n"] += 1
+                    found["chapters"].add(m.chapter_id)
+                    if found["n"] <= max_rows:
+                        b = Button(text=f"{m.chapter_title}：{m.preview()}", size_hint_y=None, height=dp(40), shorten=True)
+                        b.bind(width=lambda w, *_: setattr(w, "text_size", (w.width - dp(8), None)))
+                        b.bind(on_release=lambda _b, cid=m.chapter_id: jump(cid))
+                        list_box.add_widget(b)
+                    if time.perf_counter() >= deadline:
+                        info.text = f"查找中… {found['n']} 处 / {len(found['chapters'])} 章"
+                        return
+                state["ev"] = None
+                more = f"（仅列出前 {max_rows} 处）" if found["n"] > max_rows else ""
+                info.text = f"共 {found['n']} 处，涉及 {len(found['chapters'])} 章{more}"
+                return False
+
+            state["ev"] = Clock.schedule_interval(pump, 0)
+
+        def run_bg(label: str, job, done) -> None:
+            if state["busy"]:
+                return
+            stop_stream()
+            state["busy"] = True
+            store = self.store
+            info.text = label
+            # 后台改写期间不能关弹窗、不能打字：否则输入要么被重新载入冲掉，要么被整批写入覆盖
+            popup.auto_dismiss = False
+            if self.editor is not None:
+                self.editor.readonly = True
+
+            def work() -> None:
+                try:
+                    result = job()
+                except Exception as e:
+                    err = str(e)
+                    Clock.schedule_once(lambda *_: finish(None, err), 0)
+                    return
+                Clock.schedule_once(lambda *_: finish(result, ""), 0)
+
+            def finish(result, err: str) -> None:
+                state["busy"] = False
+                popup.auto_dismiss = True
+                if self.editor is not None:
+                    self.editor.readonly = False
+                if store is not self.store:
+                    return
+                if err:
+                    info.text = err
+                    return
+                done(result)
+
+            threading.Thread(target=work, name="find-replace", daemon=True).start()
+
+        def progress(done: int, total: int) -> None:
+            text = f"替换中：{done}/{total} 章"
+            Clock.schedule_once(lambda *_: setattr(info, "text", text), 0)
+
+        def _replace(*_):
+            try:
+                q = query()
+                q.compile()
+            except ValueError as e:
+                info.text = str(e)
+                return
+            repl = ti_repl.text
+            self._save_current_if_any()
+
+            def done(batch) -> None:
+                list_box.clear_widgets()
+                self._apply_rewritten_chapters({c["chapter_id"]: c["words"] for c in batch.chapters})
+                info.text = f"已替换 {batch.total} 处，涉及 {len(batch.chapters)} 章（可撤销）"
+
+            run_bg("替换中…", lambda: engine.replace_all(q, repl, on_progress=progress), done)
+
+        def _undo(*_):
+            batches = engine.list_batches()
+            if not batches:
+                info.text = "没有可撤销的替换"
+                return
+            last = batches[0]
+            self._save_current_if_any()
+
+            def done(counts: dict[str, int]) -> None:
+                list_box.clear_widgets()
+                self._apply_rewritten_chapters(counts)
+                info.text = f"已撤销“{last.query}→{last.replacement}”，恢复 {len(counts)} 章"
+
+            run_bg("撤销中…", lambda: engine.undo_batch(last.id), done)
+
+        b_find.bind(on_release=_find)
+        ti_find.bind(on_text_validate=_find)
+        b_replace.bind(on_release=_replace)
+        b_undo.bind(on_release=_undo)
+        popup.bind(on_dismiss=lambda *_: stop_stream())
+        popup.open()
+
+    def _apply_rewritten_chapters(self, counts: dict[str, int]) -> None:
+        """章节正文在编辑器之外被整体改写后：合并字数，必要时重新载入当前章。"""
+        assert self.store is not None
+        for cid, wc in counts.items():
+            self._set_chapter_words(cid, wc)
+        cid = self._current_chapter_id
+        if cid is not None and cid in counts:
+            if self.editor is not None and self._editor_dirty():
+                # 重新载入前给编辑器里还没保存的内容留一版
+                self.snapshot_writer.submit(cid, self._editor_full_text(), self._editor_words())
+            self._load_editor(self.store.read_chapter(cid))
+            self._snapshots.begin(cid, datetime.now().timestamp())
+        self._update_catalog()
+
     def _show_dashboard(self) -> None:
-        assert self.stats_store is not None
-        daily = self.stats_store.daily_progress()
-        days = sorted(daily.keys())[-14:]
-        vals = [int(daily[d]) for d in days]
+        from kivy.uix.popup import Popup
+
+        from charts import BarChart
+
+        if self.store is None:
+            return
+        stats = self.stats_store
+        _, week = stats.progress_series("week")
 
         box = BoxLayout(orientation="vertical", spacing=dp(8), padding=dp(10))
         box.add_widget(Label(text=f"总字数：{self._total_words_cache}", size_hint_y=None, height=dp(26)))
-        box.add_widget(Label(text=f"今日进度：{(vals[-1] if vals else 0)}", size_hint_y=None, height=dp(26)))
+        box.add_widget(Label(text=f"今日进度：{week[-1] if week else 0}", size_hint_y=None, height=dp(26)))
 
+        # 周/月/年按天、全部按月；序列来自预聚合桶，图表按像素宽度降采样
+        views = BoxLayout(size_hint_y=None, height=dp(38), spacing=dp(6))
+        range_label = Label(text="", size_hint_y=None, height=dp(24))
         chart = BarChart(size_hint_y=None, height=dp(160))
-        chart.values = vals
-        chart.labels = [d[5:] for d in days]
-        chart.redraw()
+
+        def show(view: str) -> None:
+            labels, vals = stats.progress_series(view)
+            chart.labels = labels
+            chart.values = vals
+            span_text = f"{labels[0]} ~ {labels[-1]}" if labels else "暂无记录"
+            range_label.text = f"{span_text}    合计：{sum(vals)}字"
+
+        for view, text in (("week", "周"), ("month", "月"), ("year", "年"), ("all", "全部")):
+            b = Button(text=text)
+            b.bind(on_release=lambda _b, v=view: show(v))
+            views.add_widget(b)
+        box.add_widget(views)
+        box.add_widget(range_label)
         box.add_widget(chart)
+        show("month")
 
         # Top10 章节
         top = sorted(self._chapter_word_cache.items(), key=lambda x: x[1], reverse=True)[:10]
         lines = [f"{i+1}. {cid[:8]}…  {wc}字" for i, (cid, wc) in enumerate(top)]
         box.add_widget(Label(text="Top10 章节（按字数）\n" + "\n".join(lines), halign="left"))
 
+        b_analyze = Button(text="全书分析（句长/对话/重复/人物）", size_hint_y=None, height=dp(46))
+        b_analyze.bind(on_release=lambda *_: self._run_analysis())
+        box.add_widget(b_analyze)
+
         Popup(title="仪表盘", content=box, size_hint=(0.92, 0.92)).open()
 
+    def _run_analysis(self) -> None:
+        """后台线程分析全书；只有内容变过的章节会重新计算。"""
+        from app.analysis.manuscript import ManuscriptAnalyzer, summarize
+
+        if self.store is None:
+            return
+        assert self.project_dir is not None
+        self._save_current_if_any()
+        store = self.store
+        ids = list(self._leaf_ids())
+        analyzer = ManuscriptAnalyzer(self.project_dir, store, names=self.knowledge_store.load().characters)
+        status = self.status_label
+
+        def progress(done: int, total: int) -> None:
+            if status is not None:
+                text = f"分析中：{done}/{total} 章"
+                Clock.schedule_once(lambda *_: setattr(status, "text", text), 0)
+
+        def work() -> None:
+            try:
+                summary = summarize(analyzer.analyze(ids, on_progress=progress))
+            except Exception as e:
+                err = str(e)
+                Clock.schedule_once(lambda *_: self._show_analysis(None, err), 0)
+                return
+            Clock.schedule_once(lambda *_: self._show_analysis(summary, ""), 0)
+
+        threading.Thread(target=work, name="analysis", daemon=True).start()
+
+    def _show_analysis(self, summary: dict | None, err: str) -> None:
+        from kivy.uix.popup import Popup
+
+        from app.analysis.manuscript import SENTENCE_BUCKETS
+
+        if summary is None:
+            Popup(title="分析失败", content=Label(text=err), size_hint=(0.9, None), height=dp(220)).open()
+            return
+        bounds = [f"≤{b}" for b in SENTENCE_BUCKETS] + [f">{SENTENCE_BUCKETS[-1]}"]
+        hist = "  ".join(f"{b}:{n}" for b, n in zip(bounds, summary["sentence_hist"]))
+        ngrams = "、".join(f"{g}×{c}" for g, c in summary["repeated_ngrams"][:10]) or "（无）"
+        names = "、".join(f"{n}×{c}" for n, c in list(summary["names"].items())[:10]) or "（资料库中没有人物）"
+        lines = [
+            f"章节：{summary['chapters']}    字数：{summary['words']}    句子：{summary['sentences']}",
+            f"平均句长：{summary['mean_sentence_len']} 字    对话占比：{summary['dialogue_ratio'] * 100:.1f}%",
+            f"句长分布：{hist}",
+            f"高频重复短语：{ngrams}",
+            f"人物出现次数：{names}",
+        ]
+        label = Label(text="\n\n".join(lines), halign="left", valign="top")
+        label.bind(size=lambda w, *_: setattr(w, "text_size", (w.width, None)))
+        Popup(title="全书分析", content=label, size_hint=(0.95, 0.9)).open()
+
     def _export_txt(self) -> None:
-        assert self.store is not None
+        from kivy.uix.popup import Popup
+
+        from app.exporters.exporter import ExportContext
+        from app.exporters.txt_exporter import TxtExporter
+
+        if self.store is None:
+            return
         assert self.project_dir is not None
         assert self.project_root is not None
 
         # 导出到 data 目录下 exports
         export_dir = ensure_dir(self.project_dir / "exports")
-        out_path = export_dir / f"{DEFAULT_PROJECT_NAME}_{now_iso().replace(':', '-')}.txt"
+        out_path = export_dir / f"{self.project_name}_{now_iso().replace(':', '-')}.txt"
 
-        proj = self.store.load() if self.store.exists() else self.store.create_default(DEFAULT_PROJECT_NAME)
+        proj = self.store.load() if self.store.exists() else self.store.create_default(self.project_name)
         proj.root = self.project_root
 
         try:
@@ -677,6 +1811,65 @@ class NovelMobileApp(App):
         except Exception as e:
             Popup(title="导出失败", content=Label(text=str(e)), size_hint=(0.9, None), height=dp(220)).open()
 
+    def _flush_metrics(self) -> None:
+        if self.metrics_file is None:
+            return
+        try:
+            self.metrics_file.write(now_iso())
+        except Exception:
+            pass
+
+    def on_stop(self):
+        if self._conflict is not None and self._current_chapter_id == self._conflict["cid"]:
+            # 冲突没处理就退出：外部版本已在磁盘上，手上的内容存进时间轴
+            self.snapshot_writer.submit(self._conflict["cid"], self._editor_full_text(), self._editor_words())
+        self._save_current_if_any()
+        self._maybe_snapshot(leaving=True)
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.flush()
+        self._flush_metrics()
+
+    def _show_perf(self) -> None:
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.popup import Popup
+
+        snap = recorder.snapshot()
+
+        box = BoxLayout(orientation="vertical", spacing=dp(6), padding=dp(10))
+        box.add_widget(Label(text=f"超过 {recorder.budget_ms:.0f}ms 帧预算的调用会写入日志", size_hint_y=None, height=dp(26)))
+
+        grid = GridLayout(cols=5, size_hint_y=None, spacing=dp(2))
+        grid.bind(minimum_height=grid.setter("height"))
+        for h in ("span", "次数", "p50", "p95", "最大"):
+            grid.add_widget(Label(text=h, size_hint_y=None, height=dp(26)))
+        for name, s in snap["spans"].items():
+            for v in (name, str(s["count"]), f"{s['p50_ms']:g}", f"{s['p95_ms']:g}", f"{s['max_ms']:.1f}"):
+                grid.add_widget(Label(text=v, size_hint_y=None, height=dp(24)))
+        for name, ms in snap["marks"].items():
+            for v in (name, "", "", "", f"{ms:.1f}"):
+                grid.add_widget(Label(text=v, size_hint_y=None, height=dp(24)))
+
+        sv = ScrollView()
+        sv.add_widget(grid)
+        box.add_widget(sv)
+
+        btns = BoxLayout(size_hint_y=None, height=dp(46), spacing=dp(6))
+        b_flush = Button(text="写入指标文件")
+        b_reset = Button(text="清空")
+        btns.add_widget(b_flush)
+        btns.add_widget(b_reset)
+        box.add_widget(btns)
+
+        popup = Popup(title="性能", content=box, size_hint=(0.95, 0.92))
+
+        def _reset(*_):
+            recorder.reset()
+            popup.dismiss()
+
+        b_flush.bind(on_release=lambda *_: self._flush_metrics())
+        b_reset.bind(on_release=_reset)
+        popup.open()
+
 
 if __name__ == "__main__":
     NovelMobileApp().run()
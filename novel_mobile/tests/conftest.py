@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 测试从 novel_mobile 目录的包（app、main）导入
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,27 @@
+import pytest
+
+from app.storage.backup_store import BackupStore
+
+
+@pytest.mark.parametrize("name", ["bak", "bak.zip"])
+def test_backup_restore_round_trip_with_progress(tmp_path, name):
+    proj = tmp_path / "proj"
+    (proj / "chapters").mkdir(parents=True)
+    (proj / "project.json").write_text("{}", encoding="utf-8")
+    for i in range(45):
+        (proj / "chapters" / f"c{i}.md").write_text(f"第{i}章", encoding="utf-8")
+
+    bs = BackupStore(tmp_path / name)
+    calls = []
+    point = bs.backup(proj, on_progress=lambda d, t: calls.append((d, t)))
+    assert point.files == 46
+    assert calls[-1] == (46, 46)
+    assert [d for d, _t in calls] == sorted(d for d, _t in calls)
+
+    (proj / "chapters" / "c3.md").write_text("改坏了", encoding="utf-8")
+    (proj / "chapters" / "new.md").write_text("后来加的", encoding="utf-8")
+    calls.clear()
+    assert bs.restore(point.id, proj, on_progress=lambda d, t: calls.append((d, t))) == 1
+    assert calls[-1] == (46, 46)
+    assert (proj / "chapters" / "c3.md").read_text(encoding="utf-8") == "第3章"
+    assert not (proj / "chapters" / "new.md").exists()
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+pytest.importorskip("kivy")
+
+from main import BufferedTextInput  # noqa: E402
+
+
+def _press(ti, action):
+    # 与键盘事件走同一条路径：TextInput._key_down((显示字符, 内部字符, 动作, 缩放))
+    ti._key_down((None, None, action, 1))
+
+
+@pytest.mark.parametrize("cursor", [0, 2, 5])
+def test_forward_delete_keeps_buffer_in_sync(cursor):
+    ti = BufferedTextInput(multiline=True)
+    ti.load_text("abcde")
+    ti.cursor = ti.get_cursor_from_index(cursor)
+    _press(ti, "del")
+    assert ti.buffer.text() == ti.text
+
+
+def test_backspace_and_typing_keep_buffer_in_sync():
+    ti = BufferedTextInput(multiline=True)
+    ti.load_text("第一行\n第二行")
+    ti.cursor = ti.get_cursor_from_index(3)
+    _press(ti, "backspace")
+    ti.insert_text("X")
+    _press(ti, "del")
+    assert ti.buffer.text() == ti.text
+    ti.do_undo()
+    assert ti.buffer.text() == ti.text
@@ -0,0 +1,47 @@
+from app.models import ChapterNode
+from app.storage.catalog_store import CatalogStore, safe_project_name
+from app.storage.chapter_backend import migrate_chapters
+from app.storage.project_store import ProjectStore
+
+
+def _make(catalog, name, title, texts):
+    store = ProjectStore(catalog.project_dir(name))
+    proj = store.create_default(title)
+    for cid, text in texts.items():
+        proj.root.children.append(ChapterNode(id=cid, title=cid))
+        store.write_chapter(cid, text)
+    store.save(proj)
+    store.close()
+
+
+def test_safe_project_name():
+    assert safe_project_name('a/b:c?') == "a_b_c_"
+    assert safe_project_name("  ") == "未命名"
+
+
+def test_scan_reads_title_and_counts(tmp_path):
+    catalog = CatalogStore(tmp_path)
+    _make(catalog, "a_b", "a/b", {"c1": "一二三", "c2": "四五"})
+    [s] = catalog.list_projects()
+    assert (s.name, s.title, s.chapter_count, s.total_words) == ("a_b", "a/b", 2, 5)
+
+
+def test_scan_does_not_create_files(tmp_path):
+    catalog = CatalogStore(tmp_path)
+    _make(catalog, "empty", "空书", {})
+    d = catalog.project_dir("empty")
+    (d / "chapters").rmdir()
+    before = sorted(p.name for p in d.rglob("*"))
+    [s] = catalog.list_projects()
+    assert s.chapter_count == 0
+    assert sorted(p.name for p in d.rglob("*")) == before
+
+
+def test_scan_pack_project(tmp_path):
+    catalog = CatalogStore(tmp_path)
+    _make(catalog, "p", "打包", {"c1": "一二三"})
+    migrate_chapters(catalog.project_dir("p"), "pack").close()
+    before = sorted(p.name for p in catalog.project_dir("p").rglob("*"))
+    [s] = catalog.list_projects()
+    assert s.total_words == 3
+    assert sorted(p.name for p in catalog.project_dir("p").rglob("*")) == before
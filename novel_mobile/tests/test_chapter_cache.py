@@ -0,0 +1,62 @@
+import time
+
+from app.exporters.exporter import ExportContext, flatten_content
+from app.models import ChapterNode, Project
+from app.storage.chapter_cache import ChapterCache
+from app.storage.project_store import ProjectStore
+
+
+def test_lru_by_chars():
+    c = ChapterCache(10)
+    c.put("a", "12345")
+    c.put("b", "1234")
+    assert c.get("a") == "12345"  # a 变成最近使用
+    c.put("c", "123")
+    assert "b" not in c
+    assert c.get("a") == "12345" and c.get("c") == "123"
+    assert c.chars == 8
+
+
+def test_oversized_entry_not_cached():
+    c = ChapterCache(4)
+    c.put("a", "12")
+    c.put("a", "12345")
+    assert "a" not in c
+    assert c.chars == 0
+
+
+def test_stale_prefetch_is_dropped():
+    c = ChapterCache(100)
+    gen = c.generation("a")
+    c.put("a", "新")  # 预取读盘期间发生了写入
+    assert not c.put_if_current("a", "旧", gen)
+    assert c.get("a") == "新"
+    c.invalidate("a")
+    assert c.get("a") is None
+    assert c.put_if_current("a", "再读", c.generation("a"))
+
+
+def test_store_reads_through_cache_and_prefetches(tmp_path):
+    store = ProjectStore(tmp_path)
+    store.write_chapters([("a", "一"), ("b", "二"), ("c", "三")])
+    assert "a" not in store.cache  # 批量写不回填
+    assert store.read_chapter("a") == "一"
+    assert "a" in store.cache
+    store.prefetch(["b", "c"])
+    deadline = time.time() + 5
+    while ("b" not in store.cache or "c" not in store.cache) and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.cache.get("c") == "三"
+    store.write_chapter("b", "二改")
+    assert store.read_chapter("b") == "二改"
+    store.close()
+
+
+def test_export_does_not_fill_cache(tmp_path):
+    store = ProjectStore(tmp_path)
+    store.write_chapters([("a", "一"), ("b", "二")])
+    root = ChapterNode("root", "书", True, [ChapterNode("v", "卷一", True, [ChapterNode("a", "第一章")]), ChapterNode("b", "第二章")])
+    rows = flatten_content(ExportContext(Project("p", "书", root, "", ""), store))
+    assert rows == [("卷一", "", True), ("第一章", "一", False), ("第二章", "二", False)]
+    assert "a" not in store.cache and "b" not in store.cache
+    store.close()
@@ -0,0 +1,50 @@
+from app.cli import main
+from app.storage.chapter_backend import PackChapterBackend, open_chapter_backend
+from app.storage.project_store import ProjectStore
+
+
+def _make_project(tmp_path, chapters=50):
+    p = tmp_path / "projects" / "书"
+    store = ProjectStore(p)
+    store.create_default("书")
+    store.write_chapters((f"c{i}", f"第{i}章" * 500) for i in range(chapters))
+    store.close()
+    return p
+
+
+def test_migrate_to_pack_and_back(tmp_path, capsys):
+    p = _make_project(tmp_path)
+    assert main(["--data", str(tmp_path), "--workers", "1", "migrate", "--to", "pack", "书"]) == 0
+    assert "dir → pack" in capsys.readouterr().out
+    b = open_chapter_backend(p)
+    assert b.kind == "pack"
+    assert b.read("c7") == "第7章" * 500
+    b.close()
+    assert main(["--data", str(tmp_path), "--workers", "1", "migrate", "--to", "dir", "书"]) == 0
+    assert (p / "chapters" / "c7.md").read_text(encoding="utf-8") == "第7章" * 500
+
+
+def test_compact_reclaims_deleted_pages(tmp_path):
+    p = _make_project(tmp_path, chapters=0)
+    b = PackChapterBackend(p, codec="plain")
+    b.write_many((f"c{i}", "字" * 4000) for i in range(200))
+    for i in range(200):
+        b.delete(f"c{i}")
+    b.flush()
+    assert b.compact(min_free_pages=10**6) == 0
+    assert b.compact(min_free_pages=10) > 10
+    assert b.compact() == 0
+    b.close()
+    assert main(["--data", str(tmp_path), "--workers", "1", "compact", "书"]) == 0
+
+
+def test_check_is_read_only(tmp_path, capsys):
+    p = tmp_path / "projects" / "书"
+    store = ProjectStore(p)
+    store.create_default("书")
+    store.close()
+    (p / "chapters").rmdir()
+    before = sorted(x.name for x in p.rglob("*"))
+    assert main(["--data", str(tmp_path), "--workers", "1", "check", "书"]) == 0
+    assert "正常" in capsys.readouterr().out
+    assert sorted(x.name for x in p.rglob("*")) == before
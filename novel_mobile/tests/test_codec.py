@@ -0,0 +1,55 @@
+import pytest
+
+from app.constants import COMPRESS_MIN_BYTES
+from app.storage import codec
+from app.storage.chapter_backend import DirChapterBackend, PackChapterBackend, migrate_chapters
+from app.storage.codec import MAGIC, decode_bytes, encode_text, parse_codec
+
+LONG = "天色将晚，他推开门，风雪扑面而来。" * 2000
+
+
+@pytest.mark.parametrize("spec", ["plain", "auto", "zlib", "zlib:1", "lzma", "lzma:0"])
+def test_round_trip(spec):
+    for text in ("", "短", LONG):
+        assert decode_bytes(encode_text(text, spec)) == text
+
+
+def test_auto_keeps_short_text_plain():
+    short = "一" * (COMPRESS_MIN_BYTES // 6)
+    assert encode_text(short, "auto") == short.encode("utf-8")
+    assert encode_text(LONG, "auto").startswith(MAGIC)
+
+
+def test_parse_codec():
+    assert parse_codec("zlib:9") == ("zlib", 9)
+    assert parse_codec("") == ("plain", None)
+    with pytest.raises(ValueError):
+        parse_codec("brotli")
+
+
+def test_lzma_falls_back_to_zlib(monkeypatch):
+    monkeypatch.setattr(codec, "_lzma", lambda: None)
+    data = encode_text(LONG, "lzma")
+    assert data.startswith(MAGIC + b"z")
+    assert decode_bytes(data) == LONG
+
+
+def test_dir_backend_writes_plain_and_reads_legacy(tmp_path):
+    b = DirChapterBackend(tmp_path)
+    b.write("a", LONG)
+    assert b.path("a").read_bytes() == LONG.encode("utf-8")
+    # 旧版本压缩写入的文件
+    b.path("b").write_bytes(encode_text(LONG, "zlib"))
+    assert b.read("b") == LONG
+
+
+def test_migrate_round_trip(tmp_path):
+    d = DirChapterBackend(tmp_path)
+    d.write_many([("a", LONG), ("b", "二")])
+    pack = migrate_chapters(tmp_path, "pack")
+    assert isinstance(pack, PackChapterBackend)
+    assert pack.read_many(["a", "b"]) == {"a": LONG, "b": "二"}
+    assert not list((tmp_path / "chapters").glob("*.md"))
+    back = migrate_chapters(tmp_path, "dir")
+    assert back.read("a") == LONG
+    assert not (tmp_path / "chapters.db").exists()
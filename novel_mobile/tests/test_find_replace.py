@@ -0,0 +1,50 @@
+from app.models import ChapterNode
+from app.search.find_replace import FindReplace, SearchQuery
+from app.storage.project_store import ProjectStore
+from app.storage.version_store import VersionStore
+
+
+def _setup(tmp_path, texts):
+    store = ProjectStore(tmp_path)
+    root = ChapterNode(id="root", title="root", is_folder=True)
+    for cid, text in texts.items():
+        root.children.append(ChapterNode(id=cid, title=cid, is_folder=False))
+        store.write_chapter(cid, text)
+    return store, FindReplace(store, root, VersionStore(tmp_path))
+
+
+def test_replace_matches_preview(tmp_path):
+    store, fr = _setup(tmp_path, {"a": "他说，他走了。", "b": "无关"})
+    q = SearchQuery("他")
+    assert len(list(fr.iter_matches(q))) == 2
+    batch = fr.replace_all(q, "她")
+    assert batch.total == 2
+    assert [c["chapter_id"] for c in batch.chapters] == ["a"]
+    assert store.read_chapter("a") == "她说，她走了。"
+    assert store.read_chapter("b") == "无关"
+
+
+def test_zero_width_matches_are_not_replaced(tmp_path):
+    store, fr = _setup(tmp_path, {"a": "aaxbx"})
+    q = SearchQuery("x*", regex=True)
+    preview = list(fr.iter_matches(q, "-"))
+    batch = fr.replace_all(q, "-")
+    assert store.read_chapter("a") == "aa-b-"
+    assert batch.total == len(preview) == 2
+
+
+def test_pure_empty_pattern_changes_nothing(tmp_path):
+    store, fr = _setup(tmp_path, {"a": "第一行\n第二行"})
+    batch = fr.replace_all(SearchQuery("^", regex=True), "> ")
+    assert batch.total == 0
+    assert store.read_chapter("a") == "第一行\n第二行"
+    assert fr.list_batches() == []
+
+
+def test_regex_groups_and_undo(tmp_path):
+    store, fr = _setup(tmp_path, {"a": "2024年3月", "b": "1999年1月"})
+    batch = fr.replace_all(SearchQuery(r"(\d+)年", regex=True), r"\1-")
+    assert store.read_chapter("a") == "2024-3月"
+    counts = fr.undo_batch(batch.id)
+    assert set(counts) == {"a", "b"}
+    assert store.read_chapter("b") == "1999年1月"
@@ -0,0 +1,49 @@
+from app.models import ChapterNode
+from app.utils.folder_totals import FolderTotals
+
+
+def _tree():
+    # root ─ vol1 ─ a, b
+    #      └ vol2 ─ part ─ c
+    #      └ d
+    a, b, c, d = (ChapterNode(id=x, title=x) for x in "abcd")
+    part = ChapterNode(id="part", title="part", is_folder=True, children=[c])
+    vol1 = ChapterNode(id="vol1", title="vol1", is_folder=True, children=[a, b])
+    vol2 = ChapterNode(id="vol2", title="vol2", is_folder=True, children=[part])
+    root = ChapterNode(id="root", title="root", is_folder=True, children=[vol1, vol2, d])
+    return root, {"a": 10, "b": 20, "c": 30, "d": 5}
+
+
+def test_initial_totals():
+    root, counts = _tree()
+    ft = FolderTotals(root, counts)
+    assert ft.total("root") == 65
+    assert ft.total("vol1") == 30
+    assert ft.total("part") == ft.total("vol2") == 30
+
+
+def test_add_propagates_to_ancestors():
+    root, counts = _tree()
+    ft = FolderTotals(root, counts)
+    assert ft.add("c", 7) == ["part", "vol2", "root"]
+    assert ft.total("root") == 72
+    assert ft.add("a", 0) == []
+
+
+def test_attach_and_detach_subtree():
+    root, counts = _tree()
+    ft = FolderTotals(root, counts)
+    vol2 = root.children[1]
+    assert set(ft.detach(vol2, counts)) == {"root"}
+    assert ft.total("root") == 35
+    assert ft.total("part") == 0
+    root.children.remove(vol2)
+
+    e = ChapterNode(id="e", title="e")
+    new = ChapterNode(id="vol3", title="vol3", is_folder=True, children=[e])
+    counts["e"] = 100
+    ft.attach(new, "vol1", counts)
+    assert ft.total("vol3") == 100
+    assert ft.total("vol1") == 130
+    assert ft.total("root") == 135
+    assert ft.add("e", 1) == ["vol3", "vol1", "root"]
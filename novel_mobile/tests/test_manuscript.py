@@ -0,0 +1,22 @@
+from app.analysis.manuscript import TOP_NGRAMS, analyze_text, summarize
+
+
+def test_sentences_and_dialogue():
+    m = analyze_text("他说：“走吧。”她没动。")
+    assert m["sentences"] == 2
+    assert m["dialogue_chars"] == len("“走吧。”")
+
+
+def test_ngrams_repeated_across_chapters_are_reported():
+    # 每章只出现两次，单章看不出来，合并后是全书重复最多的说法
+    per = {f"c{i}": analyze_text("不由得心头一震。" * 2 + "其他内容各不相同第%d章" % i) for i in range(5)}
+    top = dict(summarize(per)["repeated_ngrams"])
+    assert top["不由得心"] == 10
+
+
+def test_summary_cuts_after_merge():
+    text = "".join(f"{chr(0x4E00 + i * 7)}{chr(0x4E01 + i * 7)}{chr(0x4E02 + i * 7)}{chr(0x4E03 + i * 7)}。" * 3 for i in range(40))
+    s = summarize({"a": analyze_text(text), "b": analyze_text("甲乙丙丁。甲乙丙丁。")})
+    assert len(s["repeated_ngrams"]) == TOP_NGRAMS
+    assert all(c >= 3 for _g, c in s["repeated_ngrams"])
+    assert "甲乙丙丁" not in dict(s["repeated_ngrams"])
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.models import PROJECT_FORMAT, ChapterNode, ChapterTree, Project, chapter_to_dict, project_from_dict, project_to_dict
+
+
+def _root():
+    a = ChapterNode(id="a", title="一")
+    b = ChapterNode(id="b", title="二")
+    vol = ChapterNode(id="v", title="卷", is_folder=True, children=[a, b])
+    return ChapterNode(id="root", title="目录", is_folder=True, children=[vol, ChapterNode(id="c", title="三")])
+
+
+def _project():
+    return Project(id="p", title="书", root=_root(), created_at="t0", updated_at="t1")
+
+
+def test_flat_tree_round_trip():
+    t = ChapterTree.from_node(_root())
+    assert t.ids == ["root", "v", "a", "b", "c"]
+    assert ChapterTree.from_flat(json.loads(json.dumps(t.to_flat()))).to_node() == _root()
+
+
+def test_flat_tree_rejects_bad_order():
+    with pytest.raises(ValueError):
+        ChapterTree.from_flat({"ids": ["r", "x"], "titles": ["r", "x"], "folders": "10", "parent": [-1, 5]})
+
+
+def test_project_dict_has_format_and_legacy_root():
+    d = json.loads(json.dumps(project_to_dict(_project())))
+    assert d["format"] == PROJECT_FORMAT
+    # 只认 "root" 的旧版本读到的是完整目录
+    assert d["root"] == chapter_to_dict(_root())
+    assert project_from_dict(d).root == _root()
+
+
+def test_reads_legacy_file_written_by_old_build():
+    d = {"id": "p", "title": "书", "created_at": "", "updated_at": "", "root": chapter_to_dict(_root())}
+    assert project_from_dict(d).root == _root()
+
+
+def test_newer_format_fails_loudly():
+    d = project_to_dict(_project())
+    d["format"] = PROJECT_FORMAT + 1
+    with pytest.raises(ValueError):
+        project_from_dict(d)
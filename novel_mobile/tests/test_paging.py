@@ -0,0 +1,48 @@
+import random
+
+from app.utils.paging import PagedDocument, split_pages
+
+
+def _text(paras=200, seed=0):
+    rnd = random.Random(seed)
+    return "".join("字" * rnd.randint(1, 300) + "\n" for _ in range(paras))
+
+
+def test_split_pages_round_trip_on_paragraph_boundaries():
+    text = _text()
+    pages = split_pages(text, 1000)
+    assert "".join(pages) == text
+    assert all(p.endswith("\n") for p in pages)
+    assert all(len(p) <= 2000 for p in pages)
+
+
+def test_split_pages_hard_cuts_long_paragraph():
+    text = "字" * 2500
+    pages = split_pages(text, 1000)
+    assert "".join(pages) == text
+    assert [len(p) for p in pages] == [1000, 1000, 500]
+    assert split_pages("", 1000) == [""]
+
+
+def test_edits_in_window_keep_other_pages():
+    text = _text()
+    doc = PagedDocument(text, 1000, window_pages=3)
+    assert doc.page_count > 6
+    doc.move_window(3)
+    win = doc.window_text()
+    before = "".join(doc.pages[: doc.start])
+    after = "".join(doc.pages[doc.start + doc.count :])
+    doc.commit_window("插入\n" + win)
+    assert doc.dirty
+    assert doc.text() == before + "插入\n" + win + after
+    assert doc.words() == doc.words_outside_window() + sum(doc.page_words[doc.start : doc.start + doc.count])
+
+
+def test_move_window_clamps():
+    doc = PagedDocument(_text(), 1000, window_pages=3)
+    assert doc.at_top
+    assert doc.move_window(-5) == 0
+    moved = doc.move_window(10_000)
+    assert moved == doc.page_count - 3
+    assert doc.at_bottom
+    assert doc.page_offset_in_window(doc.start + 1) == len(doc.pages[doc.start])
@@ -0,0 +1,69 @@
+import random
+
+from app.utils.piece_table import PieceTable
+from app.utils.text import word_count
+
+
+def test_edits_match_plain_string():
+    rnd = random.Random(0)
+    pt = PieceTable("第一段\n第二段 hello\n")
+    ref = pt.text()
+    for _ in range(500):
+        a = rnd.randint(0, len(ref))
+        b = rnd.randint(a, min(len(ref), a + 5))
+        s = rnd.choice(["", "字", "ab c", "\n", "新的一段\n"])
+        pt.replace(a, b, s)
+        ref = ref[:a] + s + ref[b:]
+        assert len(pt) == len(ref)
+    assert pt.text() == ref
+    assert pt.words == word_count(ref)
+
+
+def test_undo_redo_roundtrip():
+    pt = PieceTable("abc")
+    pt.insert(3, "def")
+    pt.delete(0, 1)
+    assert pt.text() == "bcdef"
+    assert pt.undo() == (0, 0, "a")
+    assert pt.text() == "abcdef"
+    pt.undo()
+    assert pt.text() == "abc"
+    assert pt.undo() is None
+    pt.redo()
+    pt.redo()
+    assert pt.text() == "bcdef"
+    assert pt.redo() is None
+
+
+def test_undo_releases_history_budget():
+    pt = PieceTable("", history_max_chars=1000)
+    pt.insert(0, "x" * 900)
+    pt.undo()
+    # 撤销掉的大段粘贴不再占历史额度，之后的多步编辑都能撤销
+    for i in range(5):
+        pt.insert(i * 60, "y" * 59 + "\n")
+    for _ in range(5):
+        assert pt.undo() is not None
+    assert pt.text() == ""
+
+
+def test_redo_counts_against_history_again():
+    pt = PieceTable("", history_max_chars=1000)
+    pt.insert(0, "x" * 900)
+    pt.undo()
+    pt.redo()
+    pt.insert(900, "\n" + "y" * 200)
+    # 900 + 201 超过上限：最早的一步被挤掉，只剩最后一步
+    assert pt.undo() is not None
+    assert pt.undo() is None
+
+
+def test_dirty_ranges_and_clean():
+    pt = PieceTable("0123456789")
+    assert not pt.is_dirty
+    pt.insert(2, "ab")
+    pt.delete(8, 2)
+    assert pt.is_dirty
+    assert pt.dirty_ranges() == [(2, 4), (8, 8)]
+    pt.mark_clean()
+    assert not pt.is_dirty
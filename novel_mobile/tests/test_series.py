@@ -0,0 +1,22 @@
+from app.utils.series import downsample_sum
+
+
+def test_short_series_unchanged():
+    assert downsample_sum([1, 2, 3], ["a", "b", "c"], 5) == ([1, 2, 3], ["a", "b", "c"])
+    assert downsample_sum([1, 2], ["a", "b"], 0) == ([1, 2], ["a", "b"])
+
+
+def test_sums_groups_and_keeps_first_label():
+    vals = list(range(10))
+    labels = [f"d{i}" for i in vals]
+    out_v, out_l = downsample_sum(vals, labels, 3)
+    assert sum(out_v) == sum(vals)
+    assert out_v == [0 + 1 + 2, 3 + 4 + 5, 6 + 7 + 8 + 9]
+    assert out_l == ["d0", "d3", "d6"]
+
+
+def test_many_points():
+    vals = [1] * 3650
+    out_v, out_l = downsample_sum(vals, [str(i) for i in range(3650)], 300)
+    assert len(out_v) == len(out_l) == 300
+    assert sum(out_v) == 3650
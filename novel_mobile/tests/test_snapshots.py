@@ -0,0 +1,69 @@
+from app.storage.snapshots import SnapshotScheduler, SnapshotWriter
+from app.storage.version_store import VersionStore
+
+T = 1_000_000.0
+
+
+def _sched():
+    return SnapshotScheduler(min_chars=100, big_chars=1000, idle_seconds=20, min_seconds=60, max_seconds=900)
+
+
+def test_big_change_is_due_immediately():
+    s = _sched()
+    s.begin("a", 0)
+    assert not s.due(50, 1)
+    assert s.due(1200, 2)
+    s.taken(1200, 2)
+    assert not s.due(1200, 100)
+
+
+def test_waits_for_idle_and_min_interval():
+    s = _sched()
+    s.begin("a", T)
+    assert not s.due(150, T + 50)
+    assert not s.due(160, T + 61)  # 还在输入
+    assert s.due(160, T + 82)  # 停笔 20 秒以上
+    s.taken(160, T + 82)
+    # 改动够了，但距上次快照不到 min_seconds
+    assert not s.due(300, T + 90)
+    assert not s.due(300, T + 120)
+    assert s.due(300, T + 150)
+
+
+def test_small_edits_snapshot_at_most_every_max_seconds():
+    s = _sched()
+    s.begin("a", T)
+    assert not s.due(10, T + 100)
+    assert s.due(10, T + 901)
+
+
+def test_small_edit_right_after_open_is_not_due():
+    s = _sched()
+    s.begin("a", T)
+    assert not s.due(1, T + 5)
+    assert not s.due(1, T + 30)
+    assert not s.due(1, T + 30, leaving=True)
+    # max_seconds 从打开这章时算起
+    assert s.due(1, T + 900)
+
+
+def test_leaving_snapshots_meaningful_changes():
+    s = _sched()
+    s.begin("a", T)
+    assert not s.due(0, T + 1, leaving=True)
+    assert not s.due(20, T + 1, leaving=True)
+    assert s.due(120, T + 1, leaving=True)
+    assert s.due(20, T + 900, leaving=True)
+    s.clear()
+    assert not s.due(5000, T + 1000)
+
+
+def test_writer_writes_in_order(tmp_path):
+    vs = VersionStore(tmp_path)
+    w = SnapshotWriter(vs)
+    for i in range(5):
+        w.submit("a", f"第{i}稿", i)
+    w.flush()
+    versions = vs.list_versions("a")
+    assert len(versions) == 5
+    assert sorted(vs.read_version(v) for v in versions) == [f"第{i}稿" for i in range(5)]
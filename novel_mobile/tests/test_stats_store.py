@@ -0,0 +1,50 @@
+import json
+from datetime import date
+
+from app.storage.stats_store import StatsStore
+
+
+def _write_raw(st, rows):
+    st.path.write_text(json.dumps(rows), encoding="utf-8")
+
+
+def test_buckets_survive_raw_truncation(tmp_path):
+    st = StatsStore(tmp_path)
+    st.append_total(100, "2024-01-01T09:00:00")
+    st.append_total(300, "2024-01-01T20:00:00")
+    st.append_total(300, "2024-03-05T09:00:00")
+    st.append_total(350, "2024-03-05T10:00:00")
+    st.append_total(400, "2024-03-05T11:00:00")
+
+    # 模拟原始记录被截断：一月的记录和三月五日的第一条都不在了
+    _write_raw(st, [{"ts": "2024-03-05T10:00:00", "total_words": 350}, {"ts": "2024-03-05T11:00:00", "total_words": 400}])
+    assert st.rebuild_buckets() == 1
+
+    fresh = StatsStore(tmp_path)
+    assert fresh.daily_progress() == {"2024-01-01": 200, "2024-03-05": 100}
+    labels, vals = fresh.progress_series("all", today=date(2024, 3, 31))
+    assert labels == ["2024-01", "2024-02", "2024-03"]
+    assert vals == [200, 0, 100]
+
+
+def test_rebuild_replaces_days_still_covered(tmp_path):
+    st = StatsStore(tmp_path)
+    st.append_total(0, "2024-05-01T09:00:00")
+    st.append_total(10, "2024-05-02T09:00:00")
+    st.append_total(999, "2024-05-02T10:00:00")
+    _write_raw(st, [
+        {"ts": "2024-05-01T09:00:00", "total_words": 0},
+        {"ts": "2024-05-02T09:00:00", "total_words": 10},
+        {"ts": "2024-05-02T10:00:00", "total_words": 50},
+    ])
+    st.rebuild_buckets()
+    assert st.daily_progress()["2024-05-02"] == 40
+
+
+def test_week_series_is_zero_filled(tmp_path):
+    st = StatsStore(tmp_path)
+    st.append_total(10, "2024-05-01T09:00:00")
+    st.append_total(30, "2024-05-01T10:00:00")
+    labels, vals = st.progress_series("week", today=date(2024, 5, 3))
+    assert labels[0] == "2024-04-27" and labels[-1] == "2024-05-03"
+    assert vals == [0, 0, 0, 0, 20, 0, 0]
@@ -0,0 +1,60 @@
+import pytest
+
+from app.importers.txt_importer import TxtImporter
+from app.storage.project_store import ProjectStore
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("第一章 风起", ("第一章 风起", False)),
+        ("第十二章：归来", ("第十二章：归来", False)),
+        ("  第3回", ("第3回", False)),
+        ("第一卷 少年行", ("第一卷 少年行", True)),
+        ("第一节课下课后，他走出了教室。", None),
+        ("第三回合，他终于倒下了。", None),
+        ("第2集团军的番号被撤销了。", None),
+        ("第一章 他说完就走了。", None),
+        ("## 第二节", ("第二节", False)),
+    ],
+)
+def test_match_heading(line, expected):
+    assert TxtImporter().match_heading(line) == expected
+
+
+def _import(tmp_path, text, **kw):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    src = tmp_path / "书.txt"
+    src.write_text(text, encoding="utf-8")
+    store = ProjectStore(tmp_path / "proj")
+    return store, TxtImporter(**kw).run(src, store)
+
+
+def test_volumes_and_chapters(tmp_path):
+    text = "楔子内容\n第一卷 起\n第一章 甲\n第一节课下课后，他走了。\n第二章 乙\n正文\n第二卷 承\n第三章 丙\n"
+    store, r = _import(tmp_path, text)
+    root = r.root
+    assert [c.title for c in root.children] == ["序章", "第一卷 起", "第二卷 承"]
+    vol1 = root.children[1]
+    assert [c.title for c in vol1.children] == ["第一章 甲", "第二章 乙"]
+    assert store.read_chapter(vol1.children[0].id) == "第一节课下课后，他走了。\n"
+    assert r.chapter_count == 4
+
+
+def test_markdown_single_level_headings_become_chapters(tmp_path):
+    store, r = _import(tmp_path, "# Chapter One\nfirst\n# Chapter Two\nsecond\n")
+    assert [(c.title, c.is_folder) for c in r.root.children] == [("Chapter One", False), ("Chapter Two", False)]
+    assert store.read_chapter(r.root.children[1].id) == "second\n"
+
+
+def test_markdown_two_levels_keep_folders(tmp_path):
+    _store, r = _import(tmp_path, "# 卷一\n## 一\na\n## 二\nb\n")
+    [vol] = r.root.children
+    assert vol.is_folder and [c.title for c in vol.children] == ["一", "二"]
+
+
+def test_pool_and_inline_agree(tmp_path):
+    text = "".join(f"第{i}章\n" + "字" * 50 + "\n" for i in range(1, 30))
+    _s, inline = _import(tmp_path, text)
+    _s2, pooled = _import(tmp_path / "p", text, workers=2, batch_chars=200)
+    assert sorted(inline.word_counts.values()) == sorted(pooled.word_counts.values())
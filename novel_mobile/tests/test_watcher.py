@@ -0,0 +1,73 @@
+import os
+
+from app.storage.watcher import ProjectWatcher
+
+
+def _project(tmp_path):
+    (tmp_path / "chapters").mkdir()
+    (tmp_path / "project.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "chapters" / "a.md").write_text("一", encoding="utf-8")
+    return tmp_path
+
+
+def _touch(path, text):
+    path.write_text(text, encoding="utf-8")
+    # 同一时钟刻度内的两次写入 mtime 可能相同，手动推后一秒
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_own_writes_are_not_reported(tmp_path):
+    p = _project(tmp_path)
+    w = ProjectWatcher(p)
+    _touch(p / "chapters" / "a.md", "一二")
+    _touch(p / "chapters" / "b.md", "新章")
+    _touch(p / "project.json", '{"title": "x"}')
+    w.absorb(["a", "b"], meta=True)
+    assert not w.poll()
+
+
+def test_external_change_and_remove(tmp_path):
+    p = _project(tmp_path)
+    (p / "chapters" / "b.md").write_text("二", encoding="utf-8")
+    w = ProjectWatcher(p)
+    _touch(p / "chapters" / "a.md", "外部")
+    (p / "chapters" / "b.md").unlink()
+    _touch(p / "project.json", '{"title": "y"}')
+    cs = w.poll()
+    assert cs.meta_changed
+    assert cs.changed == ["a"]
+    assert cs.removed == ["b"]
+    assert not w.poll()
+
+
+def test_retry_reports_again(tmp_path):
+    p = _project(tmp_path)
+    w = ProjectWatcher(p)
+    _touch(p / "chapters" / "a.md", "外部")
+    assert w.poll().changed == ["a"]
+    w.retry(["a"])
+    assert w.poll().changed == ["a"]
+
+
+def test_is_stale(tmp_path):
+    p = _project(tmp_path)
+    w = ProjectWatcher(p)
+    assert not w.is_stale("a")
+    _touch(p / "chapters" / "a.md", "外部")
+    assert w.is_stale("a")
+    # 自己写入后基线更新
+    _touch(p / "chapters" / "a.md", "我的")
+    w.absorb(["a"])
+    assert not w.is_stale("a")
+    (p / "chapters" / "a.md").unlink()
+    assert w.is_stale("a")
+    assert not w.is_stale("never")
+
+
+def test_pack_storage_ignores_chapters(tmp_path):
+    p = _project(tmp_path)
+    w = ProjectWatcher(p, watch_chapters=False)
+    _touch(p / "chapters" / "a.md", "外部")
+    assert not w.poll()
+    assert not w.is_stale("a")